@@ -3,7 +3,7 @@ AX 키워드 나라장터 공고 수집 → Realtime Database 적재 모듈.
 
 - API 키: BID_API_KEY (config.py에서 공유)
 - Firebase: main.py 의 initialize_firebase() 가 띄운 기본 앱(RTDB)을 그대로 쓴다
-- 경로: /ax_bids/{공고번호-차수}, /ax_meta/collection_state
+- 경로: /ax_bids/{공고번호-차수}, /ax_meta/collection_state, /ax_meta/ordinals/{공고번호}
 
 Firestore 에서 옮겨온 이유:
   Firestore 는 "문서 읽기 건수"로 과금해 컬렉션을 훑을 때마다 문서 수만큼
@@ -18,11 +18,11 @@ from collections import defaultdict
 from datetime import datetime, timedelta
 from urllib.parse import unquote
 
-import requests
-import firebase_admin
-from firebase_admin import db as rtdb
-
-from config import BID_API_KEY
+from config import get_api_key
+from keyword_matcher import get_matcher
+from record_schema import parse_date, project
+from run_history import api_stats
+from utils import http_session
 
 # ── 상수 ──────────────────────────────────────────────
 BASE_URL = "https://apis.data.go.kr/1230000/ad/BidPublicInfoService/getBidPblancListInfoServcPPSSrch"
@@ -32,6 +32,7 @@ DATE_FMT = "%Y%m%d%H%M"
 CHUNK_DAYS = 3
 RTDB_PATH = "/ax_bids"
 RTDB_META_PATH = "/ax_meta/collection_state"
+RTDB_ORDINALS_PATH = "/ax_meta/ordinals"   # {공고번호: 저장된 문서 키 '공고번호-차수'}
 
 
 # ── 시간 유틸 ─────────────────────────────────────────
@@ -62,6 +63,8 @@ def init_rtdb():
     private_key 의 중복 base64 구간을 잘라내는 우회 코드까지 있었다.
     RTDB 기본 앱으로 통일하면서 그 전부가 필요 없어졌다.
     """
+    import firebase_admin
+
     try:
         firebase_admin.get_app()
     except ValueError:
@@ -77,7 +80,7 @@ def _decode_service_key(key: str) -> str:
 
 def fetch_page(page: int, begin: str, end: str, keyword: str = KEYWORD) -> list[dict]:
     """나라장터 API 한 페이지 호출."""
-    service_key = _decode_service_key(BID_API_KEY or "").strip()
+    service_key = _decode_service_key(get_api_key() or "").strip()
     params = {
         "serviceKey": service_key,
         "ServiceKey": service_key,
@@ -91,12 +94,13 @@ def fetch_page(page: int, begin: str, end: str, keyword: str = KEYWORD) -> list[
     if keyword:
         params["bidNtceNm"] = keyword
 
-    r = requests.get(BASE_URL, params=params, timeout=20)
-    r.raise_for_status()
-    payload = r.json()
+    with api_stats.measure("ax"):
+        r = http_session().get(BASE_URL, params=params, timeout=20)
+        r.raise_for_status()
+        payload = r.json()
 
-    if payload["response"]["header"]["resultCode"] != "00":
-        raise RuntimeError(payload["response"]["header"]["resultMsg"])
+        if payload["response"]["header"]["resultCode"] != "00":
+            raise RuntimeError(payload["response"]["header"]["resultMsg"])
 
     items = payload["response"]["body"].get("items")
     if not items:
@@ -111,22 +115,26 @@ def get_latest_bid_datetime() -> datetime | None:
     """RTDB 에서 가장 최근 공고일시를 조회.
 
     수백 건 규모라 전체를 읽고 최댓값을 취한다. 색인을 두지 않아도 된다.
+    지난 실행 뒤로 바뀌지 않았으면 ETag 조건부 요청으로 캐시 값을 쓴다 (rtdb_cache).
     """
-    node = rtdb.reference(RTDB_PATH).get() or {}
+    from rtdb_cache import cached_get
+
+    node = cached_get(RTDB_PATH) or {}
     latest = None
     for rec in node.values():
-        raw = (rec or {}).get("bidNtceDt")
-        if not isinstance(raw, str):
-            continue
-        try:
-            dt = datetime.fromisoformat(raw.replace(" ", "T"))
-        except ValueError:
+        dt = _row_datetime(rec)
+        if dt is None:
             continue
         if latest is None or dt > latest:
             latest = dt
     return latest
 
 
+def _row_datetime(row: dict | None) -> datetime | None:
+    """공고 행의 bidNtceDt('2025-05-01 10:00:00', 저장분은 20250501100000)를 datetime 으로. 없거나 깨졌으면 None."""
+    return parse_date((row or {}).get("bidNtceDt"))
+
+
 def extract_bid_ordinal(value) -> tuple[str, int]:
     """입찰공고차수(bidNtceOrd) 값에서 순서 키와 숫자 추출."""
     if value is None or (isinstance(value, float) and math.isnan(value)):
@@ -148,6 +156,8 @@ def select_latest_variants(records: list[dict]):
     latest = {}
     orders_to_remove = defaultdict(set)
     extras = []
+    # 차수 값은 "000"/"001" 처럼 종류가 몇 개 안 된다. 백필에서 수만 번 다시 파싱하지 않도록 기억해 둔다.
+    ordinals = {}
 
     for record in records:
         base_no = str(record.get("bidNtceNo") or "").strip()
@@ -156,7 +166,12 @@ def select_latest_variants(records: list[dict]):
             continue
 
         order_raw = record.get("bidNtceOrd")
-        order_key, order_value = extract_bid_ordinal(order_raw)
+        try:
+            order_key, order_value = ordinals[order_raw]
+        except KeyError:
+            order_key, order_value = ordinals[order_raw] = extract_bid_ordinal(order_raw)
+        except TypeError:
+            order_key, order_value = extract_bid_ordinal(order_raw)
 
         entry = latest.get(base_no)
         if entry is None:
@@ -173,7 +188,8 @@ def select_latest_variants(records: list[dict]):
                 entry["order_val"] = order_value
                 entry["order_key"] = order_key
             else:
-                if order_key != "":
+                # 같은 차수가 중복으로 내려온 경우 방금 적재할 문서를 지우지 않도록 거른다.
+                if order_key != "" and order_key != entry["order_key"]:
                     orders_to_remove[base_no].add(order_key)
 
     keep_records = [info["record"] for info in latest.values()]
@@ -184,16 +200,25 @@ def select_latest_variants(records: list[dict]):
     return keep_records, orders_to_remove, max_orders, keep_order_keys
 
 
+_UNSAFE_KEY_TABLE = str.maketrans({ch: "_" for ch in ".$#[]/"})
+_CONVERTED_TYPES = {datetime, float}
+
+
 def _safe_key(raw: str) -> str:
     """RTDB 키에 쓸 수 없는 문자(. $ # [ ] /)를 치환한다."""
-    out = str(raw)
-    for ch in ".$#[]/":
-        out = out.replace(ch, "_")
-    return out
+    return str(raw).translate(_UNSAFE_KEY_TABLE)
 
 
 def normalize_record(record: dict) -> dict:
-    """RTDB에 저장 가능한 형태로 정규화."""
+    """RTDB에 저장 가능한 형태로 정규화. 대시보드가 쓰는 필드만 간결 인코딩으로 남긴다 (record_schema)."""
+    return project("ax", _plain_values(record))
+
+
+def _plain_values(record: dict) -> dict:
+    # API 응답은 거의 전부 문자열/숫자/None 이라 그대로 복사하면 된다.
+    # datetime 이나 float(NaN 가능)이 섞인 행만 필드별로 변환한다.
+    if _CONVERTED_TYPES.isdisjoint(map(type, record.values())):
+        return dict(record)
     normalized = {}
     for key, value in record.items():
         if isinstance(value, datetime):
@@ -207,55 +232,223 @@ def normalize_record(record: dict) -> dict:
     return normalized
 
 
-def upsert_rtdb(records: list[dict], *, collected_at=None, order_cleanup=None) -> int:
-    """RTDB 에 업서트. 키는 Firestore 시절과 동일한 '공고번호-차수'."""
+def doc_key(record: dict, idx: int = 0) -> str:
+    """/ax_bids 문서 키 '공고번호-차수'. 둘 다 없으면 통합공고번호, 그것도 없으면 auto-{idx}."""
+    doc_id = f"{record.get('bidNtceNo', '')}-{record.get('bidNtceOrd', '')}".strip("-")
+    if not doc_id:
+        doc_id = record.get("untyNtceNo") or f"auto-{idx}"
+    return _safe_key(doc_id)
+
+
+def _load_ordinals() -> tuple[dict[str, str], bool]:
+    """(/ax_meta/ordinals {공고번호: 저장된 문서 키}, 새로 만들었는지).
+
+    색인이 없으면(처음 배포) /ax_bids 에서 만든다. 이때는 만든 색인 전체를 함께 써야 한다.
+    """
+    from rtdb_cache import cached_get
+
+    index = cached_get(RTDB_ORDINALS_PATH)
+    if index:
+        return dict(index), False
+    built = {}
+    for key, rec in (cached_get(RTDB_PATH) or {}).items():
+        base_no = str((rec or {}).get("bidNtceNo") or "").strip()
+        if not base_no:
+            continue
+        prev = built.get(_safe_key(base_no))
+        if prev is None or _key_ordinal(key) > _key_ordinal(prev):
+            built[_safe_key(base_no)] = key
+    return built, True
+
+
+def _key_ordinal(doc_id: str) -> int:
+    """문서 키 '공고번호-차수' 의 차수 숫자. 차수가 없으면 0."""
+    return extract_bid_ordinal(doc_id.rsplit("-", 1)[1])[1] if "-" in doc_id else 0
+
+
+def upsert_rtdb(records: list[dict], *, collected_at=None, order_cleanup=None, touched=None) -> int:
+    """RTDB 에 업서트. 키는 Firestore 시절과 동일한 '공고번호-차수'.
+
+    같은 공고의 이전 차수는 이번 배치 안(order_cleanup)뿐 아니라 /ax_meta/ordinals 에 둔
+    공고번호별 저장 차수와도 비교해 찾는다. 적재, 이전 차수 삭제(null), 차수 색인과
+    공고번호 색인 갱신은 rtdb_bulk.write_updates 로 청크를 나눠 병렬로 보내므로 배치 전체가
+    원자적이지는 않다. 대신 공고번호 하나에 해당하는 경로는 한 묶음으로 같은 청크(다중 경로
+    update 한 번)에 넣어 공고 단위로는 함께 반영된다. 이미 더 높은 차수가 저장된 공고의
+    옛 차수는 쓰지 않는다.
+
+    touched 에 dict 를 넘기면 쓴 키("written"), 지운 키("removed")와 경로별 쓰기 전 값
+    ("writes", rtdb_bulk.before_values)을 채운다 (실행 롤백용). 최신 공고일시 조회가 이미 읽은
+    /ax_bids 스냅샷으로 만들므로 읽기가 늘지 않는다. 수집 구간이 마지막 분을 다시 받아
+    이미 있던 문서를 덮어써도 롤백은 지우지 않고 예전 값으로 되돌린다.
+    """
     if not records:
         print("[AX] RTDB에 적재할 데이터가 없습니다.")
         return 0
 
+    from bid_links import LINKS_PATH, build_index, link_updates
+    from rtdb_bulk import before_values, write_updates
+    from rtdb_cache import cached_get
+
     collected_at_iso = _ensure_kst(collected_at or _now_kst()).isoformat()
+    ordinals, built = _load_ordinals()
+    ordinals_before = {} if built else dict(ordinals)
+    index_root = RTDB_ORDINALS_PATH.strip("/")
     payload = {}
+    stale: dict[str, str] = {}      # 지울 문서 키 → 공고번호
+    index_updates = {f"{index_root}/{base}": key for base, key in ordinals.items()} if built else {}
+    skipped = 0
+
+    for base_no, orders in (order_cleanup or {}).items():
+        for order_key in orders:
+            doc_id = _safe_key(f"{base_no}-{order_key}".strip("-"))
+            if doc_id:
+                stale[doc_id] = base_no
 
     for idx, record in enumerate(records, start=1):
-        normalized = normalize_record(record)
-        normalized["collectedAt"] = collected_at_iso
-        doc_id = f"{normalized.get('bidNtceNo', '')}-{normalized.get('bidNtceOrd', '')}".strip("-")
-        if not doc_id:
-            doc_id = normalized.get("untyNtceNo") or f"auto-{idx}"
-        payload[_safe_key(doc_id)] = normalized
-
-    ref = rtdb.reference(RTDB_PATH)
-    ref.update(payload)   # 증분 수집이므로 기존 건은 남긴다
-    print(f"[AX] RTDB 적재 완료: 총 {len(payload)}건 → {RTDB_PATH}")
-
-    # 같은 공고의 이전 차수 문서 제거
-    if order_cleanup:
-        for base_no, orders in order_cleanup.items():
-            for order_key in orders:
-                doc_id = _safe_key(f"{base_no}-{order_key}".strip("-"))
-                if not doc_id:
+        normalized = normalize_record({**record, "collectedAt": collected_at_iso})
+        key = doc_key(normalized, idx)
+        base_no = str(normalized.get("bidNtceNo") or "").strip()
+        if base_no:
+            prev = ordinals.get(_safe_key(base_no))
+            if prev and prev != key:
+                if _key_ordinal(prev) > _key_ordinal(key):
+                    skipped += 1
                     continue
-                try:
-                    ref.child(doc_id).delete()
-                    print(f"  [AX] 이전 차수 삭제: {doc_id}")
-                except Exception as exc:
-                    print(f"  [AX] 삭제 실패 {doc_id}: {exc}")
+                stale[prev] = base_no
+            ordinals[_safe_key(base_no)] = key
+            index_updates[f"{index_root}/{_safe_key(base_no)}"] = key
+        payload[key] = normalized
+
+    for key in payload:
+        stale.pop(key, None)
+
+    # 증분 수집이므로 기존 건은 남긴다. 백필(2025-01-01부터)처럼 많으면 청크로 나눠 병렬로 보낸다.
+    # 공고번호 하나의 적재·이전 차수 삭제·차수 색인·공고번호 색인은 한 묶음으로 같은 청크에
+    # 보내, 두 차수가 함께 보이거나 색인만 바뀐 상태가 남지 않게 한다 (묶음 사이는 원자적이지 않다)
+    root = RTDB_PATH.strip("/")
+    groups: dict[str, dict] = {}    # 공고번호(차수 색인 키와 같게 strip + _safe_key) → 묶음
+    for key, value in payload.items():
+        group = groups.setdefault(_safe_key(str(value.get("bidNtceNo") or "").strip()) or key, {})
+        group[f"{root}/{key}"] = value
+        group.update(link_updates("ax", {key: [value.get("bidNtceNo")]}))
+    for doc_id, base_no in stale.items():
+        group = groups.setdefault(_safe_key(str(base_no).strip()), {})
+        group[f"{root}/{doc_id}"] = None
+        group.update(link_updates("ax", {doc_id: []}, {doc_id: [base_no]}))
+    for path, key in index_updates.items():
+        groups.setdefault(path.rsplit("/", 1)[1], {})[path] = key
+    updates = {path: value for group in groups.values() for path, value in group.items()}
+    if updates and touched is not None:
+        existing = cached_get(RTDB_PATH) or {}
+        mine = {key: existing[key] for key in list(payload) + list(stale) if key in existing}
+        touched.setdefault("writes", []).extend(before_values(updates, {
+            RTDB_PATH: existing,
+            RTDB_ORDINALS_PATH: ordinals_before,
+            LINKS_PATH: build_index(None, None, mine, None),
+        }))
+    if updates:
+        write_updates(list(groups.values()))
+
+    print(f"[AX] RTDB 적재 완료: 총 {len(payload)}건 → {RTDB_PATH}"
+          + (f", 이전 차수 {len(stale)}건 삭제" if stale else "")
+          + (f", 더 높은 차수가 이미 있어 {skipped}건 건너뜀" if skipped else ""))
+    for doc_id in stale:
+        print(f"  [AX] 이전 차수 삭제: {doc_id}")
+    if touched is not None:
+        touched.setdefault("written", []).extend(payload)
+        touched.setdefault("removed", []).extend(stale)
 
     return len(payload)
 
 
 # ── 메인 수집 함수 ────────────────────────────────────
-def collect_ax_data() -> dict:
+def _fetch_window(start_dt: datetime, end_dt: datetime, errors: list[str] | None = None) -> list[dict]:
+    """CHUNK_DAYS 단위로 끊어 AX 키워드 공고를 전부 받는다.
+
+    요청이 실패하면 그 구간을 버리고 멈춘 뒤 errors 에 남긴다. 뒤 구간을 계속 받아 올리면 다음 증분
+    수집이 /ax_bids 최신 공고일시부터 시작해 실패한 구간을 건너뛰게 된다.
+    """
+    collected = []
+    chunk_start = start_dt
+
+    while chunk_start <= end_dt:
+        chunk_end = min(
+            chunk_start + timedelta(days=CHUNK_DAYS) - timedelta(minutes=1),
+            end_dt
+        )
+        begin = chunk_start.strftime(DATE_FMT)
+        end = chunk_end.strftime(DATE_FMT)
+        print(f"[AX] [{begin} ~ {end}] 구간 요청")
+
+        page = 1
+        chunk_base = len(collected)
+        while True:
+            try:
+                rows = fetch_page(page, begin, end, KEYWORD)
+            except Exception as e:
+                print(f"[AX] API 요청 오류 (page {page}): {e}")
+                if errors is not None:
+                    errors.append(f"{begin}~{end} page {page}: {e}")
+                # 이 구간에서 받다 만 행도 버린다 (최신 공고일시가 구간 중간으로 올라가지 않게)
+                return collected[:chunk_base]
+
+            if not rows:
+                break
+
+            collected.extend(rows)
+            print(f"  [AX] {page}페이지 수신 (누적 {len(collected)}건)")
+            page += 1
+            time.sleep(0.15)
+
+        chunk_start = chunk_end + timedelta(minutes=1)
+
+    return collected
+
+
+def _from_prefetched(prefetched: dict | None, start_dt: datetime, end_dt: datetime) -> list[dict] | None:
+    """광역 수집(main --wide-sweep)이 이미 받은 공고로 AX 구간을 채울 수 있으면 그 행들을 돌려준다.
+
+    prefetched = {"begin": "YYYYMMDDHHMM", "end": "YYYYMMDDHHMM", "rows": [...]}
+    AX 구간이 광역 수집 구간 안에 들어올 때만 쓰고, 아니면 None(직접 조회).
+    """
+    if not prefetched:
+        return None
+    try:
+        pre_begin = _ensure_kst(datetime.strptime(prefetched["begin"], DATE_FMT))
+        pre_end = _ensure_kst(datetime.strptime(prefetched["end"], DATE_FMT))
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not (pre_begin <= start_dt and end_dt <= pre_end):
+        return None
+
+    rows = []
+    for row in prefetched.get("rows") or []:
+        dt = _row_datetime(row)
+        if dt is not None and start_dt <= _ensure_kst(dt) <= end_dt:
+            rows.append(row)
+    print(f"[AX] 광역 수집 결과 재사용: {len(rows)}건 (API 재요청 없음)")
+    return rows
+
+
+def collect_ax_data(prefetched: dict | None = None) -> dict:
     """
     AX 키워드 공고를 수집하여 RTDB(/ax_bids)에 적재.
 
+    Args:
+        prefetched: 광역 수집이 같은 기간에 이미 받은 공고 중 제목에 AX 가 들어간 행.
+            {"begin", "end", "rows"}. 구간을 덮으면 API 를 다시 부르지 않는다.
+
     Returns:
         dict: {
             "keyword": "AX",
             "total_collected": int,    # API에서 수신한 총 건수
             "filtered_records": int,   # 키워드 필터 후 건수
             "upserted_records": int,   # RTDB에 적재된 건수
-            "bid_details": list[dict], # 이메일용 [{공고명, 채권자명}, ...]
+            "bid_details": list[dict], # 이메일용 [{key, 공고명, 채권자명}, ...]
+            "written_keys": list[str], # 이번에 쓴 /ax_bids 키 (롤백용)
+            "removed_keys": list[str], # 이번에 지운 이전 차수 키
+            "writes": list[dict],      # [{path, before}] 쓰기 전 값 (실행 롤백용)
+            "errors": list[str],       # 건너뛰고 계속한 오류 (있으면 체크포인트에 완료로 남기지 않는다)
         }
     """
     result = {
@@ -264,9 +457,13 @@ def collect_ax_data() -> dict:
         "filtered_records": 0,
         "upserted_records": 0,
         "bid_details": [],
+        "written_keys": [],
+        "removed_keys": [],
+        "writes": [],
+        "errors": [],
     }
 
-    if not BID_API_KEY:
+    if not get_api_key(required=False):
         print("[AX] BID_API_KEY가 설정되지 않았습니다. AX 수집을 건너뜁니다.")
         return result
 
@@ -280,6 +477,7 @@ def collect_ax_data() -> dict:
     except Exception as e:
         print(f"[AX] RTDB 초기화 실패: {e}")
         print("[AX] AX 수집을 건너뜁니다.")
+        result["errors"].append(f"RTDB 초기화 실패: {e}")
         return result
 
     # 수집 기간 계산 (RTDB 최신 데이터 기준 증분 수집)
@@ -316,36 +514,10 @@ def collect_ax_data() -> dict:
 
     print(f"[AX] 수집 기간: {start_dt.strftime(DATE_FMT)} ~ {end_dt.strftime(DATE_FMT)}")
 
-    # 청크별 데이터 수집
-    collected = []
-    chunk_start = start_dt
-
-    while chunk_start <= end_dt:
-        chunk_end = min(
-            chunk_start + timedelta(days=CHUNK_DAYS) - timedelta(minutes=1),
-            end_dt
-        )
-        begin = chunk_start.strftime(DATE_FMT)
-        end = chunk_end.strftime(DATE_FMT)
-        print(f"[AX] [{begin} ~ {end}] 구간 요청")
-
-        page = 1
-        while True:
-            try:
-                rows = fetch_page(page, begin, end, KEYWORD)
-            except Exception as e:
-                print(f"[AX] API 요청 오류 (page {page}): {e}")
-                break
-
-            if not rows:
-                break
-
-            collected.extend(rows)
-            print(f"  [AX] {page}페이지 수신 (누적 {len(collected)}건)")
-            page += 1
-            time.sleep(0.15)
-
-        chunk_start = chunk_end + timedelta(minutes=1)
+    # 청크별 데이터 수집 (광역 수집 결과가 구간을 덮으면 재사용)
+    collected = _from_prefetched(prefetched, start_dt, end_dt)
+    if collected is None:
+        collected = _fetch_window(start_dt, end_dt, result["errors"])
 
     result["total_collected"] = len(collected)
     print(f"[AX] 총 {len(collected)}건 수신")
@@ -353,11 +525,9 @@ def collect_ax_data() -> dict:
     if not collected:
         return result
 
-    # 키워드 필터링
-    filtered = [
-        row for row in collected
-        if KEYWORD.lower() in (row.get("bidNtceNm") or "").lower()
-    ]
+    # 키워드 필터링 (대소문자 무시 + 영문 약어 단어 경계. Maxwell/Taxonomy 같은 오탐 제외)
+    matcher = get_matcher((KEYWORD,))
+    filtered = [row for row in collected if matcher.find_all(row.get("bidNtceNm"))]
     result["filtered_records"] = len(filtered)
     print(f"[AX] 필터링 후 {len(filtered)}건")
 
@@ -370,25 +540,36 @@ def collect_ax_data() -> dict:
     collected_at = _now_kst()
 
     # RTDB 적재
+    touched = {}
     upserted = upsert_rtdb(
         deduped,
         collected_at=collected_at,
         order_cleanup=orders_to_remove,
+        touched=touched,
     )
     result["upserted_records"] = upserted
+    result["written_keys"] = touched.get("written", [])
+    result["removed_keys"] = touched.get("removed", [])
+    result["writes"] = touched.get("writes", [])
 
-    # 이메일용 공고 목록
+    # 이메일용 공고 목록 (key 는 /ax_bids 문서 키. 수집 결과 리포트가 참조로 쓴다).
+    # 더 높은 차수가 이미 있어 건너뛴 건은 쓰지 않았으므로 빼서 upserted_records 와 맞춘다
+    written = set(result["written_keys"])
     result["bid_details"] = [
         {
+            "key": key,
             "공고명": row.get("bidNtceNm", ""),
             "채권자명": row.get("dminsttNm", "") or row.get("ntceInsttNm", ""),
         }
-        for row in deduped
+        for key, row in ((doc_key(row, idx), row) for idx, row in enumerate(deduped, start=1))
+        if key in written
     ]
 
     # 메타 데이터 업데이트
     if upserted > 0:
         try:
+            from firebase_admin import db as rtdb
+
             rtdb.reference(RTDB_META_PATH).update({
                 "collectedDate": collected_at.date().isoformat(),
                 "collectedAt": collected_at.isoformat(),
@@ -0,0 +1,125 @@
+"""
+공고번호 역색인 /bid_links/{정규화 공고번호}.
+
+사전규격·발주계획은 bidNtceNos 로 입찰공고를 가리키지만 /bids, /ax_bids 쪽에서 거꾸로
+찾을 길이 없어, 공고 생애(사전규격 → 발주계획 → 입찰 → 개찰) 화면을 그리려면 네 노드를
+전부 받아 클라이언트에서 맞춰 봐야 했다. 수집기마다 적재할 때 자기 몫만 같은 다중 경로
+갱신으로 고쳐, 공고번호 하나로 작은 노드 하나만 읽으면 되게 한다.
+
+  /bid_links/{R25BK00850538}
+      ├── pre_spec     {bfSpecRgstNo: true, ...}       prespec_collector.upsert / merge_upsert
+      ├── order_plan   {orderPlanUntyNo: true, ...}    prespec_collector.upsert / merge_upsert
+      ├── ax           {'공고번호-차수': true, ...}     ax_collector.upsert_rtdb
+      └── bid          "2025/07/R25BK00850538"         main.upload_to_firebase
+
+공고번호는 prespec_collector.norm_bid_no 로 맞춘다 (차수·하이픈 제거).
+처음 배포했거나 (check_firebase 로 지우는 등) 어긋났으면 네 노드에서 새로 만든다.
+
+  python check_firebase.py rebuild-links [--dry-run]
+"""
+
+from prespec_collector import norm_bid_no
+
+LINKS_PATH = "/bid_links"
+
+_UNSAFE_KEY_TABLE = str.maketrans({ch: "_" for ch in ".$#[]/"})
+
+
+def _safe_key(raw: str) -> str:
+    """RTDB 키에 쓸 수 없는 문자(. $ # [ ] /)를 치환한다."""
+    return str(raw).translate(_UNSAFE_KEY_TABLE)
+
+
+def _norm_all(bid_nos) -> set[str]:
+    out = set()
+    for raw in bid_nos or ():
+        n = norm_bid_no(raw)
+        if n:
+            out.add(_safe_key(n))
+    return out
+
+
+def _path(bid_no: str, kind: str, ref: str) -> str:
+    root = LINKS_PATH.strip("/")
+    if kind == "bid":
+        return f"{root}/{bid_no}/bid"
+    return f"{root}/{bid_no}/{kind}/{_safe_key(ref)}"
+
+
+def _value(kind: str, ref: str):
+    return ref if kind == "bid" else True
+
+
+def link_updates(kind: str, refs: dict[str, list[str]], old: dict[str, list[str]] | None = None) -> dict:
+    """kind 레코드 refs(ref → 공고번호 목록)의 색인을 고치는 다중 경로 갱신분.
+
+    old 에 예전 공고번호 목록을 주면 더 이상 가리키지 않는 공고번호에서 뺀다.
+    지운 레코드는 refs 에 빈 목록으로 넣는다. kind 가 'bid' 면 ref 는 /bids 아래 경로다.
+    """
+    updates = {}
+    for ref, bid_nos in refs.items():
+        new = _norm_all(bid_nos)
+        for n in _norm_all((old or {}).get(ref)) - new:
+            updates[_path(n, kind, ref)] = None
+        for n in new:
+            updates[_path(n, kind, ref)] = _value(kind, ref)
+    return updates
+
+
+def reconcile_updates(kind: str, refs: dict[str, list[str]]) -> dict:
+    """kind 색인을 refs 전체로 맞춘다 (전체 수집용). refs 에 없는 kind 항목은 모두 지운다."""
+    from rtdb_cache import cached_get
+
+    index = cached_get(LINKS_PATH) or {}
+    updates = link_updates(kind, refs)
+    for bid_no, node in index.items():
+        entries = (node or {}).get(kind)
+        if kind == "bid":
+            if entries and _path(bid_no, kind, entries) not in updates:
+                updates[_path(bid_no, kind, entries)] = None
+            continue
+        for ref in entries or {}:
+            if _path(bid_no, kind, ref) not in updates:
+                updates[_path(bid_no, kind, ref)] = None
+    return updates
+
+
+# ── 전체 재구성 ───────────────────────────────────────
+def build_index(pre_specs: dict | None, order_plans: dict | None, ax_bids: dict | None,
+                bids: dict | None) -> dict[str, dict]:
+    """네 노드의 현재 값으로 색인 전체를 만든다. {공고번호: {kind: ...}}"""
+    from rtdb_bulk import iter_bids
+
+    index: dict[str, dict] = {}
+
+    def add(kind: str, ref: str, bid_nos):
+        for n in _norm_all(bid_nos):
+            node = index.setdefault(n, {})
+            if kind == "bid":
+                node["bid"] = ref
+            else:
+                node.setdefault(kind, {})[_safe_key(ref)] = True
+
+    for key, rec in (pre_specs or {}).items():
+        add("pre_spec", key, (rec or {}).get("bidNtceNos"))
+    for key, rec in (order_plans or {}).items():
+        add("order_plan", key, (rec or {}).get("bidNtceNos"))
+    for key, rec in (ax_bids or {}).items():
+        add("ax", key, [(rec or {}).get("bidNtceNo")])
+    for year, month, bid_id, rec in iter_bids(bids):
+        add("bid", f"{year}/{month}/{bid_id}", [(rec or {}).get("입찰공고번호") or bid_id])
+    return index
+
+
+def plan_rebuild(index: dict[str, dict], existing) -> "BulkPlan":
+    """색인을 index 로 교체하는 계획. existing 은 지금 /bid_links 의 공고번호들."""
+    from rtdb_bulk import BulkPlan
+
+    plan = BulkPlan("공고번호 색인 재구성")
+    root = LINKS_PATH.strip("/")
+    for bid_no, node in index.items():
+        plan.set(f"{root}/{bid_no}", node)
+    for bid_no in existing or ():
+        if bid_no not in index:
+            plan.delete(f"{root}/{bid_no}")
+    return plan
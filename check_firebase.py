@@ -119,14 +119,20 @@
 
 
 
-import firebase_admin
-from firebase_admin import credentials
-from firebase_admin import db
-import pandas as pd
 from datetime import datetime
 
+from rtdb_bulk import BulkPlan, apply_plan, iter_bids, rollback_plan
+
+# 새 필드 추가 시 기본값
+NEW_FIELD_DEFAULTS = {"유찰사유": "", "입찰공고번호": ""}
+
+# firebase_admin 은 import 만으로 수백 ms 가 들어 실제로 RTDB 를 쓰는 함수 안에서 불러온다.
+
 # Firebase 초기화
 def initialize_firebase():
+    import firebase_admin
+    from firebase_admin import credentials
+
     try:
         firebase_admin.get_app()
     except ValueError:
@@ -138,60 +144,46 @@ def initialize_firebase():
     print("Firebase 초기화 완료")
 
 # 새 필드 추가 함수
-def add_new_fields():
+def plan_new_fields(bids_data):
+    """빠진 필드만 채우는 변경 계획. 이미 있는 필드는 건드리지 않는다."""
+    plan = BulkPlan("새 필드 추가")
+    for year, month, bid_id, bid_info in iter_bids(bids_data):
+        if not isinstance(bid_info, dict):
+            continue
+        for field, default in NEW_FIELD_DEFAULTS.items():
+            if field not in bid_info:
+                plan.set(f"bids/{year}/{month}/{bid_id}/{field}", default)
+    return plan
+
+def add_new_fields(dry_run=False):
     # Firebase 초기화
     initialize_firebase()
+    from firebase_admin import db
     
-    # 데이터 참조 가져오기
-    bids_ref = db.reference('/bids')
-    
-    # 모든 데이터 가져오기
-    bids_data = bids_ref.get() or {}
+    # 전체 트리를 한 번 읽고, 빠진 필드를 모아 다중 경로 update 로 적용
+    bids_data = db.reference('/bids').get() or {}
+    plan = plan_new_fields(bids_data)
+    plan.print_diff()
     
-    # 각 데이터에 새 필드 추가
-    updated_count = 0
+    updated_count = len({path.rsplit('/', 1)[0] for path in plan.updates})
+    apply_plan(plan, dry_run=dry_run)
     
-    for year in bids_data:
-        for month in bids_data[year]:
-            for bid_id, bid_info in bids_data[year][month].items():
-                # 필드가 없는 경우에만 추가
-                updated = False
-                
-                if "유찰사유" not in bid_info:
-                    bid_info["유찰사유"] = ""
-                    updated = True
-                
-                if "입찰공고번호" not in bid_info:
-                    bid_info["입찰공고번호"] = ""
-                    updated = True
-                
-                # 변경된 경우만 업데이트
-                if updated:
-                    # 특정 입찰 항목의 참조 가져오기
-                    item_ref = db.reference(f'/bids/{year}/{month}/{bid_id}')
-                    # 업데이트
-                    item_ref.update({
-                        "유찰사유": bid_info["유찰사유"],
-                        "입찰공고번호": bid_info["입찰공고번호"]
-                    })
-                    updated_count += 1
-    
-    print(f"총 {updated_count}개 항목에 새 필드 추가 완료")
-
-# 실행
-if __name__ == "__main__":
-    add_new_fields()
+    if dry_run:
+        print(f"🧪 dry-run: {updated_count}개 항목에 새 필드 추가 예정")
+    else:
+        print(f"총 {updated_count}개 항목에 새 필드 추가 완료")
 
 
 
-    import firebase_admin
-from firebase_admin import credentials
-from firebase_admin import db
-from datetime import datetime
+import argparse
+import calendar
 import json
 
 # Firebase 초기화 함수
 def initialize_firebase():
+    import firebase_admin
+    from firebase_admin import credentials
+
     try:
         firebase_admin.get_app()
         print("✅ Firebase 이미 초기화됨")
@@ -206,92 +198,366 @@ def initialize_firebase():
             print("❌ Firebase 인증 파일을 찾을 수 없습니다.")
             raise
 
-def delete_recent_collection_data():
+# 공고번호 색인(/bid_links) 재구성
+def rebuild_links(dry_run=False):
+    from bid_links import LINKS_PATH, build_index, plan_rebuild
+    from prespec_collector import live_path
+
+    initialize_firebase()
+    from firebase_admin import db
+
+    # 네 노드를 한 번씩 읽어 색인 전체를 새로 만들고, 공고번호 단위로 교체
+    # 사전규격/발주계획은 포인터가 가리키는 현재 버전을 읽는다
+    paths = (live_path('/pre_specs'), live_path('/order_plans'), '/ax_bids', '/bids')
+    index = build_index(*(db.reference(path).get() for path in paths))
+    existing = db.reference(LINKS_PATH).get(shallow=True) or {}
+    plan = plan_rebuild(index, existing)
+    plan.print_diff()
+    apply_plan(plan, dry_run=dry_run)
+
+    removed = sum(1 for value in plan.updates.values() if value is None)
+    if dry_run:
+        print(f"🧪 dry-run: 공고번호 {len(index)}건 색인 예정, {removed}건 삭제 예정")
+    else:
+        print(f"🔗 공고번호 {len(index)}건 색인 완료, {removed}건 삭제")
+
+# 사전규격/발주계획/AX 레코드를 필드 투영 + 간결 인코딩으로 변환 (record_schema)
+def compact_records(dry_run=False):
+    from prespec_collector import live_path
+    from record_schema import SOURCE_PATHS, plan_compact
+
+    initialize_firebase()
+    from firebase_admin import db
+
+    def size(value):
+        return len(json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+    for source, path in SOURCE_PATHS.items():
+        path = live_path(path) if source != 'ax' else path
+        node = db.reference(path).get() or {}
+        plan = plan_compact(source, node, path)
+        before = sum(size(v) for v in node.values())
+        after = before + sum(size(v) - size(plan.before[p]) for p, v in plan.updates.items())
+        print(f"📦 {path}: {len(plan)}/{len(node)}건 변환, 약 {before // 1024}KB → {after // 1024}KB")
+        plan.print_diff(limit=5)
+        apply_plan(plan, dry_run=dry_run)
+
+# 단계 교체로 옮긴 뒤 남은 예전 사전규격/발주계획 단일 노드 삭제
+def drop_legacy_prespec(*, yes=False, dry_run=False):
+    """포인터({path}_current)가 있는 출처의 예전 단일 노드(/pre_specs, /order_plans)를 지운다.
+
+    대시보드가 포인터를 읽게 된 뒤에만 쓴다. PRESPEC_MIRROR_LEGACY 를 먼저 0 으로 끄지
+    않으면 다음 수집이 노드를 다시 만든다.
+    """
+    from prespec_collector import MIRROR_LEGACY, PLAN_PATH, SPEC_PATH, live_path
+
+    initialize_firebase()
+    from firebase_admin import db
+
+    if MIRROR_LEGACY:
+        print("⚠️ PRESPEC_MIRROR_LEGACY 가 켜져 있어 다음 수집이 예전 노드를 다시 만듭니다.")
+    plan = BulkPlan("예전 사전규격/발주계획 단일 노드 삭제")
+    for path in (SPEC_PATH, PLAN_PATH):
+        live = live_path(path)
+        if live == path:
+            print(f"⏭️ {path}_current 포인터가 없어 {path} 가 아직 현재 노드입니다. 건너뜁니다.")
+            continue
+        count = len(db.reference(path).get(shallow=True) or {})
+        if count:
+            print(f"🗑️ {path}: {count}건 (현재 데이터는 {live})")
+            plan.delete(path.strip('/'))
+    if not plan:
+        print("⚠️ 지울 예전 노드가 없습니다.")
+        return False
+    if dry_run:
+        apply_plan(plan, dry_run=True)
+        return False
+    if not yes:
+        try:
+            confirm = input(f"삭제하려면 '{CONFIRM_DELETE}'를 입력하세요: ")
+        except EOFError:
+            confirm = ''
+        if confirm != CONFIRM_DELETE:
+            print("❌ 삭제가 취소되었습니다. (자동화에서는 --yes 를 붙이세요)")
+            return False
+    apply_plan(plan)
+    print("✅ 예전 노드 삭제 완료")
+    return True
+
+# 확인 문구
+CONFIRM_DELETE = 'DELETE'
+CONFIRM_DELETE_ALL = 'DELETE_ALL'
+CONFIRM_ROLLBACK = 'ROLLBACK'
+
+def load_delete_snapshot():
+    """삭제 계획에 필요한 트리를 한 번씩만 읽는다. user_inputs 는 키만(shallow)."""
+    from firebase_admin import db
+    bids_data = db.reference('/bids').get() or {}
+    user_input_keys = set(db.reference('/user_inputs').get(shallow=True) or {})
+    return bids_data, user_input_keys
+
+def plan_delete_bids(bids_data, user_input_keys, bid_ids):
+    """bid_id 목록 삭제 계획. 찾지 못한 bid_id 목록도 함께 돌려준다."""
+    wanted = set(bid_ids)
+    plan = BulkPlan("입찰공고 삭제")
+    found = set()
+    for year, month, bid_id, bid_info in iter_bids(bids_data):
+        if bid_id in wanted and bid_id not in found:
+            plan.delete(f"bids/{year}/{month}/{bid_id}", before=(bid_info or {}).get('공고명'))
+            found.add(bid_id)
+    for bid_id in found & user_input_keys:
+        plan.delete(f"user_inputs/{bid_id}")
+    not_found = [bid_id for bid_id in bid_ids if bid_id not in found]
+    return plan, not_found
+
+def plan_delete_run_refs(result_data, user_input_keys):
+    """새 결과 파일(keyword_bids) 삭제 계획. 참조가 곧 /bids 아래 경로라 트리를 읽지 않는다."""
+    plan = BulkPlan("실행 결과 삭제")
+    for keyword, refs in (result_data.get('keyword_bids') or {}).items():
+        if keyword == 'AX':     # AX 참조는 /ax_bids 키 (rollback 으로 되돌린다)
+            continue
+        for ref in refs:
+            if ref.count('/') != 2:
+                continue
+            title = (result_data.get('bids') or {}).get(ref, {}).get('공고명')
+            plan.delete(f"bids/{ref}", before=title)
+            bid_id = ref.rsplit('/', 1)[1]
+            if bid_id in user_input_keys:
+                plan.delete(f"user_inputs/{bid_id}")
+    return plan, []
+
+def plan_delete_run(result_data, bids_data, user_input_keys):
+    """예전 결과 파일(bid_details)로 삭제 계획을 세운다.
+
+    입찰공고번호가 기록된 항목은 번호로 찾고, 번호가 없으면 전체 트리에서
+    공고명+채권자명으로 찾는다.
+    """
+    bid_ids = []
+    unnamed = []
+    for detail in result_data.get('bid_details', []):
+        bid_no = detail.get('입찰공고번호')
+        if bid_no:
+            bid_ids.append(bid_no)
+        else:
+            unnamed.append(detail)
+
+    if unnamed:
+        index = {
+            (bid_info.get('공고명'), bid_info.get('채권자명')): bid_id
+            for _, _, bid_id, bid_info in iter_bids(bids_data) if isinstance(bid_info, dict)
+        }
+        for detail in unnamed:
+            bid_id = index.get((detail.get('공고명'), detail.get('채권자명')))
+            bid_ids.append(bid_id or detail.get('공고명'))
+
+    return plan_delete_bids(bids_data, user_input_keys, list(dict.fromkeys(bid_ids)))
+
+def _parse_day(value, end=False):
+    """'YYYY-MM-DD' 또는 'YYYY-MM'. 월만 주면 시작은 1일, 끝은 말일."""
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        first = datetime.strptime(value, '%Y-%m').date()
+        if not end:
+            return first
+        return first.replace(day=calendar.monthrange(first.year, first.month)[1])
+
+def _iter_months(start, end):
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        yield year, month
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+def plan_delete_date_range(start, end):
+    """입찰일시 기준 기간 삭제 계획. 달 전체가 기간에 들면 월 노드를 통째로 지운다."""
+    from firebase_admin import db
+
+    plan = BulkPlan(f"{start} ~ {end} 삭제")
+    bid_ids = []
+    for year, month in _iter_months(start, end):
+        month_path = f"bids/{year}/{month:02d}"
+        last_day = calendar.monthrange(year, month)[1]
+        whole_month = (start <= datetime(year, month, 1).date()
+                       and datetime(year, month, last_day).date() <= end)
+
+        if whole_month:
+            # 키만 있으면 되므로 shallow 로 읽는다
+            month_keys = db.reference(month_path).get(shallow=True) or {}
+            if month_keys:
+                plan.delete(month_path, before=f"{len(month_keys)}건")
+                bid_ids.extend(month_keys)
+            continue
+
+        month_data = db.reference(month_path).get() or {}
+        for bid_id, bid_info in month_data.items():
+            day = str((bid_info or {}).get('입찰일시', ''))[:10]
+            if str(start) <= day <= str(end):
+                plan.delete(f"{month_path}/{bid_id}", before=(bid_info or {}).get('공고명'))
+                bid_ids.append(bid_id)
+
+    user_input_keys = set(db.reference('/user_inputs').get(shallow=True) or {})
+    for bid_id in user_input_keys.intersection(bid_ids):
+        plan.delete(f"user_inputs/{bid_id}")
+    return plan, len(bid_ids)
+
+def _print_delete_counts(plan, bid_count=None):
+    if bid_count is None:
+        bid_count = sum(1 for path in plan.updates if path.startswith('bids/'))
+    deleted_user_inputs = sum(1 for path in plan.updates if path.startswith('user_inputs/'))
+    print(f"🗑️ bids 삭제: {bid_count}건")
+    print(f"🗑️ user_inputs 삭제: {deleted_user_inputs}건")
+
+def _run_delete_plan(plan, *, token, yes, dry_run, bid_count=None):
+    """계획 출력 → 확인 → 적용. 적용했으면 True."""
+    plan.print_diff()
+    if not plan:
+        print("⚠️ 삭제할 항목을 찾지 못했습니다.")
+        return False
+
+    if dry_run:
+        apply_plan(plan, dry_run=True)
+        print("\n🧪 dry-run 완료 (삭제 예정)")
+        _print_delete_counts(plan, bid_count)
+        return False
+
+    if not yes:
+        print("\n⚠️ 위 데이터들을 정말로 삭제하시겠습니까?")
+        print("⚠️ 이 작업은 되돌릴 수 없습니다!")
+        try:
+            confirm = input(f"삭제하려면 '{token}'를 입력하세요: ")
+        except EOFError:
+            confirm = ''
+        if confirm != token:
+            print("❌ 삭제가 취소되었습니다. (자동화에서는 --yes 를 붙이세요)")
+            return False
+
+    apply_plan(plan)
+    print("\n✅ 삭제 완료!")
+    _print_delete_counts(plan, bid_count)
+    return True
+
+def _print_not_found(not_found, limit=10):
+    if not not_found:
+        return
+    print(f"⚠️ 찾을 수 없었던 항목: {len(not_found)}건")
+    for nf in not_found[:limit]:
+        print(f"  - {nf}")
+    if len(not_found) > limit:
+        print(f"  ... 외 {len(not_found) - limit}건 더")
+
+# ── 비대화형 삭제 (CLI / 자동화) ─────────────────────
+def delete_bid_ids(bid_ids, *, yes=False, dry_run=False):
+    """입찰공고번호 목록 삭제. 읽기 1회(bids + user_inputs 키), 쓰기는 청크 다중 경로 update."""
+    initialize_firebase()
+    bids_data, user_input_keys = load_delete_snapshot()
+    plan, not_found = plan_delete_bids(bids_data, user_input_keys, bid_ids)
+    applied = _run_delete_plan(plan, token=CONFIRM_DELETE, yes=yes, dry_run=dry_run)
+    _print_not_found(not_found)
+    return applied
+
+def delete_run(result_path='collection_result.json', *, yes=False, dry_run=False):
+    """collection_result.json 에 기록된 실행 결과 삭제."""
+    with open(result_path, 'r', encoding='utf-8') as f:
+        result_data = json.load(f)
+
+    print(f"📄 {result_path} 로드 완료")
+    print(f"📊 삭제 대상: {result_data['total_count']}건")
+    print(f"📅 수집 시간: {result_data['collection_date']}")
+
+    initialize_firebase()
+    if 'keyword_bids' in result_data:
+        from firebase_admin import db
+        user_input_keys = set(db.reference('/user_inputs').get(shallow=True) or {})
+        plan, not_found = plan_delete_run_refs(result_data, user_input_keys)
+    else:
+        bids_data, user_input_keys = load_delete_snapshot()
+        plan, not_found = plan_delete_run(result_data, bids_data, user_input_keys)
+    applied = _run_delete_plan(plan, token=CONFIRM_DELETE, yes=yes, dry_run=dry_run)
+    _print_not_found(not_found)
+    return applied
+
+def delete_date_range(start, end, *, yes=False, dry_run=False):
+    """입찰일시가 start ~ end (양끝 포함) 인 데이터 삭제."""
+    start, end = _parse_day(start), _parse_day(end, end=True)
+    if start > end:
+        raise ValueError(f"시작일이 종료일보다 늦습니다: {start} > {end}")
+
+    initialize_firebase()
+    plan, bid_count = plan_delete_date_range(start, end)
+    print(f"📊 삭제 대상: {bid_count}건")
+    return _run_delete_plan(plan, token=CONFIRM_DELETE_ALL, yes=yes, dry_run=dry_run,
+                            bid_count=bid_count)
+
+def rollback_run(result_path='collection_result.json', *, yes=False, dry_run=False):
+    """collection_result.json 의 manifest 대로 실행을 되돌린다. 읽기 없이 다중 경로 update 한 번.
+
+    - 새로 만든 경로는 삭제, 갱신·삭제한 경로는 이전 값으로 복원 (manifest 의 writes)
+    - /bids, /user_inputs 뿐 아니라 /ax_bids(이전 차수 삭제 포함), /ax_meta/ordinals,
+      사전규격/발주계획 레코드·포인터, 의견마감·공고번호 색인도 수집기가 남긴 이전 값으로 돌린다
+    - 사전규격 전체 수집은 포인터를 직전 버전으로 돌린다 (직전 버전은 정리하지 않고 남긴다)
+    """
+    with open(result_path, 'r', encoding='utf-8') as f:
+        result_data = json.load(f)
+
+    manifest = result_data.get('manifest')
+    if not manifest:
+        print(f"❌ {result_path} 에 manifest 가 없습니다. delete-run 을 쓰세요.")
+        return False
+
+    print(f"📄 {result_path} 로드 완료 (수집 시간: {result_data.get('collection_date')})")
+    keys = manifest.get('keys') or {}
+    if keys.get('ax_bids') and not any(w['path'].startswith('ax_bids/') for w in manifest.get('writes') or []):
+        # 이전 값을 남기기 전의 매니페스트. 키만으로 지우면 이미 있던 문서까지 지워진다
+        print(f"ℹ️ ax_bids: {len(keys['ax_bids'])}건은 이전 값이 없는 매니페스트라 되돌리지 않습니다 (기록만)")
+
+    initialize_firebase()
+    plan = rollback_plan(manifest)
+    plan.print_diff()
+    if not plan:
+        print("⚠️ 되돌릴 경로가 없습니다.")
+        return False
+    if dry_run:
+        apply_plan(plan, dry_run=True)
+        return False
+    if not yes:
+        print("\n⚠️ 위 경로들을 실행 이전 상태로 되돌리시겠습니까?")
+        try:
+            confirm = input(f"되돌리려면 '{CONFIRM_ROLLBACK}'을 입력하세요: ")
+        except EOFError:
+            confirm = ''
+        if confirm != CONFIRM_ROLLBACK:
+            print("❌ 롤백이 취소되었습니다. (자동화에서는 --yes 를 붙이세요)")
+            return False
+
+    apply_plan(plan)
+    print(f"\n✅ 롤백 완료! ({len(plan)}개 경로)")
+    return True
+
+# ── 대화형 메뉴 ────────────────────────────────────
+def delete_recent_collection_data(dry_run=False):
     """방금 수집한 데이터들을 삭제하는 함수"""
     
     print("🗑️ 최근 수집 데이터 삭제를 시작합니다...")
     
-    # Firebase 초기화
-    initialize_firebase()
-    
-    # collection_result.json에서 방금 수집한 데이터 정보 읽기
     try:
         with open('collection_result.json', 'r', encoding='utf-8') as f:
             result_data = json.load(f)
-            
-        print(f"📄 collection_result.json 로드 완료")
-        print(f"📊 삭제 대상: {result_data['total_count']}건")
-        print(f"📅 수집 시간: {result_data['collection_date']}")
-        
-        # 키워드별 현황 출력
-        print("\n🎯 키워드별 삭제 대상:")
-        for keyword, count in result_data['keyword_results'].items():
-            print(f"  • {keyword}: {count}건")
-            
     except FileNotFoundError:
         print("❌ collection_result.json 파일을 찾을 수 없습니다.")
         print("💡 수동으로 삭제할 입찰공고번호들을 입력해주세요.")
-        return manual_delete()
-    
-    # 사용자 확인
-    print(f"\n⚠️ 위 데이터들을 정말로 삭제하시겠습니까?")
-    print("⚠️ 이 작업은 되돌릴 수 없습니다!")
-    confirm = input("삭제하려면 'DELETE'를 입력하세요: ")
-    
-    if confirm != 'DELETE':
-        print("❌ 삭제가 취소되었습니다.")
-        return
-    
-    # Firebase 참조
-    bids_ref = db.reference('/bids')
-    user_inputs_ref = db.reference('/user_inputs')
-    
-    deleted_bids = 0
-    deleted_user_inputs = 0
-    failed_deletes = []
-    
-    # bid_details에서 입찰공고번호 추출하여 삭제
-    for detail in result_data.get('bid_details', []):
-        # 입찰공고번호는 공고명에서 추출하거나 별도로 저장되어야 함
-        # 일단 2025-05 월에서 해당 공고명으로 검색해서 삭제
-        try:
-            # 2025년 5월 데이터에서 검색
-            may_data = bids_ref.child('2025').child('05').get() or {}
-            
-            for bid_id, bid_info in may_data.items():
-                if (bid_info.get('공고명') == detail['공고명'] and 
-                    bid_info.get('채권자명') == detail['채권자명']):
-                    
-                    # bids에서 삭제
-                    bids_ref.child('2025').child('05').child(bid_id).delete()
-                    deleted_bids += 1
-                    print(f"🗑️ bids 삭제: {bid_id} - {detail['공고명']}")
-                    
-                    # user_inputs에서도 삭제
-                    user_input_data = user_inputs_ref.child(bid_id).get()
-                    if user_input_data:
-                        user_inputs_ref.child(bid_id).delete()
-                        deleted_user_inputs += 1
-                        print(f"🗑️ user_inputs 삭제: {bid_id}")
-                    
-                    break
-        except Exception as e:
-            print(f"⚠️ 삭제 중 오류: {detail['공고명']} - {e}")
-            failed_deletes.append(detail['공고명'])
+        return manual_delete(dry_run=dry_run)
     
-    # 결과 출력
-    print(f"\n✅ 삭제 완료!")
-    print(f"🗑️ bids 삭제: {deleted_bids}건")
-    print(f"🗑️ user_inputs 삭제: {deleted_user_inputs}건")
+    # 키워드별 현황 출력
+    print("\n🎯 키워드별 삭제 대상:")
+    for keyword, count in result_data['keyword_results'].items():
+        print(f"  • {keyword}: {count}건")
     
-    if failed_deletes:
-        print(f"⚠️ 삭제 실패: {len(failed_deletes)}건")
-        for failed in failed_deletes[:10]:  # 최대 10개만 출력
-            print(f"  - {failed}")
-        if len(failed_deletes) > 10:
-            print(f"  ... 외 {len(failed_deletes) - 10}건 더")
-
-def manual_delete():
+    try:
+        delete_run('collection_result.json', dry_run=dry_run)
+    except Exception as e:
+        print(f"❌ 삭제 중 오류 발생: {e}")
+
+def manual_delete(dry_run=False):
     """수동으로 입찰공고번호를 입력받아 삭제하는 함수"""
     
     print("\n📝 삭제할 입찰공고번호들을 입력해주세요 (쉼표로 구분):")
@@ -313,128 +579,26 @@ def manual_delete():
     for bid in bid_list:
         print(f"  - {bid}")
     
-    # 사용자 확인
-    confirm = input(f"\n위 {len(bid_list)}개 항목을 삭제하시겠습니까? (DELETE 입력): ")
-    if confirm != 'DELETE':
-        print("❌ 삭제가 취소되었습니다.")
-        return
-    
-    # Firebase 초기화
-    initialize_firebase()
-    
-    # Firebase 참조
-    bids_ref = db.reference('/bids')
-    user_inputs_ref = db.reference('/user_inputs')
-    
-    deleted_bids = 0
-    deleted_user_inputs = 0
-    not_found = []
-    
-    for bid_id in bid_list:
-        try:
-            # 모든 연도/월에서 해당 bid_id 찾기
-            found = False
-            years_data = bids_ref.get() or {}
-            
-            for year, months in years_data.items():
-                for month, bids in months.items():
-                    if bid_id in bids:
-                        # bids에서 삭제
-                        bids_ref.child(year).child(month).child(bid_id).delete()
-                        deleted_bids += 1
-                        print(f"🗑️ bids 삭제: {bid_id} ({year}-{month})")
-                        found = True
-                        break
-                if found:
-                    break
-            
-            if not found:
-                not_found.append(bid_id)
-                print(f"⚠️ 찾을 수 없음: {bid_id}")
-                continue
-            
-            # user_inputs에서도 삭제
-            user_input_data = user_inputs_ref.child(bid_id).get()
-            if user_input_data:
-                user_inputs_ref.child(bid_id).delete()
-                deleted_user_inputs += 1
-                print(f"🗑️ user_inputs 삭제: {bid_id}")
-                
-        except Exception as e:
-            print(f"⚠️ 삭제 중 오류: {bid_id} - {e}")
-            not_found.append(bid_id)
-    
-    # 결과 출력
-    print(f"\n✅ 수동 삭제 완료!")
-    print(f"🗑️ bids 삭제: {deleted_bids}건")
-    print(f"🗑️ user_inputs 삭제: {deleted_user_inputs}건")
-    
-    if not_found:
-        print(f"⚠️ 찾을 수 없었던 항목: {len(not_found)}건")
-        for nf in not_found:
-            print(f"  - {nf}")
+    try:
+        delete_bid_ids(bid_list, dry_run=dry_run)
+    except Exception as e:
+        print(f"❌ 삭제 중 오류 발생: {e}")
 
-def delete_by_date_range():
+def delete_by_date_range(dry_run=False):
     """날짜 범위로 데이터를 삭제하는 함수"""
     
     print("\n📅 날짜 범위로 삭제하기")
-    print("방금 수집한 데이터는 2025-05 (5월)에 있습니다.")
+    print("형식: YYYY-MM-DD 또는 YYYY-MM (월 전체)")
     
-    year = input("연도 입력 (예: 2025): ").strip() or "2025"
-    month = input("월 입력 (예: 05): ").strip() or "05"
-    
-    # 사용자 확인
-    print(f"\n⚠️ {year}년 {month}월의 모든 데이터를 삭제하시겠습니까?")
-    print("⚠️ 이 작업은 되돌릴 수 없습니다!")
-    confirm = input("삭제하려면 'DELETE_ALL'을 입력하세요: ")
-    
-    if confirm != 'DELETE_ALL':
-        print("❌ 삭제가 취소되었습니다.")
-        return
-    
-    # Firebase 초기화
-    initialize_firebase()
-    
-    # Firebase 참조
-    bids_ref = db.reference('/bids')
-    user_inputs_ref = db.reference('/user_inputs')
+    start = input("시작 (예: 2025-05): ").strip() or "2025-05"
+    end = input(f"종료 (엔터 = {start}): ").strip() or start
     
     try:
-        # 해당 연도/월 데이터 가져오기
-        month_data = bids_ref.child(year).child(month).get() or {}
-        
-        if not month_data:
-            print(f"⚠️ {year}년 {month}월 데이터가 없습니다.")
-            return
-        
-        print(f"📊 삭제 대상: {len(month_data)}건")
-        
-        # 모든 bid_id 수집
-        bid_ids = list(month_data.keys())
-        
-        # bids에서 해당 월 전체 삭제
-        bids_ref.child(year).child(month).delete()
-        print(f"🗑️ {year}년 {month}월 bids 데이터 전체 삭제 완료")
-        
-        # user_inputs에서도 해당 bid_id들 삭제
-        deleted_user_inputs = 0
-        for bid_id in bid_ids:
-            try:
-                user_input_data = user_inputs_ref.child(bid_id).get()
-                if user_input_data:
-                    user_inputs_ref.child(bid_id).delete()
-                    deleted_user_inputs += 1
-            except Exception as e:
-                print(f"⚠️ user_inputs 삭제 중 오류: {bid_id} - {e}")
-        
-        print(f"✅ 삭제 완료!")
-        print(f"🗑️ bids 삭제: {len(month_data)}건")
-        print(f"🗑️ user_inputs 삭제: {deleted_user_inputs}건")
-        
+        delete_date_range(start, end, dry_run=dry_run)
     except Exception as e:
         print(f"❌ 삭제 중 오류 발생: {e}")
 
-def main():
+def interactive_menu():
     print("🗑️ G2B 데이터 삭제 도구")
     print("=" * 30)
     
@@ -442,8 +606,9 @@ def main():
     print("1. collection_result.json 기반 삭제 (방금 수집한 데이터)")
     print("2. 입찰공고번호 수동 입력 삭제")
     print("3. 날짜 범위 전체 삭제 (위험!)")
+    print("4. 새 필드 추가 (마이그레이션)")
     
-    choice = input("\n선택 (1-3): ").strip()
+    choice = input("\n선택 (1-4): ").strip()
     
     if choice == "1":
         delete_recent_collection_data()
@@ -451,8 +616,66 @@ def main():
         manual_delete()
     elif choice == "3":
         delete_by_date_range()
+    elif choice == "4":
+        add_new_fields()
     else:
         print("❌ 잘못된 선택입니다.")
 
+def parse_cli_arguments(argv=None):
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--yes', '-y', action='store_true', help='확인 입력 없이 바로 적용')
+    common.add_argument('--dry-run', action='store_true', help='변경 계획만 출력하고 적용하지 않음')
+
+    parser = argparse.ArgumentParser(
+        description='G2B Firebase 데이터 관리 도구. 하위 명령 없이 실행하면 대화형 메뉴.')
+    sub = parser.add_subparsers(dest='command')
+
+    p = sub.add_parser('delete-ids', parents=[common], help='입찰공고번호로 삭제')
+    p.add_argument('bid_ids', nargs='+', help='입찰공고번호 (공백 또는 쉼표 구분)')
+
+    p = sub.add_parser('delete-run', parents=[common], help='collection_result.json 의 실행 결과 삭제')
+    p.add_argument('--result', default='collection_result.json', help='결과 파일 경로')
+
+    p = sub.add_parser('delete-range', parents=[common], help='입찰일시 기간으로 삭제')
+    p.add_argument('--start', required=True, help='YYYY-MM-DD 또는 YYYY-MM')
+    p.add_argument('--end', help='YYYY-MM-DD 또는 YYYY-MM (기본: --start 와 같음)')
+
+    p = sub.add_parser('rollback', parents=[common], help='collection_result.json 의 manifest 대로 실행 되돌리기')
+    p.add_argument('--result', default='collection_result.json', help='결과 파일 경로')
+
+    sub.add_parser('add-fields', parents=[common], help='빠진 유찰사유/입찰공고번호 필드 추가')
+
+    sub.add_parser('rebuild-links', parents=[common], help='공고번호 색인(/bid_links) 재구성')
+
+    sub.add_parser('compact-records', parents=[common], help='사전규격/발주계획/AX 레코드 필드 투영 + 간결 인코딩')
+
+    sub.add_parser('drop-legacy-prespec', parents=[common],
+                   help='포인터로 옮긴 뒤 남은 예전 /pre_specs, /order_plans 노드 삭제')
+
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_cli_arguments(argv)
+
+    if args.command is None:
+        interactive_menu()
+    elif args.command == 'delete-ids':
+        bid_ids = [b.strip() for arg in args.bid_ids for b in arg.split(',') if b.strip()]
+        delete_bid_ids(bid_ids, yes=args.yes, dry_run=args.dry_run)
+    elif args.command == 'delete-run':
+        delete_run(args.result, yes=args.yes, dry_run=args.dry_run)
+    elif args.command == 'delete-range':
+        delete_date_range(args.start, args.end or args.start, yes=args.yes, dry_run=args.dry_run)
+    elif args.command == 'rollback':
+        rollback_run(args.result, yes=args.yes, dry_run=args.dry_run)
+    elif args.command == 'add-fields':
+        add_new_fields(dry_run=args.dry_run)
+    elif args.command == 'rebuild-links':
+        rebuild_links(dry_run=args.dry_run)
+    elif args.command == 'compact-records':
+        compact_records(dry_run=args.dry_run)
+    elif args.command == 'drop-legacy-prespec':
+        drop_legacy_prespec(yes=args.yes, dry_run=args.dry_run)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,172 @@
+"""
+main.main() 실행 체크포인트.
+
+키워드 루프 도중 작업이 죽으면(Actions 타임아웃, API 장애, Firebase 오류) 다음 실행이
+처음부터 모든 키워드·낙찰조회·업로드를 다시 한다. 키워드 하나, 보강 몇 건마다
+진행 상황을 저장해 두고 `main.py --resume` 이 완료된 일을 건너뛰게 한다.
+
+저장 내용:
+  run_key          조회 기간 + 모드. 다르면 이전 상태를 버린다(다른 실행이므로)
+  done_keywords    업로드까지 끝난 키워드와 리포트 항목 ({ref, 공고명, 채권자명}. 레코드 전체가 아니다)
+  enriched         공고번호별 낙찰금액/개찰업체정보/유찰사유
+  stages           AX / 사전규격 단계 결과
+
+저장소:
+  file (기본) : CHECKPOINT_PATH (기본 run_checkpoint.json)
+  rtdb        : /run_checkpoint. Actions 는 실행마다 작업 디렉터리가 새로 만들어지므로
+                재시도에서 이어 받으려면 CHECKPOINT_BACKEND=rtdb 로 둔다.
+
+업로드는 중복 판별(입찰일시+공고명)이 있어 같은 건을 다시 올려도 결과가 같다.
+키워드 수집은 묶음 단위로 흘려 보내며 바로 업로드하므로(pipeline.py) 도중에 죽은 키워드는
+처음부터 다시 수집한다. 보강 캐시가 남아 있어 낙찰/개찰 조회는 반복하지 않는다.
+"""
+
+import json
+import os
+import threading
+
+CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", "run_checkpoint.json")
+CHECKPOINT_BACKEND = os.getenv("CHECKPOINT_BACKEND", "file").lower()
+RTDB_CHECKPOINT_PATH = "/run_checkpoint"
+
+# 보강(낙찰/개찰 조회)은 건당 API 2~4회라 자주 저장할 가치가 있다. 매 건 저장하면
+# rtdb 저장소에서 쓰기가 너무 잦아 10건마다 묶는다.
+ENRICH_SAVE_EVERY = 10
+
+
+def _empty_state(run_key: str) -> dict:
+    return {
+        "run_key": run_key,
+        "done_keywords": [],
+        "enriched": {},
+        "stages": {},
+    }
+
+
+class RunCheckpoint:
+    def __init__(self, run_key: str, state: dict | None = None, backend: str = CHECKPOINT_BACKEND,
+                 path: str = CHECKPOINT_PATH):
+        self.run_key = run_key
+        self.backend = backend
+        self.path = path
+        self.state = state or _empty_state(run_key)
+        self._unsaved_enrichments = 0
+        # 카테고리/보강을 병렬로 돌리면 여러 스레드가 상태를 고치고 저장한다
+        self._lock = threading.RLock()
+
+    # ── 열기 / 저장 / 정리 ───────────────────────────
+    @classmethod
+    def open(cls, run_key: str, resume: bool = False, backend: str = CHECKPOINT_BACKEND,
+             path: str = CHECKPOINT_PATH) -> "RunCheckpoint":
+        """resume 이면 같은 run_key 의 이전 상태를 이어 받고, 아니면 새로 시작한다."""
+        checkpoint = cls(run_key, backend=backend, path=path)
+        if not resume:
+            return checkpoint
+
+        try:
+            saved = checkpoint._read()
+        except Exception as e:
+            print(f"⚠️ 체크포인트 읽기 실패, 처음부터 실행합니다: {e}")
+            return checkpoint
+
+        if not saved:
+            print("ℹ️ 이어 받을 체크포인트가 없습니다. 처음부터 실행합니다.")
+        elif saved.get("run_key") != run_key:
+            print(f"ℹ️ 체크포인트 실행 키가 다릅니다({saved.get('run_key')} ≠ {run_key}). 처음부터 실행합니다.")
+        else:
+            state = _empty_state(run_key)
+            state.update({k: v for k, v in saved.items() if v is not None})
+            checkpoint.state = state
+            print(f"🔁 체크포인트 이어 받기: 완료 키워드 {len(state['done_keywords'])}개, "
+                  f"보강 캐시 {len(state['enriched'])}건, 완료 단계 {sorted(state['stages'])}")
+        return checkpoint
+
+    def _read(self) -> dict | None:
+        if self.backend == "rtdb":
+            from main import initialize_firebase
+            from firebase_admin import db
+
+            initialize_firebase()
+            return db.reference(RTDB_CHECKPOINT_PATH).get()
+
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save(self):
+        with self._lock:
+            self._save()
+
+    def _save(self):
+        self._unsaved_enrichments = 0
+        try:
+            if self.backend == "rtdb":
+                from main import initialize_firebase
+                from firebase_admin import db
+
+                initialize_firebase()
+                db.reference(RTDB_CHECKPOINT_PATH).set(self.state)
+                return
+
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.state, f, ensure_ascii=False)
+            os.replace(tmp, self.path)    # 쓰다 죽어도 이전 체크포인트는 온전하다
+        except Exception as e:
+            # 체크포인트는 보조 수단이라 저장 실패로 수집 자체를 멈추지 않는다.
+            print(f"⚠️ 체크포인트 저장 실패 (무시하고 계속): {e}")
+
+    def clear(self):
+        """실행이 끝까지 성공하면 지운다. 다음 --resume 은 처음부터 시작한다."""
+        try:
+            if self.backend == "rtdb":
+                from firebase_admin import db
+
+                db.reference(RTDB_CHECKPOINT_PATH).delete()
+            elif os.path.exists(self.path):
+                os.remove(self.path)
+        except Exception as e:
+            print(f"⚠️ 체크포인트 정리 실패 (무시하고 계속): {e}")
+
+    # ── 키워드 ─────────────────────────────────────
+    def _find(self, bucket: str, keyword: str) -> dict | None:
+        for entry in self.state.get(bucket) or []:
+            if entry.get("keyword") == keyword:
+                return entry
+        return None
+
+    def keyword_items(self, keyword: str) -> list[dict] | None:
+        """업로드까지 끝난 키워드면 그 리포트 항목, 아니면 None."""
+        entry = self._find("done_keywords", keyword)
+        return None if entry is None else list(entry.get("items") or [])
+
+    def mark_keyword_done(self, keyword: str, items: list[dict]):
+        """items 는 리포트 항목 [{ref, 공고명, 채권자명}, ...]."""
+        with self._lock:
+            self.state["done_keywords"] = [
+                e for e in self.state.get("done_keywords") or [] if e.get("keyword") != keyword
+            ] + [{"keyword": keyword, "items": items}]
+            self.save()
+
+    # ── 보강 캐시 ───────────────────────────────────
+    def cached_enrichment(self, bid_no: str) -> dict | None:
+        return (self.state.get("enriched") or {}).get(bid_no)
+
+    def remember_enrichment(self, bid_no: str, fields: dict):
+        if not bid_no:
+            return
+        with self._lock:
+            self.state.setdefault("enriched", {})[bid_no] = fields
+            self._unsaved_enrichments += 1
+            if self._unsaved_enrichments >= ENRICH_SAVE_EVERY:
+                self.save()
+
+    # ── 단계 ───────────────────────────────────────
+    def stage_result(self, name: str) -> dict | None:
+        return (self.state.get("stages") or {}).get(name)
+
+    def mark_stage(self, name: str, result: dict):
+        with self._lock:
+            self.state.setdefault("stages", {})[name] = result
+            self.save()
@@ -80,13 +80,30 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+
 # API 키 설정 (필수)
-BID_API_KEY = os.getenv("BID_API_KEY")
-if not BID_API_KEY:
-    raise RuntimeError(
-        "환경변수 'BID_API_KEY'가 설정되어 있지 않습니다. "
-        "로컬은 .env에 BID_API_KEY를 넣고, GitHub Actions는 Secrets에 BID_API_KEY를 등록해 주세요."
-    )
+# import 시점에 검사하면 RTDB 만 만지는 도구(check_firebase 등)까지 키 없이는 못 띄운다.
+# 실제로 API 를 부를 때 처음 읽고, 그때 없으면 실패시킨다.
+def get_api_key(required: bool = True) -> str | None:
+    """BID_API_KEY 를 읽는다. required=False 면 없을 때 예외 대신 None.
+
+    없을 때의 예외는 G2B_AUTH_ERROR 로 시작한다. 수집 함수들은 다른 오류는 0건으로 넘기고
+    이 접두어만 다시 올리므로, 키가 빠진 실행이 "0건 성공"으로 끝나지 않는다.
+    """
+    key = os.getenv("BID_API_KEY")
+    if not key and required:
+        raise RuntimeError(
+            "G2B_AUTH_ERROR: 환경변수 'BID_API_KEY'가 설정되어 있지 않습니다. "
+            "로컬은 .env에 BID_API_KEY를 넣고, GitHub Actions는 Secrets에 BID_API_KEY를 등록해 주세요."
+        )
+    return key
+
+
+def __getattr__(name):
+    # `config.BID_API_KEY` 로 접근하던 코드 호환 (접근 시점에 지연 평가)
+    if name == "BID_API_KEY":
+        return get_api_key()
+    raise AttributeError(f"module 'config' has no attribute {name!r}")
 
 
 def _now_kst() -> datetime:
@@ -123,14 +140,87 @@ else:
         days_back = 3
     start_date, end_date = get_date_range(days_back=days_back)
 
-# 사용할 입찰 API 목록 (현재는 '용역' 카테고리 기준)
-BID_ENDPOINTS = [
+# 입찰공고 → 저장 레코드 필드 매핑 (data_processor.to_bid_record 가 쓴다)
+# 값은 API 필드 후보 목록. 앞에서부터 처음으로 값이 있는 필드를 쓴다.
+# "사업금액"만 예외로 나열한 필드를 모두 더한다 (추정가격 + 부가세).
+DEFAULT_FIELD_MAP = {
+    "입찰일시": ("bidNtceDt",),
+    "공고명": ("bidNtceNm",),
+    "채권자명": ("crdtrNm",),
+    "사업금액": ("presmptPrce", "VAT"),
+    "입찰공고번호": ("bidNtceNo",),
+    "입찰공고URL": ("bidNtceDtlUrl",),
+}
+
+# 물품/공사/외자 응답에는 crdtrNm 이 비어 있는 경우가 많아 수요기관 → 공고기관 순으로 본다
+_AGENCY_FIELD_MAP = {**DEFAULT_FIELD_MAP, "채권자명": ("dminsttNm", "ntceInsttNm")}
+
+# 사용할 입찰 API 목록 (카테고리별)
+#   path        입찰공고 목록 오퍼레이션
+#   kind        낙찰/개찰 조회 오퍼레이션 접미사 (scsbid_client: getScsbidListSttus{kind} 등)
+#   fields      저장 레코드 필드 매핑
+#   concurrency 이 카테고리의 낙찰/개찰 보강을 동시에 몇 건씩 할지
+#   rate_per_sec 이 카테고리 입찰공고 목록 조회의 초당 요청 상한
+#   enabled     기본 수집 여부. BID_CATEGORIES 환경변수(예: "용역,물품" 또는 "all")가 있으면 그쪽이 우선
+BID_ENDPOINT_REGISTRY = [
     {
         "path": "getBidPblancListInfoServcPPSSrch",
-        "desc": "용역"
-    }
+        "desc": "용역",
+        "kind": "Servc",
+        "fields": DEFAULT_FIELD_MAP,
+        "concurrency": 4,
+        "rate_per_sec": 5,
+        "enabled": True,
+    },
+    {
+        "path": "getBidPblancListInfoThngPPSSrch",
+        "desc": "물품",
+        "kind": "Thng",
+        "fields": _AGENCY_FIELD_MAP,
+        "concurrency": 4,
+        "rate_per_sec": 5,
+        "enabled": False,
+    },
+    {
+        "path": "getBidPblancListInfoCnstwkPPSSrch",
+        "desc": "공사",
+        "kind": "Cnstwk",
+        "fields": _AGENCY_FIELD_MAP,
+        "concurrency": 4,
+        "rate_per_sec": 5,
+        "enabled": False,
+    },
+    {
+        "path": "getBidPblancListInfoFrgcptPPSSrch",
+        "desc": "외자",
+        "kind": "Frgcpt",
+        "fields": _AGENCY_FIELD_MAP,
+        "concurrency": 2,
+        "rate_per_sec": 5,
+        "enabled": False,
+    },
 ]
 
+
+def select_endpoints(categories: str | None = None) -> list[dict]:
+    """수집할 엔드포인트. categories 는 "용역,물품" 처럼 desc 를 쉼표로, "all" 이면 전부."""
+    if not categories:
+        return [ep for ep in BID_ENDPOINT_REGISTRY if ep["enabled"]]
+    wanted = {c.strip() for c in categories.split(",") if c.strip()}
+    if "all" in wanted:
+        return list(BID_ENDPOINT_REGISTRY)
+    unknown = wanted - {ep["desc"] for ep in BID_ENDPOINT_REGISTRY}
+    if unknown:
+        raise ValueError(f"알 수 없는 BID_CATEGORIES: {', '.join(sorted(unknown))}")
+    return [ep for ep in BID_ENDPOINT_REGISTRY if ep["desc"] in wanted]
+
+
+# 이번 실행에서 수집할 엔드포인트
+BID_ENDPOINTS = select_endpoints(os.getenv("BID_CATEGORIES"))
+
+# 낙찰/개찰 조회(ScsbidInfoService)는 카테고리가 공유하는 서비스라 초당 상한을 따로 둔다
+SCSBID_RATE_PER_SEC = float(os.getenv("SCSBID_RATE_PER_SEC", "10"))
+
 # 검색할 키워드 목록 
 SEARCH_KEYWORDS = [
     "콜센터",
@@ -157,10 +247,13 @@ DEFAULT_INPUT = {
 
 # 기본 검색 조건 객체
 class SearchConfig:
-    def __init__(self, start_date=None, end_date=None, keyword=None):
+    def __init__(self, start_date=None, end_date=None, keyword=None, start_time="0000", end_time="2359"):
         self.start_date = start_date or DEFAULT_INPUT["start_date"]
         self.end_date = end_date or DEFAULT_INPUT["end_date"]
         self.keyword = keyword  # 단일 키워드
+        # 조회 시각(HHMM). 기본은 하루 전체, 데몬 모드 폴링은 분 단위 구간을 준다
+        self.start_time = start_time
+        self.end_time = end_time
 
     def get_filename(self):
         from datetime import datetime
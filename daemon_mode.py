@@ -0,0 +1,204 @@
+"""
+상시 실행(데몬) 모드: python main.py --daemon
+
+하루 한 번 cron(23:00 UTC) 실행으로는 오전에 올라온 공고를 다음 날에야 본다. 사전규격 의견
+등록 기간은 5일 남짓이라 하루 늦는 것이 크다. 데몬은 프로세스를 띄워 둔 채 출처마다 제
+주기로 변경분만 받아 몇 분 안에 RTDB 에 올린다.
+
+  출처      주기 (분)                          한 번에 받는 것
+  bids      DAEMON_BID_INTERVAL_MIN (10)       워터마크 - DAEMON_OVERLAP_MIN(30) 부터 지금까지.
+                                               광역 수집 한 번 (카테고리당 1페이지 안팎)
+  ax        DAEMON_AX_INTERVAL_MIN (15)        /ax_bids 최신 공고일시 뒤 (ax_collector 증분)
+  prespec   DAEMON_PRESPEC_INTERVAL_MIN (30)   키워드별 워터마크 뒤 (prespec_collector 증분,
+                                               바뀐 건만 쓴다. 주기적 전체 수집은 일일 실행 몫)
+
+주기를 0 으로 두면 그 출처는 폴링하지 않는다. 프로세스가 살아 있는 동안 HTTP 연결
+(utils.http_session), Firebase 앱, rtdb_cache 메모리 캐시, 키워드 매처가 그대로 남아 폴링마다
+다시 맺거나 다시 읽지 않는다.
+
+입찰공고 폴링은 새 공고만 올린다. 겹침 구간에서 이미 올린 공고는 다시 보강하지 않고,
+낙찰/개찰 결과 갱신·리포트·메일은 일일 실행(main.py)이 그대로 맡는다.
+
+상태: /daemon_state/{bids|ax|prespec}
+      {lastPollAt, seconds, apiCalls, error} + bids·ax 는 changed(올린 건수),
+      bids 는 watermark(YYYYMMDDHHMM), prespec 은 preSpecCount·orderPlanCount·imminent
+"""
+
+import os
+import signal
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable
+
+from config import SearchConfig, _now_kst, get_api_key
+from run_history import api_stats
+
+STATE_PATH = "/daemon_state"
+WATERMARK_FMT = "%Y%m%d%H%M"
+
+BID_INTERVAL_MIN = float(os.getenv("DAEMON_BID_INTERVAL_MIN", "10"))
+AX_INTERVAL_MIN = float(os.getenv("DAEMON_AX_INTERVAL_MIN", "15"))
+PRESPEC_INTERVAL_MIN = float(os.getenv("DAEMON_PRESPEC_INTERVAL_MIN", "30"))
+OVERLAP_MIN = int(os.getenv("DAEMON_OVERLAP_MIN", "30"))            # 늦게 게시된 공고를 다시 받는 겹침
+MAX_CATCHUP_HOURS = int(os.getenv("DAEMON_MAX_CATCHUP_HOURS", "24"))  # 오래 멈췄다 켜져도 이만큼만 거슬러 받는다
+
+# 겹침 구간에서 이미 올린 공고번호 → 올린 시각. 구간을 벗어나면 지운다
+_known_bids: dict[str, datetime] = {}
+
+_stop = threading.Event()
+
+
+@dataclass
+class Poller:
+    name: str
+    interval_min: float
+    poll: Callable[[datetime, list[str]], dict]   # (지금, 키워드) → 상태에 남길 값
+    next_at: float = 0.0
+
+
+# ── 상태 ──────────────────────────────────────────────
+def _load_state(name: str) -> dict:
+    from firebase_admin import db
+
+    return db.reference(f"{STATE_PATH}/{name}").get() or {}
+
+
+def _save_state(name: str, values: dict):
+    from firebase_admin import db
+
+    db.reference(f"{STATE_PATH}/{name}").update(values)
+
+
+def _parse_watermark(raw, now: datetime) -> datetime | None:
+    try:
+        return datetime.strptime(str(raw), WATERMARK_FMT).replace(tzinfo=now.tzinfo)
+    except (TypeError, ValueError):
+        return None
+
+
+# ── 출처별 폴링 ───────────────────────────────────────
+def poll_bids(now: datetime, keywords: list[str]) -> dict:
+    """워터마크 - 겹침부터 지금까지 광역 수집해 새 공고만 보강·업로드한다."""
+    from main import ReportAggregator, iter_wide_sweep_batches, upload_batches
+
+    watermark = _parse_watermark(_load_state("bids").get("watermark"), now)
+    floor = now - timedelta(hours=MAX_CATCHUP_HOURS)
+    begin = max(floor, (watermark or now) - timedelta(minutes=OVERLAP_MIN))
+    config = SearchConfig(start_date=begin.strftime("%Y%m%d"), end_date=now.strftime("%Y%m%d"),
+                          start_time=begin.strftime("%H%M"), end_time=now.strftime("%H%M"))
+    print(f"  [bids] 조회 구간 {begin.strftime(WATERMARK_FMT)} ~ {now.strftime(WATERMARK_FMT)}"
+          f" (이미 올린 공고 {len(_known_bids)}건 제외)")
+
+    for bid_no, seen_at in list(_known_bids.items()):
+        if seen_at < begin:
+            del _known_bids[bid_no]
+
+    uploaded = 0
+
+    def remember(batches):
+        nonlocal uploaded
+        for batch in batches:
+            yield batch
+            # upload_batches 가 이 묶음을 올린 뒤에 돌아온다
+            for _, item in batch:
+                _known_bids[item.bid_no] = now
+            uploaded += len(batch)
+
+    report = ReportAggregator(keywords)
+    upload_batches(remember(iter_wide_sweep_batches(keywords, config=config, known=_known_bids)), report)
+    return {"watermark": now.strftime(WATERMARK_FMT), "changed": uploaded}
+
+
+def _errors(result: dict) -> str | None:
+    """수집기가 건너뛰고 계속한 오류를 상태에 남길 한 줄로."""
+    errors = result.get("errors") or []
+    return "; ".join(errors)[:300] or None
+
+
+def poll_ax(now: datetime, keywords: list[str]) -> dict:
+    """ax_collector 증분 수집 (/ax_bids 최신 공고일시 뒤만 받는다)."""
+    from ax_collector import collect_ax_data
+
+    result = collect_ax_data()
+    return {"changed": result.get("upserted_records", 0), "error": _errors(result)}
+
+
+def poll_prespec(now: datetime, keywords: list[str]) -> dict:
+    """prespec_collector 증분 수집 (키워드별 워터마크 뒤만 받고 바뀐 건만 쓴다).
+
+    전체 수집 주기(PRESPEC_FULL_SWEEP_DAYS)가 지나도 폴링에서는 하지 않는다 (일일 실행 몫).
+    """
+    from prespec_collector import collect_prespec_data
+
+    result = collect_prespec_data(keywords, full_sweep=False, incremental_only=True)
+    return {
+        "preSpecCount": result.get("pre_spec_count", 0),
+        "orderPlanCount": result.get("order_plan_count", 0),
+        "imminent": len(result.get("imminent") or []),
+        "error": _errors(result),
+    }
+
+
+def _run_poll(poller: Poller, keywords: list[str]):
+    now = _now_kst().replace(second=0, microsecond=0)
+    print(f"\n🔁 [{poller.name}] 폴링 시작 ({now.strftime('%H:%M')})")
+    api_stats.reset()
+    started = time.perf_counter()
+    state = {"lastPollAt": now.isoformat(), "error": None}
+    try:
+        state.update(poller.poll(now, keywords))
+    except Exception as e:
+        # 인증/권한 문제는 다음 폴링도 같으므로 데몬을 멈춘다
+        if isinstance(e, RuntimeError) and str(e).startswith("G2B_AUTH_ERROR"):
+            raise
+        print(f"❌ [{poller.name}] 폴링 실패, 다음 주기에 다시 시도합니다: {e}")
+        state["error"] = str(e)[:300]
+    state["seconds"] = round(time.perf_counter() - started, 2)
+    state["apiCalls"] = sum(s["calls"] for s in api_stats.snapshot().values())
+    changed = f"변경 {state['changed']}건, " if "changed" in state else ""
+    print(f"✅ [{poller.name}] 폴링 완료: {changed}API {state['apiCalls']}회, {state['seconds']:.1f}초")
+    try:
+        _save_state(poller.name, state)
+    except Exception as e:
+        print(f"⚠️ [{poller.name}] 데몬 상태 저장 실패 (무시하고 계속): {e}")
+
+
+def _request_stop(signum, frame):
+    print(f"\n🛑 종료 신호({signum}) 수신, 진행 중인 폴링이 끝나면 멈춥니다.")
+    _stop.set()
+
+
+def run_daemon():
+    """출처별 주기로 폴링을 돌린다. SIGINT/SIGTERM 을 받으면 진행 중인 폴링을 마치고 끝낸다."""
+    from main import get_search_keywords, initialize_firebase
+
+    get_api_key()   # 키가 없으면 폴링마다 0건으로 넘기지 않고 바로 멈춘다
+    initialize_firebase()
+    pollers = [p for p in (
+        Poller("bids", BID_INTERVAL_MIN, poll_bids),
+        Poller("ax", AX_INTERVAL_MIN, poll_ax),
+        Poller("prespec", PRESPEC_INTERVAL_MIN, poll_prespec),
+    ) if p.interval_min > 0]
+    if not pollers:
+        print("⚠️ 폴링할 출처가 없습니다 (DAEMON_*_INTERVAL_MIN 이 모두 0).")
+        return
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, _request_stop)
+    print("\n🛰️ 데몬 모드 시작: " + ", ".join(f"{p.name} {p.interval_min:g}분" for p in pollers))
+
+    while not _stop.is_set():
+        due = [p for p in pollers if p.next_at <= time.monotonic()]
+        if due:
+            # 키워드는 ETag 캐시로 읽어 바뀌지 않았으면 본문을 받지 않는다
+            keywords = get_search_keywords()
+            for poller in due:
+                if _stop.is_set():
+                    break
+                _run_poll(poller, keywords)
+                poller.next_at = time.monotonic() + poller.interval_min * 60
+        _stop.wait(max(1.0, min(p.next_at for p in pollers) - time.monotonic()))
+
+    print("👋 데몬 모드 종료")
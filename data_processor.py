@@ -1,53 +1,68 @@
 import os
 import time
-import pandas as pd
-import requests
+from dataclasses import dataclass
 from urllib.parse import unquote
-from config import BID_API_KEY, BID_ENDPOINTS, SearchConfig
+from config import get_api_key, BID_ENDPOINTS, BID_ENDPOINT_REGISTRY, DEFAULT_FIELD_MAP, SearchConfig
 from scsbid_client import get_scsbid_amount, get_openg_corp_info, get_bid_clsfc_no, get_nobid_reason
-from utils import get_output_path
+from keyword_matcher import get_matcher
+from run_history import api_stats
+from utils import get_output_path, RateLimiter, http_session
+
+# 광역 수집(키워드 없이 기간 전체) 시 페이지 크기. 999까지 정상 동작 확인(사전규격 API 동일 기준).
+WIDE_SWEEP_ROWS = 999
+
+# 엔드포인트별 초당 요청 상한 (config.BID_ENDPOINT_REGISTRY 의 rate_per_sec). 카테고리를 병렬로
+# 수집해도 엔드포인트마다 한도를 따로 지킨다.
+_RATE_LIMITERS = {ep["path"]: RateLimiter(ep.get("rate_per_sec")) for ep in BID_ENDPOINT_REGISTRY}
 
 # ✅ 입찰 공고 조회 함수
-def fetch_bid_data(endpoint_path, search_config):
+def fetch_bid_data(endpoint_path, search_config, page_no=1, num_of_rows=100):
     # data.go.kr 서비스키는 "인코딩 키(%)" / "디코딩 키(원문)" 2종이 존재할 수 있어
     # 어떤 형태가 들어오든 unquote로 원문 형태로 맞춘 뒤 params로 한 번만 인코딩되도록 한다.
-    service_key = unquote(BID_API_KEY or "").strip()
+    service_key = unquote(get_api_key() or "").strip()
     url = f"https://apis.data.go.kr/1230000/ad/BidPublicInfoService/{endpoint_path}"
     params = {
         "serviceKey": service_key,
-        "pageNo": 1,
-        "numOfRows": 100,
+        "pageNo": page_no,
+        "numOfRows": num_of_rows,
         "inqryDiv": 1,
-        "inqryBgnDt": search_config.start_date + "0000",
-        "inqryEndDt": search_config.end_date + "2359",
+        "inqryBgnDt": search_config.start_date + search_config.start_time,
+        "inqryEndDt": search_config.end_date + search_config.end_time,
         "type": "json",
-        "bidNtceNm": search_config.keyword,
     }
+    # 키워드가 없으면 bidNtceNm 을 아예 보내지 않는다 (기간 내 전체 공고)
+    if search_config.keyword:
+        params["bidNtceNm"] = search_config.keyword
     try:
-        response = requests.get(url, params=params, timeout=30)
+        limiter = _RATE_LIMITERS.get(endpoint_path)
+        if limiter:
+            limiter.wait()
+        with api_stats.measure("bid_list"):
+            response = http_session().get(url, params=params, timeout=30)
 
-        # 인증/권한 문제는 "0건"으로 삼키면 장기간 방치되므로 즉시 실패 처리
-        if response.status_code in (401, 403):
-            raise RuntimeError(
-                "G2B_AUTH_ERROR: "
-                f"{response.status_code} Unauthorized/Forbidden (serviceKey 확인 필요)"
-            )
+            # 인증/권한 문제는 "0건"으로 삼키면 장기간 방치되므로 즉시 실패 처리
+            if response.status_code in (401, 403):
+                raise RuntimeError(
+                    "G2B_AUTH_ERROR: "
+                    f"{response.status_code} Unauthorized/Forbidden (serviceKey 확인 필요)"
+                )
 
-        response.raise_for_status()
+            response.raise_for_status()
 
-        try:
-            payload = response.json()
-        except Exception:
-            snippet = (response.text or "")[:300].replace("\n", " ")
-            raise RuntimeError(f"G2B_API_ERROR: JSON 파싱 실패. 응답 일부: {snippet}")
+            # 200 으로 온 HTML 오류 페이지나 resultCode 오류도 API 오류로 센다
+            try:
+                payload = response.json()
+            except Exception:
+                snippet = (response.text or "")[:300].replace("\n", " ")
+                raise RuntimeError(f"G2B_API_ERROR: JSON 파싱 실패. 응답 일부: {snippet}")
 
-        header = payload.get("response", {}).get("header", {}) or {}
-        result_code = header.get("resultCode")
-        result_msg = header.get("resultMsg")
+            header = payload.get("response", {}).get("header", {}) or {}
+            result_code = header.get("resultCode")
+            result_msg = header.get("resultMsg")
 
-        # "00": 정상, "03": 데이터 없음(케이스가 종종 있음) → 빈 결과로 처리
-        if result_code and result_code not in ("00", "03"):
-            raise RuntimeError(f"G2B API 오류: resultCode={result_code}, resultMsg={result_msg}")
+            # "00": 정상, "03": 데이터 없음(케이스가 종종 있음) → 빈 결과로 처리
+            if result_code and result_code not in ("00", "03"):
+                raise RuntimeError(f"G2B API 오류: resultCode={result_code}, resultMsg={result_msg}")
 
         return payload.get("response", {}).get("body", {})
     except Exception as e:
@@ -59,38 +74,146 @@ def fetch_bid_data(endpoint_path, search_config):
         print(f"[입찰공고 조회 오류] {e}")
         return None
 
+# ✅ 광역 수집: 키워드 없이 기간 내 전체 공고를 큰 페이지로 훑는다
+def iter_bid_pages(endpoint_path, search_config, num_of_rows=WIDE_SWEEP_ROWS):
+    """totalCount 를 따라 마지막 페이지까지 한 페이지씩 내보낸다. 요청 수는 키워드 수와 무관하다.
+
+    페이지를 다 모으지 않으므로 기간이 길어도 메모리에는 소비 중인 페이지만 남는다.
+    """
+    received = 0
+    page_no = 1
+    while True:
+        body = fetch_bid_data(endpoint_path, search_config, page_no=page_no, num_of_rows=num_of_rows)
+        if body is None:
+            raise RuntimeError(f"G2B_API_ERROR: {endpoint_path} {page_no}페이지 조회 실패")
+
+        batch = body.get("items") or []
+        if isinstance(batch, dict):      # 1건이면 dict로 내려온다
+            batch = [batch]
+        received += len(batch)
+
+        total = int(body.get("totalCount") or 0)
+        print(f"  📥 {page_no}페이지 수신 (누적 {received}/{total}건)")
+        if batch:
+            yield batch
+        if not batch or received >= total:
+            return
+        page_no += 1
+
+
+def fetch_all_bid_items(endpoint_path, search_config, num_of_rows=WIDE_SWEEP_ROWS):
+    """iter_bid_pages() 를 한 리스트로."""
+    return [item for batch in iter_bid_pages(endpoint_path, search_config, num_of_rows) for item in batch]
+
+
+# ✅ 입찰 공고 레코드
+@dataclass(slots=True)
+class BidRecord:
+    """수집 → 보강 → 업로드 → 리포트 동안 공고 한 건을 나타내는 객체 하나.
+
+    단계마다 한글 키 dict 를 새로 만들어 펼쳐 복사하지 않고 이 객체의 필드를 채운다.
+    한글 키 형태로는 가장자리에서만 바꾼다: RTDB 는 to_rtdb(), CSV 는 to_csv_row().
+    """
+    bid_datetime: str = ""                  # 입찰일시
+    title: str = ""                         # 공고명
+    agency: str = ""                        # 채권자명
+    budget: int = 0                         # 사업금액
+    bid_no: str = ""                        # 입찰공고번호
+    url: str = ""                           # 입찰공고URL
+    award_amount: str | int | None = 0      # 낙찰금액
+    bidders: str | None = ""                # 개찰업체정보
+    nobid_reason: str | None = ""           # 유찰사유
+    bid_path: str = ""                      # /bids 아래 저장 위치 (업로드가 채운다. 저장 필드 아님)
+
+    # 한글 키 ↔ 필드. 순서가 RTDB / CSV 필드 순서다. 어노테이션이 없어 dataclass 필드가 아니다.
+    FIELDS = (
+        ("입찰일시", "bid_datetime"),
+        ("공고명", "title"),
+        ("채권자명", "agency"),
+        ("사업금액", "budget"),
+        ("입찰공고번호", "bid_no"),
+        ("입찰공고URL", "url"),
+        ("낙찰금액", "award_amount"),
+        ("개찰업체정보", "bidders"),
+        ("유찰사유", "nobid_reason"),
+    )
+
+    @classmethod
+    def from_fields(cls, values):
+        """한글 키 dict (필드 매핑 결과, 체크포인트 보강 캐시) → 레코드."""
+        return cls(**{attr: values[key] for key, attr in cls.FIELDS if key in values})
+
+    def enrich(self, values):
+        """낙찰금액 / 개찰업체정보 / 유찰사유 같은 한글 키 값을 제자리에 채운다."""
+        for key, attr in self.FIELDS:
+            if key in values:
+                setattr(self, attr, values[key])
+        return self
+
+    def to_rtdb(self):
+        return {key: getattr(self, attr) for key, attr in self.FIELDS}
+
+    def to_csv_row(self):
+        return self.to_rtdb()
+
+
+# ✅ 입찰 공고 항목 → 저장 형태 변환
+def to_bid_record(item, fields=None):
+    """fields 는 엔드포인트별 필드 매핑 (config.DEFAULT_FIELD_MAP 형식). 없으면 용역 기준."""
+    fields = fields or DEFAULT_FIELD_MAP
+    values = {}
+    for name, candidates in fields.items():
+        if name == "사업금액":
+            # 추정가격 + 부가세. 빈 문자열은 0 으로 본다 (물품/외자는 VAT 가 비어 오기도 한다)
+            values[name] = sum(int(item.get(field) or 0) for field in candidates)
+            continue
+        values[name] = next((item[field] for field in candidates if item.get(field)), "")
+    return BidRecord.from_fields(values)
+
+
 # ✅ 입찰 공고 항목 처리
-def process_bid_items(items, api_desc, search_config):
+def process_bid_items(items, api_desc, search_config, fields=None):
     results = []
     if not items:
         return results
 
+    matcher = get_matcher((search_config.keyword,)) if search_config.keyword else None
+
     for item in items:
         try:
             bid_name = item.get("bidNtceNm", "")
-            if search_config.keyword and search_config.keyword not in bid_name:
+            if matcher and not matcher.find_all(bid_name):
                 continue
 
-            bid_no = item.get("bidNtceNo", "")
-            date = item.get("bidNtceDt", "")
-            presmpt_price = int(item.get("presmptPrce", 0))
-            vat = int(item.get("VAT", 0))
-            total_price = presmpt_price + vat
-
-            results.append({
-                "입찰일시": date,
-                "공고명": bid_name,
-                "채권자명": item.get("crdtrNm", ""),
-                "사업금액": total_price,
-                "입찰공고번호": bid_no,
-                "입찰공고URL": item.get("bidNtceDtlUrl", "")
-            })
+            results.append(to_bid_record(item, fields))
         except Exception as e:
             print(f"[항목 처리 오류] {e}")
             continue
 
     return results
 
+
+# ✅ 광역 수집 결과를 키워드별로 분류
+def classify_bid_items(items, keywords, fields=None):
+    """공고 하나를 모든 키워드와 한 번에 대조해 {키워드: [레코드, ...]} 로 나눈다.
+
+    여러 키워드에 걸린 공고는 각 키워드 목록에 같은 레코드가 들어간다.
+    """
+    matcher = get_matcher(tuple(keywords))
+    classified = {kw: [] for kw in matcher.keywords}
+    for item in items or []:
+        try:
+            hits = matcher.find_all(item.get("bidNtceNm", ""))
+            if not hits:
+                continue
+            record = to_bid_record(item, fields)
+        except Exception as e:
+            print(f"[항목 처리 오류] {e}")
+            continue
+        for kw in hits:
+            classified[kw].append(record)
+    return classified
+
 # ✅ 실행 메인
 
 def main():
@@ -103,30 +226,28 @@ def main():
         if response is None:
             continue
 
-        bid_items = process_bid_items(response.get("items", []), api["desc"], config)
+        bid_items = process_bid_items(response.get("items", []), api["desc"], config, api.get("fields"))
+        kind = api.get("kind", "Servc")
 
-        for item in bid_items:
-            bid_no = item["입찰공고번호"]
+        for record in bid_items:
+            bid_no = record.bid_no
             print(f"📄 처리 중: {bid_no}")
 
-            amount = get_scsbid_amount(bid_no)
-            corp_info = get_openg_corp_info(bid_no)
+            record.award_amount = get_scsbid_amount(bid_no, kind)
+            record.bidders = get_openg_corp_info(bid_no, kind)
 
-            if not amount:
-                clsfc_no = get_bid_clsfc_no(bid_no)
-                nobid_reason = get_nobid_reason(bid_no, clsfc_no) if clsfc_no else "bidClsfcNo 없음"
+            if not record.award_amount:
+                clsfc_no = get_bid_clsfc_no(bid_no, kind)
+                record.nobid_reason = get_nobid_reason(bid_no, clsfc_no) if clsfc_no else "bidClsfcNo 없음"
             else:
-                nobid_reason = ""
+                record.nobid_reason = ""
 
-            all_data.append({
-                **item,
-                "낙찰금액": amount,
-                "개찰업체정보": corp_info,
-                "유찰사유": nobid_reason
-            })
+            all_data.append(record)
 
     if all_data:
-        df = pd.DataFrame(all_data)
+        import pandas as pd  # CSV 내보내기에서만 필요해 여기서 불러온다
+
+        df = pd.DataFrame([record.to_csv_row() for record in all_data])
         filename = f"{config.keyword}_입찰+개찰통합_{config.start_date}_{config.end_date}_{time.strftime('%Y%m%d_%H%M%S')}.csv"
         filepath = get_output_path(filename)
         df.to_csv(filepath, index=False, encoding="utf-8-sig")
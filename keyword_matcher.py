@@ -0,0 +1,102 @@
+"""
+공고 제목 다중 키워드 매칭.
+
+입찰공고(bidNtceNm), 사전규격(prdctClsfcNoNm), 발주계획(bizNm) 제목을
+대시보드 키워드 전체와 한 번에 대조한다. 키워드마다 `in` 이나 정규식을
+따로 돌리던 것을 Aho-Corasick 오토마톤 하나로 합쳤다.
+
+규칙:
+- 대소문자는 구분하지 않는다 (AX 수집이 lower() 로 비교하던 것과 같다)
+- 영문 약어(AX, BPR, ISP 처럼 ASCII 영문자만으로 된 키워드)는 앞뒤가 영문자가
+  아닐 때만 인정한다. API 부분일치로 섞여 들어오는 Axial / Maxwell / Taxonomy
+  같은 오탐을 거르기 위함이다. 한글이나 숫자와 붙은 경우(AX기반, ISP2)는 인정.
+- 한글 키워드는 단순 부분일치
+"""
+
+import re
+from functools import lru_cache
+
+
+def is_acronym(keyword: str) -> bool:
+    """ASCII 영문자만으로 된 키워드인지. 단어 경계 규칙이 이 키워드에만 붙는다."""
+    return keyword.isascii() and keyword.isalpha()
+
+
+def _is_ascii_letter(ch: str) -> bool:
+    return "a" <= ch <= "z"
+
+
+class KeywordMatcher:
+    """키워드 목록으로 한 번 만들어 두고 제목마다 find_all() 을 부른다."""
+
+    def __init__(self, keywords):
+        self.keywords = list(dict.fromkeys(k.strip() for k in keywords if k and k.strip()))
+        self._folded = [k.lower() for k in self.keywords]
+        self._acronym = [is_acronym(k) for k in self.keywords]
+
+        # 대부분의 제목은 아무 키워드에도 걸리지 않는다. C 정규식 엔진으로 먼저 걸러
+        # 걸린 제목만 오토마톤으로 훑는다.
+        alternation = "|".join(re.escape(k) for k in sorted(set(self._folded), key=len, reverse=True))
+        self._prefilter = re.compile(alternation) if alternation else None
+
+        # goto / fail / output 테이블
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[list[int]] = [[]]
+        for idx, word in enumerate(self._folded):
+            state = 0
+            for ch in word:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append(idx)
+
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find_all(self, title: str) -> list[str]:
+        """제목에 걸린 키워드 전부. 순서는 생성 시 키워드 순서."""
+        text = (title or "").lower()
+        if self._prefilter is None or not self._prefilter.search(text):
+            return []
+
+        goto, fail, out = self._goto, self._fail, self._out
+        hits = set()
+        state = 0
+        for pos, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for idx in out[state]:
+                if idx in hits:
+                    continue
+                if self._acronym[idx]:
+                    start = pos - len(self._folded[idx]) + 1
+                    if start > 0 and _is_ascii_letter(text[start - 1]):
+                        continue
+                    if pos + 1 < len(text) and _is_ascii_letter(text[pos + 1]):
+                        continue
+                hits.add(idx)
+        return [self.keywords[i] for i in sorted(hits)]
+
+    def matches(self, title: str, keyword: str) -> bool:
+        """단일 키워드 판정. keyword 는 생성 시 목록에 있어야 한다."""
+        return keyword.strip() in self.find_all(title)
+
+
+@lru_cache(maxsize=32)
+def get_matcher(keywords: tuple[str, ...]) -> KeywordMatcher:
+    """같은 키워드 묶음이면 오토마톤을 다시 만들지 않는다."""
+    return KeywordMatcher(keywords)
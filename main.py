@@ -1,18 +1,31 @@
+import os
 import time
-from config import BID_ENDPOINTS, SearchConfig, DEFAULT_INPUT, SEARCH_KEYWORDS, _now_kst
-from data_processor import fetch_bid_data, process_bid_items
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from config import BID_ENDPOINTS, SearchConfig, DEFAULT_INPUT, SEARCH_KEYWORDS, _now_kst, get_api_key
+from data_processor import fetch_bid_data, process_bid_items, iter_bid_pages, classify_bid_items
+from keyword_matcher import get_matcher
+from pipeline import bounded, merge
 from scsbid_client import get_scsbid_amount, get_openg_corp_info, get_bid_clsfc_no, get_nobid_reason
-import firebase_admin
-from firebase_admin import credentials
-from firebase_admin import db
+from checkpoint import RunCheckpoint
+from rtdb_bulk import BulkPlan, RunManifest, apply_plan, before_values, iter_bids, write_updates
+from bid_links import LINKS_PATH, link_updates
+from rtdb_cache import cached_get
+from run_history import api_stats, build_entry, record_run
+from scheduler import Stage, run_stages, stage_timeout
 from datetime import datetime
 
+# firebase_admin 은 google-cloud 라이브러리를 줄줄이 불러와 import 만으로 수백 ms 가 든다.
+# RTDB 를 실제로 쓰는 함수 안에서 불러온다.
+
 # Firebase 초기화 함수
 def initialize_firebase():
+    import firebase_admin
+    from firebase_admin import credentials
+
     try:
         firebase_admin.get_app()
     except ValueError:
-        import os
         import json
         
         # 환경 변수에서 Firebase 인증 정보 가져오기
@@ -36,7 +49,10 @@ def initialize_firebase():
     print("Firebase 초기화 완료")
 
 # Firebase에 데이터 업로드 함수
-def upload_to_firebase(data_items):
+def upload_to_firebase(data_items, manifest=None, months=None):
+    """data_items 는 BidRecord 목록. 올린 위치를 각 레코드의 bid_path 에 채운다.
+    manifest(RunManifest)가 있으면 실제로 쓴 경로와 쓰기 전 값을 기록한다 (롤백용).
+    months 에 dict 를 넘기면 중복 확인용 월 데이터를 호출 사이에 이어 쓴다 (여기서 쓴 건 반영)."""
     if not data_items:
         print("업로드할 데이터가 없습니다.")
         return
@@ -45,47 +61,48 @@ def upload_to_firebase(data_items):
     
     # Firebase 초기화
     initialize_firebase()
+    from firebase_admin import db
     
     # 기준 경로 설정
     bids_ref = db.reference('/bids')
     user_inputs_ref = db.reference('/user_inputs')
     
+    # 중복 확인용 월 데이터 {'YYYY/MM': {bid_id: 데이터}}. 월마다 한 번만 읽는다
+    months = months if months is not None else {}
+    
     # 업로드 카운터
     uploaded_count = 0
     updated_count = 0
     skipped_count = 0
     user_inputs_created = 0
+    # 공고번호 색인(/bid_links/{공고번호}/bid) 갱신분. 새로 넣은 건은 롤백 때 함께 지우도록 따로 둔다
+    new_links = {}
+    updated_links = {}
     
-    for item in data_items:
+    for record in data_items:
         try:
             # 입찰일시 파싱
-            bid_date = datetime.strptime(item["입찰일시"], "%Y-%m-%d %H:%M:%S")
+            bid_date = datetime.strptime(record.bid_datetime, "%Y-%m-%d %H:%M:%S")
             year = str(bid_date.year)
             month = f"{bid_date.month:02d}"  # 두 자리 숫자로 포맷팅
             
             # 입찰공고번호를 key로 사용 (없으면 타임스탬프 기반으로 생성)
-            bid_id = item.get("입찰공고번호", "")
+            bid_id = record.bid_no
             if not bid_id:
                 bid_id = f"bid_{int(time.time())}_{uploaded_count}"
             
             # 해당 연도와 월 경로 참조
             year_month_ref = bids_ref.child(year).child(month)
             
-            # 데이터 정리 - API에서 가져온 9개 필드 저장
-            firebase_data = {
-                "입찰일시": item.get("입찰일시", ""),
-                "공고명": item.get("공고명", ""),
-                "채권자명": item.get("채권자명", ""),
-                "사업금액": item.get("사업금액", 0),
-                "입찰공고번호": item.get("입찰공고번호", ""),
-                "낙찰금액": item.get("낙찰금액", 0),
-                "개찰업체정보": item.get("개찰업체정보", ""),
-                "유찰사유": item.get("유찰사유", ""),
-                "입찰공고URL": item.get("입찰공고URL", "")
-            }
+            # 데이터 정리 - BidRecord 의 9개 필드를 RTDB 형태(한글 키)로
+            firebase_data = record.to_rtdb()
             
-            # 중복 확인을 위해 해당 연도/월의 모든 데이터 가져오기
-            month_data = year_month_ref.get() or {}
+            # 중복 확인을 위해 해당 연도/월의 모든 데이터 가져오기. 지난 실행 뒤로 바뀌지 않은
+            # 월은 ETag 조건부 요청으로 캐시 값을 쓴다 (캐시 객체는 고치지 않도록 얕은 복사)
+            month_key = f"{year}/{month}"
+            if month_key not in months:
+                months[month_key] = dict(cached_get(f"/bids/{month_key}") or {})
+            month_data = months[month_key]
             
             # 중복 플래그
             is_duplicate = False
@@ -112,22 +129,37 @@ def upload_to_firebase(data_items):
                     should_update = True
                 
                 if should_update:
+                    if manifest is not None:
+                        manifest.record_write(f"bids/{year}/{month}/{bid_id}", existing_data)
                     year_month_ref.child(bid_id).update(firebase_data)
+                    month_data[bid_id] = {**existing_data, **firebase_data}
+                    if record.bid_no:
+                        updated_links[f"{year}/{month}/{bid_id}"] = [record.bid_no]
                     updated_count += 1
                     print(f"🔄 업데이트: {bid_id} - {firebase_data['공고명']} ({year}-{month})")
                 else:
                     skipped_count += 1
                     print(f"⏭️ 건너뜀 (중복): {bid_id} - {firebase_data['공고명']} ({year}-{month})")
             else:
-                # 새로운 데이터 - 추가
+                # 새로운 데이터 - 추가 (같은 공고번호의 정정공고면 기존 건을 덮어쓰므로 그 값을 남긴다)
+                if manifest is not None:
+                    manifest.record_write(f"bids/{year}/{month}/{bid_id}", month_data.get(bid_id))
                 year_month_ref.child(bid_id).set(firebase_data)
+                month_data[bid_id] = firebase_data
+                if record.bid_no:
+                    new_links[f"{year}/{month}/{bid_id}"] = [record.bid_no]
                 uploaded_count += 1
                 print(f"➕ 추가: {bid_id} - {firebase_data['공고명']} ({year}-{month})")
             
+            # 실제로 저장(또는 중복 매칭)된 위치. 수집 결과 리포트가 이 경로로 레코드를 참조한다.
+            record.bid_path = f"{year}/{month}/{bid_id}"
+            
             # user_inputs에 데이터가 있는지 확인하고 없으면 생성
             user_input_data = user_inputs_ref.child(bid_id).get()
             if not user_input_data:
                 # user_inputs 데이터 생성
+                if manifest is not None:
+                    manifest.record_write(f"user_inputs/{bid_id}")
                 user_inputs_ref.child(bid_id).set({
                     "물동량 평균": 0,
                     "용역기간(개월)": 0,
@@ -141,50 +173,127 @@ def upload_to_firebase(data_items):
             print(f"⚠️ Firebase 업로드 중 오류 발생: {e}")
             continue
     
+    link_writes = link_updates("bid", new_links)
+    link_writes.update(link_updates("bid", updated_links))
+    if link_writes and manifest is not None:
+        # 같은 공고번호가 다른 월에서 이미 색인돼 있을 수 있어 지금 값을 남긴다
+        for write in before_values(link_writes, {LINKS_PATH: cached_get(LINKS_PATH)}):
+            manifest.record_write(write["path"], write["before"])
+    if link_writes:
+        try:
+            write_updates(link_writes)
+        except Exception as e:
+            print(f"⚠️ 공고번호 색인 갱신 실패 (check_firebase.py rebuild-links 로 복구): {e}")
+    
     print(f"\n✅ Firebase 업로드 완료: {uploaded_count}건 추가, {updated_count}건 업데이트, {skipped_count}건 건너뜀")
     print(f"✅ user_inputs {user_inputs_created}건 생성")
 
 
+# 수집 결과 리포트 경로. 요약은 대시보드가 매번 읽고, 상세는 목록을 펼칠 때만 읽는다.
+RESULT_SUMMARY_PATH = '/collection_results/latest'
+RESULT_DETAILS_PATH = '/collection_results/latest_details'
+
+
+def bid_ref(record):
+    """/bids 아래 레코드 위치 'YYYY/MM/bid_id'. 업로드가 정한 bid_path 가 있으면 그것을 쓴다."""
+    if record.bid_path:
+        return record.bid_path
+    try:
+        bid_date = datetime.strptime(record.bid_datetime, "%Y-%m-%d %H:%M:%S")
+    except (TypeError, ValueError):
+        return record.bid_no
+    return f"{bid_date.year}/{bid_date.month:02d}/{record.bid_no}"
+
+
+def report_entry(item):
+    """리포트 항목 {ref, 공고명, 채권자명}. 체크포인트에 남겨 둔 항목(dict)은 그대로 돌려준다."""
+    if isinstance(item, dict):
+        return item
+    return {"ref": bid_ref(item), "공고명": item.title, "채권자명": item.agency}
+
+
+class ReportAggregator:
+    """키워드별 레코드 참조 목록과 참조 → 공고명/채권자명 표를 업로드하는 대로 쌓는다.
+
+    수집한 레코드는 업로드가 끝나면 버리고 리포트에 실리는 세 값만 남긴다.
+    참조는 일반 키워드면 /bids 아래 'YYYY/MM/bid_id', AX 면 /ax_bids 키다.
+    같은 공고가 여러 키워드에 걸려도 표에는 한 번만 들어간다.
+    """
+
+    def __init__(self, keywords=()):
+        self.keyword_bids = {keyword: [] for keyword in keywords}
+        self.bid_table = {}
+
+    def add(self, keyword, item):
+        entry = report_entry(item)
+        self.keyword_bids.setdefault(keyword, []).append(entry["ref"])
+        self.bid_table.setdefault(entry["ref"], {"공고명": entry["공고명"], "채권자명": entry["채권자명"]})
+
+    def add_ax(self, ax_bid_details):
+        refs = []
+        for detail in ax_bid_details:
+            ref = detail.get("key") or detail.get("공고명", "")
+            refs.append(ref)
+            self.bid_table.setdefault(ref, {"공고명": detail.get("공고명", ""), "채권자명": detail.get("채권자명", "")})
+        self.keyword_bids["AX"] = refs
+
+    def discard(self, keywords):
+        """처리 도중 실패한 키워드를 0건으로 되돌리고 더 이상 참조되지 않는 표 항목을 뺀다."""
+        for keyword in keywords:
+            self.keyword_bids[keyword] = []
+        live = {ref for refs in self.keyword_bids.values() for ref in refs}
+        self.bid_table = {ref: row for ref, row in self.bid_table.items() if ref in live}
+
+    def count(self, keyword):
+        return len(self.keyword_bids.get(keyword) or [])
+
+    def entries(self, keyword):
+        """체크포인트에 남길 키워드의 리포트 항목."""
+        return [{"ref": ref, **self.bid_table[ref]} for ref in self.keyword_bids.get(keyword) or []]
+
+    @property
+    def total_count(self):
+        """일반 키워드 수집 건수 합 (여러 키워드에 걸린 공고는 키워드마다 센다)."""
+        return sum(len(refs) for keyword, refs in self.keyword_bids.items() if keyword != "AX")
+
+    def details(self, collection_date):
+        return {"collection_date": collection_date, "keyword_bids": self.keyword_bids}
+
+
 # 기존 bid_id들에 대한 user_inputs 생성 함수
-def create_missing_user_inputs():
+def create_missing_user_inputs(manifest=None):
     print("\n🔄 기존 데이터에 대한 user_inputs 생성 시작...")
     
     # Firebase 초기화
     initialize_firebase()
+    from firebase_admin import db
     
-    # 기준 경로 설정
-    bids_ref = db.reference('/bids')
-    user_inputs_ref = db.reference('/user_inputs')
-    
-    # 현재 user_inputs 키 목록 가져오기
-    existing_user_inputs = user_inputs_ref.get() or {}
-    existing_keys = set(existing_user_inputs.keys())
+    # 현재 user_inputs 키 목록만 가져오기 (값은 필요 없음)
+    existing_keys = set(db.reference('/user_inputs').get(shallow=True) or {})
     
-    created_count = 0
     existing_count = 0
+    modified_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    plan = BulkPlan("user_inputs 생성")
     
-    # 모든 연도 순회
-    years = bids_ref.get() or {}
-    for year, months in years.items():
-        for month, bids in months.items():
-            for bid_id, bid_data in bids.items():
-                # 이미 user_inputs에 있는지 확인
-                if bid_id in existing_keys:
-                    existing_count += 1
-                    continue
-                
-                # user_inputs 데이터 생성
-                user_inputs_ref.child(bid_id).set({
-                    "물동량 평균": 0,
-                    "용역기간(개월)": 0,
-                    "마지막_수정일": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    "수정자": "system_auto"
-                })
-                created_count += 1
-                
-                # 진행 상황 출력 (100개마다)
-                if created_count % 100 == 0:
-                    print(f"🔄 {created_count}건 처리 중...")
+    # 모든 연도 순회, 없는 것만 계획에 모아 다중 경로 update 로 한 번에 생성
+    for year, month, bid_id, bid_data in iter_bids(db.reference('/bids').get()):
+        # 이미 user_inputs에 있는지 확인
+        if bid_id in existing_keys:
+            existing_count += 1
+            continue
+        
+        # user_inputs 데이터 생성
+        plan.set(f"user_inputs/{bid_id}", {
+            "물동량 평균": 0,
+            "용역기간(개월)": 0,
+            "마지막_수정일": modified_at,
+            "수정자": "system_auto"
+        })
+    
+    created_count = apply_plan(plan)
+    if manifest is not None:
+        for path in plan.updates:
+            manifest.record_write(path)
     
     print(f"✅ user_inputs 생성 완료: {created_count}건 생성, {existing_count}건 이미 존재")
 
@@ -206,42 +315,73 @@ def clean_company_info(info):
     
     return info
 
-# 🔄 단일 키워드 처리 함수
-def process_single_keyword(keyword):
-    """단일 키워드에 대한 데이터 수집 및 처리"""
+# 🔄 공고 1건 낙찰/개찰/유찰 정보 보강
+def enrich_bid_item(record, checkpoint=None, kind="Servc"):
+    """record(BidRecord)를 제자리에서 채워 돌려준다.
+    kind 는 카테고리별 낙찰/개찰 오퍼레이션 접미사 (config.BID_ENDPOINT_REGISTRY)."""
+    bid_no = record.bid_no
+
+    # 이전 실행(--resume)에서 이미 조회한 공고면 API 를 다시 부르지 않는다
+    cached = checkpoint.cached_enrichment(bid_no) if checkpoint else None
+    if cached is not None:
+        print(f"⏭️ 체크포인트 재사용: {bid_no}")
+        return record.enrich(cached)
+
+    print(f"📄 처리 중: {bid_no}")
+
+    amount = get_scsbid_amount(bid_no, kind)
+    corp_info = get_openg_corp_info(bid_no, kind)
+    clean_corp_info = clean_company_info(corp_info)
+
+    if not amount:
+        clsfc_no = get_bid_clsfc_no(bid_no, kind)
+        nobid_reason = get_nobid_reason(bid_no, clsfc_no) if clsfc_no else "bidClsfcNo 없음"
+    else:
+        nobid_reason = ""
+
+    fields = {
+        "낙찰금액": amount,
+        "개찰업체정보": clean_corp_info,
+        "유찰사유": nobid_reason
+    }
+    if checkpoint:
+        checkpoint.remember_enrichment(bid_no, fields)
+
+    return record.enrich(fields)
+
+# 🔄 카테고리 하나의 공고들을 보강 (카테고리별 동시 처리 수만큼 병렬)
+def enrich_items(items, api, checkpoint=None):
+    """입력 순서를 유지한 채 낙찰/개찰/유찰 정보를 붙인다."""
+    kind = api.get("kind", "Servc")
+    workers = max(1, int(api.get("concurrency") or 1))
+    if workers == 1 or len(items) <= 1:
+        return [enrich_bid_item(item, checkpoint, kind) for item in items]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda item: enrich_bid_item(item, checkpoint, kind), items))
+
+
+# 🔄 단일 키워드 수집: 엔드포인트별 보강 결과를 묶음으로 흘려 보낸다
+def iter_keyword_batches(keyword, checkpoint=None, failures=None):
+    """엔드포인트(카테고리)마다 스레드 하나로 수집·보강해 [(키워드들, 레코드), ...] 묶음을 도착하는 대로 내보낸다.
+
+    카테고리 하나가 실패해도 나머지는 계속한다. failures 에 리스트를 넘기면 실패한 카테고리
+    이름을 모아 준다 (실패가 있으면 체크포인트에 완료로 남기지 않는다).
+    """
     print(f"\n🎯 키워드 '{keyword}' 수집 시작...")
     
     config = SearchConfig(keyword=keyword)
-    keyword_data = []
 
-    for api in BID_ENDPOINTS:
+    def collect(api):
         try:
             response = fetch_bid_data(api["path"], config)
             if response is None:
-                continue
+                # fetch_bid_data 가 오류를 출력하고 None 을 돌려준 경우 (데이터 없음은 빈 body)
+                if failures is not None:
+                    failures.append(api["desc"])
+                return
 
-            bid_items = process_bid_items(response.get("items", []), api["desc"], config)
-
-            for item in bid_items:
-                bid_no = item["입찰공고번호"]
-                print(f"📄 처리 중: {bid_no}")
-
-                amount = get_scsbid_amount(bid_no)
-                corp_info = get_openg_corp_info(bid_no)
-                clean_corp_info = clean_company_info(corp_info)
-
-                if not amount:
-                    clsfc_no = get_bid_clsfc_no(bid_no)
-                    nobid_reason = get_nobid_reason(bid_no, clsfc_no) if clsfc_no else "bidClsfcNo 없음"
-                else:
-                    nobid_reason = ""
-
-                keyword_data.append({
-                    **item,
-                    "낙찰금액": amount,
-                    "개찰업체정보": clean_corp_info,
-                    "유찰사유": nobid_reason
-                })
+            bid_items = process_bid_items(response.get("items", []), api["desc"], config, api.get("fields"))
+            enriched = enrich_items(bid_items, api, checkpoint)
 
         except Exception as e:
             # 인증/권한 문제는 계속 0건으로 누적되므로 즉시 실패로 올린다.
@@ -249,16 +389,77 @@ def process_single_keyword(keyword):
                 raise
             print(f"[{api['desc']}] 키워드 '{keyword}' 데이터 수집 중 오류 발생: {e}")
             print(f"[{api['desc']}] 다음 API로 이동합니다.")
+            if failures is not None:
+                failures.append(api["desc"])
+            return
+
+        if enriched:
+            yield [((keyword,), item) for item in enriched]
+
+    return merge((collect(api) for api in BID_ENDPOINTS), name=f"keyword-{keyword}")
+
+# 🌐 광역 수집: 기간 내 공고를 페이지 단위로 받아 모든 키워드로 로컬 분류
+def iter_wide_sweep_batches(keywords, checkpoint=None, ax_rows=None, config=None, known=None):
+    """키워드 없이 기간 전체를 한 번 훑어 페이지마다 분류·보강한 묶음을 내보낸다.
+
+    키워드마다 같은 기간을 다시 받던 것을 없애 요청 수가 키워드 수와 무관해진다.
+    여러 키워드에 걸린 공고는 묶음에 한 번만 들어가(키워드 목록과 함께) 낙찰/개찰 조회와
+    업로드도 한 번씩이다. 다음 페이지 수신은 현재 페이지 보강과 겹쳐 진행된다.
+
+    ax_rows 에 리스트를 넘기면 용역 목록 중 제목에 AX 가 들어간 원본 행을 모아 준다.
+    같은 기간의 AX 수집이 재요청 없이 쓴다 (기간 전체 원본은 들고 있지 않는다).
+
+    config 로 조회 구간을 바꿀 수 있다 (기본은 DEFAULT_INPUT 기간 전체). known 에 공고번호
+    집합을 넘기면 그 공고는 보강·업로드하지 않는다 (데몬 폴링이 겹침 구간에서 이미 올린 공고).
+    """
+    print("\n🌐 광역 수집 모드: 키워드 없이 기간 전체 공고를 페이지 단위로 조회합니다.")
+    config = config or SearchConfig(keyword=None)
+    ax_matcher = get_matcher(("AX",))
+
+    def sweep(api):
+        seen = set()     # 앞 페이지에서 이미 내보낸 공고번호
+        received = 0
+        for page in bounded(iter_bid_pages(api["path"], config), name=f"fetch-{api['desc']}"):
+            received += len(page)
+            # AX 수집은 용역 목록 API 를 쓰므로 용역 원본만 넘긴다
+            if ax_rows is not None and api.get("kind") == "Servc":
+                ax_rows.extend(row for row in page if ax_matcher.find_all(row.get("bidNtceNm")))
+
+            hits = {}
+            for keyword, records in classify_bid_items(page, keywords, api.get("fields")).items():
+                for item in records:
+                    bid_no = item.bid_no
+                    if bid_no in seen or (known is not None and bid_no in known):
+                        continue
+                    record, matched = hits.setdefault(bid_no, (item, []))
+                    if keyword not in matched:
+                        matched.append(keyword)
+            seen.update(hits)
+            if not hits:
+                continue
 
-    print(f"키워드 '{keyword}' 수집 완료: {len(keyword_data)}건")
-    return keyword_data
+            enriched = enrich_items([record for record, _ in hits.values()], api, checkpoint)
+            yield [(tuple(matched), item) for (_, matched), item in zip(hits.values(), enriched)]
+        print(f"[{api['desc']}] 기간 내 전체 {received}건 수신")
+
+    return merge((sweep(api) for api in BID_ENDPOINTS), name="wide-sweep")
+
+# ⬆️ 묶음 업로드 → 리포트 누적
+def upload_batches(batches, report, manifest=None):
+    """묶음마다 Firebase 에 올리고 리포트에 더한다. 레코드는 여기서 손을 떠나면 버려진다."""
+    months = {}     # 묶음 사이에 중복 확인용 월 데이터를 이어 쓴다
+    for batch in batches:
+        upload_to_firebase([item for _, item in batch], manifest, months)
+        for keywords, item in batch:
+            for keyword in keywords:
+                report.add(keyword, item)
 
 def get_search_keywords():
     """RTDB /search_keywords 에서 키워드 목록을 읽어온다(대시보드 '설정' 탭에서 관리).
     없거나 실패하면 config.py 의 기본 SEARCH_KEYWORDS 를 사용한다."""
     try:
         initialize_firebase()
-        data = db.reference('/search_keywords').get()
+        data = cached_get('/search_keywords')
         if data:
             if isinstance(data, dict):
                 # {index: keyword} 또는 {pushId: keyword} 형태 대응
@@ -275,79 +476,105 @@ def get_search_keywords():
     return list(SEARCH_KEYWORDS)
 
 
-def main():
-    start_time = time.time()
-
-    # 전체 수집 데이터 저장
-    all_collected_data = []
-    keyword_results = {}
-    keyword_bid_details = {}  # 키워드별 공고 목록 (팝업용)
-
-    # 검색 키워드: RTDB(대시보드 설정 탭)에서 우선 로드, 없으면 config 기본값
-    keywords = get_search_keywords()
-
-    print("\n📦 다중 키워드 입찰 + 개찰 통합 수집을 시작합니다...")
-    print(f"검색 조건: 기간 {DEFAULT_INPUT['start_date']} ~ {DEFAULT_INPUT['end_date']}")
-    print(f"검색 키워드: {', '.join(keywords)}")
-    print("※ 용역 카테고리만 수집합니다.")
+def run_keyword_stage(keywords, report, checkpoint, manifest, wide_sweep=False):
+    """키워드별 입찰공고 수집·보강·업로드. 광역 수집에 성공하면 AX 가 재사용할 행을 돌려준다."""
+    remaining = []
+    for keyword in keywords:
+        done_items = checkpoint.keyword_items(keyword)
+        if done_items is None:
+            remaining.append(keyword)
+            continue
+        print(f"⏭️ 체크포인트: 키워드 '{keyword}' 이미 완료 ({len(done_items)}건), 수집·업로드 생략")
+        for item in done_items:
+            report.add(keyword, item)
+
+    # 🌐 광역 수집 모드면 기간 전체를 한 번만 훑어 페이지마다 분류·보강·업로드한다
+    ax_prefetched = None
+    if wide_sweep and remaining:
+        ax_rows = []
+        try:
+            upload_batches(iter_wide_sweep_batches(remaining, checkpoint, ax_rows), report, manifest)
+            for keyword in remaining:
+                print(f"✅ 키워드 '{keyword}' 완료: {report.count(keyword)}건 수집")
+                checkpoint.mark_keyword_done(keyword, report.entries(keyword))
+            ax_prefetched = {
+                "begin": DEFAULT_INPUT["start_date"] + "0000",
+                "end": DEFAULT_INPUT["end_date"] + "2359",
+                "rows": ax_rows,
+            }
+            remaining = []
+        except Exception as e:
+            if isinstance(e, RuntimeError) and str(e).startswith("G2B_AUTH_ERROR"):
+                raise
+            print(f"❌ 광역 수집 실패, 키워드별 수집으로 전환합니다: {e}")
+            report.discard(remaining)
 
-    # 🔄 각 키워드별로 순차 처리
-    for i, keyword in enumerate(keywords, 1):
+    # 🔄 남은 키워드별로 순차 처리 (수집·보강 묶음이 나오는 대로 업로드)
+    for i, keyword in enumerate(remaining, 1):
         print(f"\n{'='*50}")
-        print(f"🎯 [{i}/{len(keywords)}] 키워드: '{keyword}' 처리 중...")
+        print(f"🎯 [{i}/{len(remaining)}] 키워드: '{keyword}' 처리 중...")
         print(f"{'='*50}")
         
         try:
-            keyword_data = process_single_keyword(keyword)
-            
-            # 키워드별 결과 저장
-            keyword_results[keyword] = len(keyword_data)
-            
-            # 키워드별 공고 목록 저장
-            keyword_bid_details[keyword] = [
-                {"공고명": item["공고명"], "채권자명": item["채권자명"]}
-                for item in keyword_data
-            ]
-            
-            # 전체 데이터에 추가
-            all_collected_data.extend(keyword_data)
-            
-            print(f"✅ 키워드 '{keyword}' 완료: {len(keyword_data)}건 수집")
-            
-            if keyword_data:
-                # 키워드별로 Firebase에 즉시 업로드
-                upload_to_firebase(keyword_data)
+            failures = []
+            upload_batches(iter_keyword_batches(keyword, checkpoint, failures), report, manifest)
+            print(f"✅ 키워드 '{keyword}' 완료: {report.count(keyword)}건 수집")
+            # 도중에 죽거나 카테고리가 실패했으면 이 키워드는 다음 --resume 에서 다시 수집한다 (보강은 캐시 재사용)
+            if failures:
+                print(f"⚠️ 키워드 '{keyword}' 일부 카테고리 실패({', '.join(failures)}): 체크포인트에 완료로 남기지 않습니다")
+            else:
+                checkpoint.mark_keyword_done(keyword, report.entries(keyword))
         except Exception as e:
             # 인증/권한 문제는 더 진행해도 의미 없으므로 즉시 실패 처리
             if isinstance(e, RuntimeError) and str(e).startswith("G2B_AUTH_ERROR"):
                 raise
             print(f"❌ 키워드 '{keyword}' 처리 중 오류: {e}")
-            keyword_results[keyword] = 0
+            report.discard([keyword])
 
-    # ── AX 키워드 Firestore 수집 ──────────────────────────
-    ax_result = {"keyword": "AX", "total_collected": 0, "upserted_records": 0, "bid_details": []}
-    try:
-        from ax_collector import collect_ax_data
-        ax_result = collect_ax_data()
-        keyword_results["AX"] = ax_result["upserted_records"]
-    except Exception as e:
-        print(f"❌ AX Firestore 수집 중 오류: {e}")
-        keyword_results["AX"] = 0
+    return ax_prefetched
+
+
+def run_ax_stage(checkpoint, prefetched=None):
+    """AX 키워드 Firestore 수집 (체크포인트에 있으면 그 결과)."""
+    if checkpoint.stage_result("ax") is not None:
+        print("⏭️ 체크포인트: AX 수집 이미 완료, 생략")
+        return checkpoint.stage_result("ax")
+    from ax_collector import collect_ax_data
+    ax_result = collect_ax_data(prefetched=prefetched)
+    # 수집기가 삼킨 API 오류가 있으면 --resume 때 다시 돌도록 완료로 남기지 않는다
+    if ax_result.get("errors"):
+        print(f"⚠️ AX 수집 중 오류 {len(ax_result['errors'])}건: 체크포인트에 완료로 남기지 않습니다")
+    else:
+        checkpoint.mark_stage("ax", ax_result)
+    return ax_result
+
+
+def run_prespec_stage(checkpoint, keywords):
+    """사전규격 / 발주계획 Firestore 수집 (체크포인트에 있으면 그 결과)."""
+    if checkpoint.stage_result("prespec") is not None:
+        print("⏭️ 체크포인트: 사전규격/발주계획 수집 이미 완료, 생략")
+        return checkpoint.stage_result("prespec")
+    from prespec_collector import collect_prespec_data
+    prespec_result = collect_prespec_data(keywords)
+    if prespec_result.get("errors"):
+        print(f"⚠️ 사전규격/발주계획 수집 중 오류 {len(prespec_result['errors'])}건: 체크포인트에 완료로 남기지 않습니다")
+    else:
+        checkpoint.mark_stage("prespec", prespec_result)
+    return prespec_result
 
-    # ── 사전규격 / 발주계획 Firestore 수집 ────────────────
-    prespec_result = {"pre_spec_count": 0, "order_plan_count": 0, "imminent": []}
-    try:
-        from prespec_collector import collect_prespec_data
-        prespec_result = collect_prespec_data(keywords)
-    except Exception as e:
-        print(f"❌ 사전규격/발주계획 수집 중 오류: {e}")
+
+def write_report(keywords, report, manifest, ax_result, prespec_result):
+    """수집 결과 요약·상세를 collection_result.json 과 RTDB 에 저장하고 요약을 돌려준다."""
+    keyword_results = {keyword: report.count(keyword) for keyword in keywords}
+    keyword_results["AX"] = ax_result["upserted_records"]
 
     # 🎉 최종 결과 출력
     print(f"\n{'='*50}")
     print("🎉 전체 키워드 수집 완료!")
     print(f"{'='*50}")
     
-    total_count = len(all_collected_data)
+    report.add_ax(ax_result.get("bid_details", []))
+    total_count = report.total_count
     print(f"📊 총 수집 데이터 (RTDB): {total_count}건")
     print(f"📊 AX 수집 데이터 (Firestore): {ax_result['upserted_records']}건 업서트")
     
@@ -357,55 +584,170 @@ def main():
 
     import json
 
-    # AX 키워드별 공고 목록도 추가
-    keyword_bid_details["AX"] = ax_result.get("bid_details", [])
+    # AX / 사전규격이 건드린 키(리포트용)와 경로별 쓰기 전 값(롤백용)
+    manifest.record_keys("ax_bids", ax_result.get("written_keys", []))
+    manifest.record_keys("ax_bids_removed", ax_result.get("removed_keys", []))
+    for name, keys in (prespec_result.get("keys") or {}).items():
+        manifest.record_keys(name, keys)
+    for write in (ax_result.get("writes") or []) + (prespec_result.get("writes") or []):
+        manifest.record_write(write["path"], write["before"])
 
-    # 결과 정보를 파일로 저장 (GitHub Actions에서 읽기 위해)
-    result_info = {
+    if not total_count:
+        print("⚠️ RTDB 수집된 데이터가 없습니다. (AX는 별도 확인)")
+
+    # 요약 (대시보드가 매번 읽는 작은 노드)
+    summary = {
         "total_count": total_count,
         "collection_date": _now_kst().strftime('%Y-%m-%d %H:%M:%S'),
         "keyword_results": keyword_results,
         "keywords": keywords,
-        "keyword_bid_details": keyword_bid_details,
-        "bid_details": [
-            {
-                "공고명": item["공고명"],
-                "채권자명": item["채권자명"]
-            } for item in all_collected_data
-        ],
         "ax_result": {
             "upserted_records": ax_result["upserted_records"],
             "total_collected": ax_result["total_collected"],
             "filtered_records": ax_result.get("filtered_records", 0),
         },
-        "ax_bid_details": ax_result.get("bid_details", []),
         "prespec_result": {
             "pre_spec_count": prespec_result.get("pre_spec_count", 0),
             "order_plan_count": prespec_result.get("order_plan_count", 0),
+            "row_budget_hits": len(prespec_result.get("row_budget_hits") or []),
         },
         "imminent_opinions": prespec_result.get("imminent", []),
     }
+    # 상세 (키워드별 레코드 참조만. 제목은 /bids, /ax_bids 에 이미 있다)
+    details = report.details(summary["collection_date"])
+
+    # 결과 정보를 파일로 저장 (GitHub Actions에서 읽기 위해). 메일에 제목이 필요해
+    # 파일에는 참조 → 공고명/채권자명 표(bids)를 한 번씩만 싣는다.
+    result_info = {
+        **summary,
+        "keyword_bids": details["keyword_bids"],
+        "bids": report.bid_table,
+        # 이번 실행이 쓴 RTDB 경로와 이전 값, AX/사전규격 키. RTDB 결과 노드에는 올리지 않는다.
+        "manifest": manifest.to_dict(),
+    }
 
     # G2B_API 폴더에 저장 (GitHub Actions 이메일 알림용)
     with open('collection_result.json', 'w', encoding='utf-8') as f:
-        json.dump(result_info, f, ensure_ascii=False, indent=2)
+        json.dump(result_info, f, ensure_ascii=False, separators=(',', ':'))
     
-    # Firebase RTDB에 수집 결과 저장 (프론트엔드에서 실시간 조회)
+    # Firebase RTDB에 수집 결과 저장 (프론트엔드에서 실시간 조회). 요약·상세를 한 번의 다중 경로 update 로
     try:
         initialize_firebase()
-        collection_ref = db.reference('/collection_results/latest')
-        collection_ref.set(result_info)
-        print("✅ 수집 결과를 Firebase RTDB /collection_results/latest 에 저장했습니다.")
+        from firebase_admin import db
+        db.reference('/').update({
+            RESULT_SUMMARY_PATH.strip('/'): summary,
+            RESULT_DETAILS_PATH.strip('/'): details,
+        })
+        print(f"✅ 수집 결과를 Firebase RTDB {RESULT_SUMMARY_PATH} (+ {RESULT_DETAILS_PATH}) 에 저장했습니다.")
     except Exception as e:
         print(f"⚠️ Firebase RTDB에 수집 결과 저장 실패 (무시하고 계속): {e}")
 
-    if all_collected_data:
-        # 기존 데이터에 대한 user_inputs 생성
-        create_missing_user_inputs()
-    else:
-        print("⚠️ RTDB 수집된 데이터가 없습니다. (AX는 별도 확인)")
+    return summary
+
+
+def main(wide_sweep=False, resume=False):
+    # API 키는 첫 요청 때 읽으므로, 빠졌으면 아무것도 하기 전에 실패시킨다
+    get_api_key()
+    start_time = time.time()
+    run_at = _now_kst()
+    api_stats.reset()
+
+    # 검색 키워드: RTDB(대시보드 설정 탭)에서 우선 로드, 없으면 config 기본값
+    keywords = get_search_keywords()
+
+    # 리포트는 업로드하는 대로 누적한다 (수집 레코드 전체를 끝까지 들고 있지 않는다)
+    report = ReportAggregator(keywords)
+
+    print("\n📦 다중 키워드 입찰 + 개찰 통합 수집을 시작합니다...")
+    print(f"검색 조건: 기간 {DEFAULT_INPUT['start_date']} ~ {DEFAULT_INPUT['end_date']}")
+    print(f"검색 키워드: {', '.join(keywords)}")
+    print(f"※ 수집 카테고리: {', '.join(api['desc'] for api in BID_ENDPOINTS)} (BID_CATEGORIES 로 변경)")
+
+    # 💾 체크포인트: 같은 기간·모드의 이전 실행이 중간에 죽었으면(--resume) 이어서 한다
+    run_key = f"{DEFAULT_INPUT['start_date']}-{DEFAULT_INPUT['end_date']}-{'wide' if wide_sweep else 'keyword'}"
+    checkpoint = RunCheckpoint.open(run_key, resume=resume)
+
+    # 📜 이번 실행이 쓴 RTDB 경로 기록 (check_firebase.py rollback 용).
+    # 체크포인트 상태와 같은 dict 를 써서 --resume 해도 앞선 시도의 기록이 이어진다.
+    manifest = RunManifest(checkpoint.state.setdefault("manifest", {}))
+
+    # 🧭 단계: AX·사전규격은 입찰공고 결과를 쓰지 않아 키워드 수집과 동시에 돈다.
+    # 광역 수집이면 AX 는 광역 수집이 받아 둔 행을 재사용하므로 키워드 단계 뒤에 돈다.
+    ax_result_default = {"keyword": "AX", "total_collected": 0, "upserted_records": 0, "bid_details": []}
+    prespec_result_default = {"pre_spec_count": 0, "order_plan_count": 0, "imminent": []}
+
+    def value(results, name, default):
+        return results[name].value if results[name].ok else default
+
+    # RTDB 에 쓰는 단계는 기본 시간 제한을 두지 않는다 (STAGE_TIMEOUT_* 로만 켠다)
+    stages = [
+        Stage("keywords",
+              lambda r: run_keyword_stage(keywords, report, checkpoint, manifest, wide_sweep),
+              timeout=stage_timeout("keywords")),
+        Stage("ax",
+              lambda r: run_ax_stage(checkpoint, value(r, "keywords", None) if wide_sweep else None),
+              after=("keywords",) if wide_sweep else (),
+              timeout=stage_timeout("ax")),
+        Stage("prespec",
+              lambda r: run_prespec_stage(checkpoint, keywords),
+              timeout=stage_timeout("prespec")),
+        # 기존 데이터에 대한 user_inputs 생성 (업로드 뒤, 매니페스트에 담기도록 결과 저장 전에)
+        Stage("user_inputs",
+              lambda r: create_missing_user_inputs(manifest) if report.total_count else None,
+              requires=("keywords",),
+              timeout=stage_timeout("user_inputs")),
+        Stage("report",
+              lambda r: write_report(keywords, report, manifest,
+                                     value(r, "ax", ax_result_default),
+                                     value(r, "prespec", prespec_result_default)),
+              requires=("keywords",),
+              after=("ax", "prespec", "user_inputs")),
+    ]
+    results = run_stages(stages)
+
+    # 키워드 단계가 실패(인증 오류 등)했으면 결과를 저장하지 않고 실행을 실패로 끝낸다
+    if not results["keywords"].ok:
+        raise results["keywords"].error
+
+    # 📈 실행 이력 (요약 + 단계별 시간 + API 호출 지표) 누적
+    if results["report"].ok:
+        record_run(build_entry(
+            results["report"].value,
+            run_at=run_at,
+            duration_s=time.time() - start_time,
+            stages={name: r.seconds for name, r in results.items()},
+            failed_stages={name: r.status for name, r in results.items() if not r.ok},
+            mode='wide' if wide_sweep else 'keyword',
+        ))
+
+        # 끝까지 왔으면 다음 실행은 처음부터
+        checkpoint.clear()
 
     print_execution_time(start_time)
 
+def parse_main_arguments():
+    parser = argparse.ArgumentParser(description='G2B 다중 키워드 입찰 데이터 수집 → Firebase 적재')
+    parser.add_argument('--wide-sweep',
+                        action='store_true',
+                        default=os.environ.get('COLLECT_MODE', '').lower() == 'wide',
+                        help='키워드 없이 기간 전체 공고를 한 번 받아 로컬에서 키워드별로 분류 '
+                             '(환경변수 COLLECT_MODE=wide 와 같음)')
+    parser.add_argument('--resume',
+                        action='store_true',
+                        default=os.environ.get('RESUME_RUN', '').lower() in ('1', 'true', 'yes'),
+                        help='같은 기간의 이전 실행이 중간에 실패했으면 완료된 키워드·보강·단계를 건너뛰고 이어서 실행 '
+                             '(환경변수 RESUME_RUN=1 과 같음)')
+    parser.add_argument('--daemon',
+                        action='store_true',
+                        default=os.environ.get('DAEMON_MODE', '').lower() in ('1', 'true', 'yes'),
+                        help='프로세스를 띄워 둔 채 출처마다 주기적으로 변경분만 받아 적재 '
+                             '(daemon_mode.py, 환경변수 DAEMON_MODE=1 과 같음)')
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_main_arguments()
+    if args.daemon:
+        from daemon_mode import run_daemon
+        run_daemon()
+    else:
+        main(wide_sweep=args.wide_sweep, resume=args.resume)
\ No newline at end of file
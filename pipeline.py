@@ -0,0 +1,78 @@
+"""
+수집 → 보강 → 업로드 → 리포트 스트리밍 파이프라인 부품.
+
+main.main() 은 키워드마다 수집·보강 결과를 통째로 리스트로 모은 뒤 업로드하고, 리포트용으로
+전체 목록을 끝까지 들고 있었다. 수집 기간을 길게 잡으면(START_DATE 를 1년 전으로 두는 백필)
+메모리가 기간에 비례해 커진다.
+
+여기서는 단계 사이를 크기 제한이 있는 큐로 잇는다.
+
+  bounded(source)    source 를 별도 스레드에서 돌려 maxsize 묶음까지만 미리 만든다.
+                     소비가 느리면 생산이 기다리므로 메모리에 떠 있는 묶음 수가 고정된다.
+  merge(sources)     여러 source(엔드포인트별 수집)를 각자 스레드로 돌려 한 큐로 합친다.
+                     한 source 안의 순서는 유지되고, source 사이 순서는 도착 순이다.
+
+생산 쪽 예외는 소비 쪽 next() 에서 그대로 다시 올라온다. 소비 쪽이 중간에 멈추면
+(예외, break) 생산 스레드는 다음 put 에서 멈춘다.
+"""
+
+import os
+import queue
+import threading
+
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "4"))   # 단계 사이 대기 묶음 수
+
+_DONE = object()
+
+
+class _Error:
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+def _feed(source, q: queue.Queue, stop: threading.Event):
+    """source 를 q 에 넣는다. 끝나면 _DONE, 실패하면 _Error 하나를 넣는다."""
+
+    def put(value) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(value, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    try:
+        for item in source:
+            if not put(item):
+                return
+        put(_DONE)
+    except BaseException as e:
+        put(_Error(e))
+
+
+def merge(sources, maxsize: int = PIPELINE_QUEUE_SIZE, name: str = "pipeline"):
+    """sources 를 스레드 하나씩으로 돌려 도착하는 대로 내보낸다."""
+    sources = list(sources)
+    q: queue.Queue = queue.Queue(maxsize=max(1, maxsize))
+    stop = threading.Event()
+    for i, source in enumerate(sources):
+        threading.Thread(target=_feed, args=(source, q, stop), name=f"{name}-{i}", daemon=True).start()
+
+    remaining = len(sources)
+    try:
+        while remaining:
+            item = q.get()
+            if item is _DONE:
+                remaining -= 1
+            elif isinstance(item, _Error):
+                raise item.exc
+            else:
+                yield item
+    finally:
+        stop.set()
+
+
+def bounded(source, maxsize: int = PIPELINE_QUEUE_SIZE, name: str = "pipeline"):
+    """source 를 앞서 maxsize 묶음까지만 만들어 두는 생성기로 감싼다."""
+    return merge([source], maxsize=maxsize, name=name)
@@ -4,6 +4,26 @@
 - API 키: BID_API_KEY (config.py에서 공유. 입찰공고 수집과 동일 키)
 - Firebase: main.py 의 initialize_firebase() 가 띄운 기본 앱(RTDB)을 그대로 쓴다
 - 경로: /pre_specs/{bfSpecRgstNo}, /order_plans/{orderPlanUntyNo}
+        /pre_spec_deadlines/{의견마감일 YYYYMMDD}/{bfSpecRgstNo}  (마감 임박 알림용 요약 인덱스)
+        단계 교체(기본)에서는 실제 데이터가 /pre_specs_v/{runId}, /order_plans_v/{runId} 에 있고
+        /pre_specs_current, /order_plans_current 포인터가 현재 버전을 가리킨다 (upsert 참고)
+        예전 단일 노드 /pre_specs, /order_plans 도 같은 내용으로 유지한다 (PRESPEC_MIRROR_LEGACY)
+
+증분 수집:
+  365일 창을 매일 키워드마다 다시 훑으면 999건 페이지를 여러 번 받지만 새로 생긴 건
+  하루치뿐이다. (출처, 키워드)별로 마지막 수집 시각(워터마크)을 /prespec_sync 에 두고,
+  평소에는 워터마크 - PRESPEC_OVERLAP_HOURS 부터만 받아 저장된 집합에 합친다.
+  등록일(rgstDt → nticeDt → collectedAt)이 365일 지난 건은 합칠 때 지운다.
+  워터마크가 없는 키워드(새로 추가된 키워드)는 그 키워드만 365일 전체를 받는다.
+
+  전체 재수집은 마지막 전체 수집 뒤 PRESPEC_FULL_SWEEP_DAYS(기본 7일)가 지났거나
+  PRESPEC_FULL_SWEEP=1 일 때. 이때는 예전처럼 노드를 이번 결과로 교체한다
+  (대상에서 빠진 키워드의 건도 이때 정리된다).
+
+구간 나누기:
+  조회 구간의 totalCount 가 PRESPEC_WINDOW_PAGES 페이지를 넘으면 구간을 반으로 나눠 다시
+  살핀다. 넓은 키워드의 365일 전체 수집도 페이지 상한에 걸리지 않고 끝까지, 동시에 받는다.
+  끝난 구간의 결과는 PRESPEC_WINDOW_CACHE_DIR 에 두어 재실행 때 다시 받지 않는다.
 
 RTDB 를 쓰는 이유:
   Firestore 는 "문서 읽기 건수"로 과금해 1,387건 컬렉션을 한 번 훑을 때마다
@@ -16,14 +36,21 @@ RTDB 를 쓰는 이유:
 API 스펙: 조달청API_발주계획_사전규격_스펙.md
 """
 
+import hashlib
+import json
+import math
+import os
 import re
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from urllib.parse import unquote
 
-import requests
-
-from config import BID_API_KEY
+from config import get_api_key
+from keyword_matcher import get_matcher, is_acronym
+from record_schema import decode_date, project
+from run_history import api_stats
+from utils import RateLimiter, http_session
 
 # ── 상수 ──────────────────────────────────────────────
 # 반드시 https. http(80포트)는 무응답으로 타임아웃 발생.
@@ -34,6 +61,8 @@ PLAN_URL = ("https://apis.data.go.kr/1230000/ao/OrderPlanSttusService"
 
 SPEC_PATH = "/pre_specs"
 PLAN_PATH = "/order_plans"
+SYNC_PATH = "/prespec_sync"   # {source}/keywords/{키워드}: 워터마크(YYYYMMDDHHMM), {source}/last_full
+DEADLINE_PATH = "/pre_spec_deadlines"   # {YYYYMMDD}/{키}: 의견마감일별 알림 요약. 적재할 때 함께 고친다
 
 # 대시보드 도메인 구분. 콜센터 키워드는 RTDB /search_keywords 에서 받아 쓰고,
 # AX/BPR/ISP 는 여기에 고정한다 (AX 탭이 이 세 가지를 묶어 부른다).
@@ -41,17 +70,44 @@ DOMAIN_CALLCENTER = "callcenter"
 DOMAIN_AX = "ax"
 AX_KEYWORDS = ["AX", "BPR", "ISP"]
 
-# 영문 약어는 API 가 부분일치로 잡아 Axial / Maxwell / Taxonomy / AXIS 같은
-# 오탐이 섞인다(실측 173건 중 14건, 8%). 단어 경계로 다시 거른다.
-_ACRONYM_RE = {
-    kw: re.compile(rf"(?<![A-Za-z]){kw}(?![A-Za-z])", re.I) for kw in AX_KEYWORDS
-}
-
 ROWS_PER_PAGE = 999          # 999까지 정상 동작 확인
 MAX_RANGE_DAYS = 365         # 366일부터 resultCode 07 (입력범위값 초과)
 LOOKBACK_DAYS = 365
 REQUEST_TIMEOUT = 30
 RETRY = 3
+OVERLAP_HOURS = int(os.getenv("PRESPEC_OVERLAP_HOURS", "24"))     # 늦게 등록·수정된 건을 다시 받는 겹침
+FULL_SWEEP_DAYS = int(os.getenv("PRESPEC_FULL_SWEEP_DAYS", "7"))
+WATERMARK_FMT = "%Y%m%d%H%M"
+# 전체 교체를 버전 노드 + 포인터 전환으로 (upsert 참고). 남길 버전 수는 현재 포함.
+# 실행 롤백이 포인터를 직전 버전으로 돌리므로 직전 버전까지는 항상 남긴다 (최소 2)
+STAGED_SWAP = os.getenv("PRESPEC_STAGED_SWAP", "1").lower() not in ("0", "false", "no")
+KEEP_VERSIONS = max(2, int(os.getenv("PRESPEC_KEEP_VERSIONS", "2")))
+# 단계 교체 중에도 예전 단일 노드(/pre_specs, /order_plans)를 같은 내용으로 유지한다. 포인터를 읽지
+# 않는 쪽(대시보드)이 옮겨 가면 0 으로 끄고 check_firebase.py drop-legacy-prespec 으로 지운다
+MIRROR_LEGACY = os.getenv("PRESPEC_MIRROR_LEGACY", "1").lower() not in ("0", "false", "no")
+# 첫 페이지의 totalCount 로 페이지 수를 정하고 나머지 페이지를 동시에 받는다
+PAGE_WORKERS = int(os.getenv("PRESPEC_PAGE_WORKERS", "4"))
+RATE_PER_SEC = float(os.getenv("PRESPEC_RATE_PER_SEC", "10"))
+# 구간 하나가 이 페이지 수를 넘으면 구간을 반으로 나눈다 (MIN_WINDOW 보다 작게는 안 나눈다)
+WINDOW_PAGES = int(os.getenv("PRESPEC_WINDOW_PAGES", "5"))
+MIN_WINDOW = timedelta(hours=1)
+# 더 나눌 수 없는 구간 하나에서 받을 최대 행 수. 넘으면 잘라 받고 경고를 남긴다
+ROW_BUDGET = int(os.getenv("PRESPEC_ROW_BUDGET", "50000"))
+# 끝난 구간(끝 시각이 겹침 구간보다 앞선 구간)의 결과를 로컬에 두고 재실행 때 다시 쓴다. 0이면 끈다
+WINDOW_CACHE_DIR = os.getenv("PRESPEC_WINDOW_CACHE_DIR", os.path.join(".rtdb_cache", "prespec_windows"))
+WINDOW_CACHE_HOURS = float(os.getenv("PRESPEC_WINDOW_CACHE_HOURS", "20"))
+
+# 두 API 가 같은 서비스키 한도를 쓰므로 리미터 하나를 공유한다
+_limiter = RateLimiter(RATE_PER_SEC)
+
+# 이번 실행에서 행 예산을 넘은 {source, keyword, total, fetched}. collect_prespec_data 가 비운다
+row_budget_hits: list[dict] = []
+# 이번 실행에서 수집·적재에 실패한 '출처 키워드' 또는 오류. collect_prespec_data 가 비운다
+fetch_failures: list[str] = []
+# 이번 실행이 바꾼 경로와 쓰기 전 값 [{path, before}] (실행 롤백용). collect_prespec_data 가 비운다
+manifest_writes: list[dict] = []
+# 이번 실행에서 마감 인덱스에 쓴 'YYYYMMDD/키' (실행 매니페스트용). collect_prespec_data 가 비운다
+deadline_keys: list[str] = []
 
 
 # ── 시간 유틸 ─────────────────────────────────────────
@@ -94,9 +150,12 @@ def _fetch(url: str, params: dict) -> dict:
     last = None
     for attempt in range(RETRY):
         try:
-            r = requests.get(url, params=params, timeout=REQUEST_TIMEOUT)
-            r.raise_for_status()
-            return _parse_body(r.json())
+            _limiter.wait()
+            with api_stats.measure("prespec"):
+                r = http_session().get(url, params=params, timeout=REQUEST_TIMEOUT)
+                r.raise_for_status()
+                body = _parse_body(r.json())
+            return body
         except Exception as exc:
             last = exc
             if attempt < RETRY - 1:
@@ -130,101 +189,242 @@ def split_bid_nos(raw: str) -> list[str]:
 
 
 # ── 수집 ──────────────────────────────────────────────
-def _collect(url: str, keyword_param: str, keyword: str, extra: dict) -> list[dict]:
-    """키워드 1건에 대한 전체 페이지 수집."""
-    end = _now_kst().replace(second=0, microsecond=0)
-    begin = end - timedelta(days=min(LOOKBACK_DAYS, MAX_RANGE_DAYS))
+def _window_begin(since: datetime | None, end: datetime) -> datetime:
+    """조회 시작 시각. since(워터마크)가 있으면 겹침만큼 앞에서, 없으면 365일 전부터."""
+    floor = end - timedelta(days=min(LOOKBACK_DAYS, MAX_RANGE_DAYS))
+    if since is None:
+        return floor
+    return max(floor, since - timedelta(hours=OVERLAP_HOURS))
+
+
+def _split_window(begin: datetime, end: datetime) -> list[tuple[datetime, datetime]]:
+    """[begin, end] 를 둘로 나눈다. 이틀보다 긴 구간은 자정에서 끊어 재실행 때도 같은 구간이 나오게 한다."""
+    mid = begin + (end - begin) / 2
+    if end - begin > timedelta(days=2):
+        mid = mid.replace(hour=0, minute=0, second=0, microsecond=0)
+    else:
+        mid = mid.replace(second=0, microsecond=0)
+    # 조회 시각은 분 단위 양끝 포함이라 왼쪽 구간은 1분 앞에서 끝낸다
+    return [(begin, mid - timedelta(minutes=1)), (mid, end)]
+
+
+class WindowCache:
+    """끝난 조회 구간 하나의 결과(행 목록)를 구간별 json 으로 둔다. 실패는 무시한다."""
+
+    def __init__(self, directory: str | None = WINDOW_CACHE_DIR, ttl_hours: float = WINDOW_CACHE_HOURS):
+        self.directory = directory if ttl_hours > 0 else None
+        self.ttl = timedelta(hours=ttl_hours)
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, key: str, now: datetime) -> list[dict] | None:
+        if not self.directory:
+            return None
+        try:
+            with open(self._file(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            fetched = datetime.fromisoformat(entry["fetched_at"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if entry.get("key") != key or now - fetched > self.ttl:
+            return None
+        return entry.get("rows") or []
+
+    def put(self, key: str, rows: list[dict], now: datetime):
+        if not self.directory:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            target = self._file(key)
+            with open(f"{target}.tmp", "w", encoding="utf-8") as f:
+                json.dump({"key": key, "fetched_at": now.isoformat(), "rows": rows},
+                          f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(f"{target}.tmp", target)
+        except (OSError, TypeError) as e:
+            print(f"    ⚠️ 구간 캐시 저장 실패 (무시하고 계속): {e}")
+
+    def prune(self) -> int:
+        """TTL 이 지난 구간 파일을 지운다. 디렉터리가 actions/cache 로 이어지므로 쌓이지 않게 한다."""
+        if not self.directory:
+            return 0
+        cutoff = time.time() - self.ttl.total_seconds()
+        removed = 0
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                        removed += 1
+        except OSError:
+            pass
+        return removed
+
+
+window_cache = WindowCache()
 
-    params = {
-        "ServiceKey": unquote(BID_API_KEY or "").strip(),
+
+def _collect(url: str, keyword_param: str, keyword: str, extra: dict,
+             end: datetime, since: datetime | None = None, label: str = "") -> list[dict]:
+    """키워드 1건에 대한 전체 페이지 수집.
+
+    조회 구간을 첫 페이지의 totalCount 로 살펴, WINDOW_PAGES 페이지를 넘는 구간은 반으로
+    나눠 다시 살핀다. 나누기가 끝난 구간(리프)들의 나머지 페이지는 PAGE_WORKERS 개씩 동시에
+    받는다. 요청 간격은 공유 리미터(PRESPEC_RATE_PER_SEC)가 맞춘다.
+    끝난 리프는 window_cache 에 두어 재실행 때 다시 받지 않는다.
+    """
+    begin = _window_begin(since, end)
+    now = _now_kst()
+    closed_before = now - timedelta(hours=OVERLAP_HOURS)
+
+    base = {
+        "ServiceKey": unquote(get_api_key() or "").strip(),
         "type": "json",
         "pageNo": 1,
         "numOfRows": ROWS_PER_PAGE,
-        "inqryBgnDt": begin.strftime("%Y%m%d%H%M"),
-        "inqryEndDt": end.strftime("%Y%m%d%H%M"),
         keyword_param: keyword,
     }
-    params.update(extra)
+    base.update(extra)
+
+    def params_of(window: tuple[datetime, datetime]) -> dict:
+        return {**base, "inqryBgnDt": window[0].strftime("%Y%m%d%H%M"),
+                "inqryEndDt": window[1].strftime("%Y%m%d%H%M")}
+
+    def cache_key(window: tuple[datetime, datetime]) -> str:
+        p = params_of(window)
+        return "|".join([url, keyword] + [f"{k}={p[k]}" for k in sorted(p) if k not in ("ServiceKey", "pageNo")])
+
+    def cacheable(window: tuple[datetime, datetime]) -> bool:
+        return window[1] < closed_before
+
+    def probe(window: tuple[datetime, datetime]) -> tuple[list[dict], int]:
+        body = _fetch(url, params_of(window))
+        return list(_items(body)), int(body.get("totalCount") or 0)
+
+    # 1) 구간 나누기: 한 단계씩 동시에 살피고, 큰 구간만 다음 단계로 넘긴다
+    leaves: list[tuple[tuple[datetime, datetime], list[dict], int]] = []
+    cached: list[dict] = []
+    frontier = [(begin, end)]
+    splits = 0
+    with ThreadPoolExecutor(max_workers=max(1, PAGE_WORKERS)) as pool:
+        while frontier:
+            todo = []
+            for window in frontier:
+                hit = window_cache.get(cache_key(window), now) if cacheable(window) else None
+                if hit is None:
+                    todo.append(window)
+                else:
+                    cached.extend(hit)
+            frontier = []
+            for window, (rows, total) in zip(todo, pool.map(probe, todo)):
+                if total > WINDOW_PAGES * ROWS_PER_PAGE and window[1] - window[0] > MIN_WINDOW:
+                    frontier.extend(_split_window(*window))
+                    splits += 1
+                else:
+                    leaves.append((window, rows, total))
+
+        # 2) 리프의 나머지 페이지를 한꺼번에 동시에
+        tasks = []
+        for window, rows, total in leaves:
+            pages = math.ceil(min(total, ROW_BUDGET) / ROWS_PER_PAGE) if rows and len(rows) < total else 1
+            tasks.extend((window, page) for page in range(2, pages + 1))
+            if total > ROW_BUDGET:
+                fetched = min(total, pages * ROWS_PER_PAGE)
+                row_budget_hits.append({"source": label, "keyword": keyword, "total": total, "fetched": fetched})
+                print(f"    ⚠️ '{keyword}' {window[0]:%Y-%m-%d %H:%M}~{window[1]:%Y-%m-%d %H:%M} {total}건이 "
+                      f"행 예산 {ROW_BUDGET}건을 넘어 {fetched}건만 받음 (PRESPEC_ROW_BUDGET)")
+
+        def page_rows(task) -> list[dict]:
+            window, page = task
+            return _items(_fetch(url, {**params_of(window), "pageNo": page}))
+
+        more: dict[tuple, list[dict]] = {}
+        for (window, _), batch in zip(tasks, pool.map(page_rows, tasks)):
+            more.setdefault(window, []).extend(batch)
+
+    out = list(cached)
+    for window, rows, total in leaves:
+        rows = rows + more.get(window, [])
+        if cacheable(window) and total <= ROW_BUDGET:
+            window_cache.put(cache_key(window), rows, now)
+        out.extend(rows)
+    if splits:
+        print(f"    '{keyword}' 조회 구간 {splits}회 분할 → {len(leaves)}개 구간 동시 수집"
+              + (f", 캐시 {len(cached)}건" if cached else ""))
+    return out
 
-    rows, page = [], 1
-    while True:
-        params["pageNo"] = page
-        body = _fetch(url, params)
-        batch = _items(body)
-        rows.extend(batch)
 
-        total = int(body.get("totalCount") or 0)
-        if len(rows) >= total or not batch:
-            break
-        page += 1
-        if page > 20:                     # 안전장치
-            print(f"    ! 페이지 20 초과, 중단 (keyword={keyword})")
-            break
-    return rows
+def _keep(kw: str, hits: list[str]) -> bool:
+    """영문 약어 키워드는 단어 경계로 재검증한다. 한글 키워드는 그대로 통과.
 
+    영문 약어는 API 가 부분일치로 잡아 Axial / Maxwell / Taxonomy / AXIS 같은
+    오탐이 섞인다(실측 173건 중 14건, 8%). hits 는 keyword_matcher 결과.
+    """
+    return kw in hits or not is_acronym(kw)
 
-def _keep(kw: str, title: str) -> bool:
-    """영문 약어 키워드는 단어 경계로 재검증한다. 한글 키워드는 그대로 통과."""
-    rx = _ACRONYM_RE.get(kw.upper())
-    return True if rx is None else bool(rx.search(title or ""))
 
+def _fetch_targets(targets: list[tuple[str, str]], label: str, url: str, keyword_param: str,
+                   key_field: str, extra: dict, end: datetime,
+                   since: dict[str, datetime | None] | None = None) -> tuple[dict[str, dict], list[str]]:
+    """키워드별로 수집하고, 받은 제목 하나를 모든 대상 키워드와 한 번에 대조한다.
+
+    '콜센터' 로 받은 건이 '고객상담' 에도 걸리면 두 키워드·도메인을 함께 단다.
+    키워드마다 따로 받은 목록에만 의존하면 놓치던 교차 태깅이다.
+    since 는 키워드별 워터마크 (없으면 365일 전체). 수집에 성공한 키워드 목록을 함께 돌려준다.
+    """
+    matcher = get_matcher(tuple(kw for kw, _ in targets))
+    domains_of: dict[str, list[str]] = {}
+    for kw, domain in targets:
+        domains_of.setdefault(kw, [])
+        if domain not in domains_of[kw]:
+            domains_of[kw].append(domain)
 
-def fetch_pre_specs(targets: list[tuple[str, str]]) -> dict[str, dict]:
-    """사전규격. 키 = bfSpecRgstNo. targets = [(키워드, 도메인), ...]"""
     uniq: dict[str, dict] = {}
+    collected: list[str] = []
     for kw, domain in targets:
         try:
-            rows = _collect(SPEC_URL, "prdctClsfcNoNm", kw, {"inqryDiv": "1"})
+            rows = _collect(url, keyword_param, kw, extra, end, (since or {}).get(kw), label)
         except Exception as exc:
-            print(f"  [사전규격] '{kw}' 수집 실패: {exc}")
+            print(f"  [{label}] '{kw}' 수집 실패: {exc}")
             continue
+        collected.append(kw)
         kept = 0
         for r in rows:
-            key = (r.get("bfSpecRgstNo") or "").strip()
-            if not key or not _keep(kw, r.get("prdctClsfcNoNm")):
+            key = (r.get(key_field) or "").strip()
+            if not key:
+                continue
+            hits = matcher.find_all(r.get(keyword_param))
+            if not _keep(kw, hits):
                 continue
             kept += 1
             hit = uniq.setdefault(key, r)
             hit.setdefault("_keywords", [])
             hit.setdefault("_domains", [])
-            if kw not in hit["_keywords"]:
-                hit["_keywords"].append(kw)
-            if domain not in hit["_domains"]:
-                hit["_domains"].append(domain)
+            for k in [kw] + hits:
+                if k not in hit["_keywords"]:
+                    hit["_keywords"].append(k)
+                for d in domains_of.get(k, ()):
+                    if d not in hit["_domains"]:
+                        hit["_domains"].append(d)
         drop = len(rows) - kept
-        print(f"  [사전규격][{domain}] '{kw}': {kept}건" + (f" (오탐 {drop}건 제외)" if drop else ""))
-    return uniq
+        print(f"  [{label}][{domain}] '{kw}': {kept}건" + (f" (오탐 {drop}건 제외)" if drop else ""))
+    return uniq, collected
+
 
+def fetch_pre_specs(targets: list[tuple[str, str]], end: datetime,
+                    since: dict[str, datetime | None] | None = None) -> tuple[dict[str, dict], list[str]]:
+    """사전규격. 키 = bfSpecRgstNo. targets = [(키워드, 도메인), ...]"""
+    return _fetch_targets(targets, "사전규격", SPEC_URL, "prdctClsfcNoNm", "bfSpecRgstNo",
+                          {"inqryDiv": "1"}, end, since)
 
-def fetch_order_plans(targets: list[tuple[str, str]]) -> dict[str, dict]:
+
+def fetch_order_plans(targets: list[tuple[str, str]], end: datetime,
+                      since: dict[str, datetime | None] | None = None) -> tuple[dict[str, dict], list[str]]:
     """발주계획. 키 = orderPlanUntyNo. targets = [(키워드, 도메인), ...]"""
-    now = _now_kst()
-    uniq: dict[str, dict] = {}
-    for kw, domain in targets:
-        try:
-            rows = _collect(PLAN_URL, "bizNm", kw, {
-                "orderBgnYm": f"{now.year - 1}01",
-                "orderEndYm": f"{now.year + 1}12",
-            })
-        except Exception as exc:
-            print(f"  [발주계획] '{kw}' 수집 실패: {exc}")
-            continue
-        kept = 0
-        for r in rows:
-            key = (r.get("orderPlanUntyNo") or "").strip()
-            if not key or not _keep(kw, r.get("bizNm")):
-                continue
-            kept += 1
-            hit = uniq.setdefault(key, r)
-            hit.setdefault("_keywords", [])
-            hit.setdefault("_domains", [])
-            if kw not in hit["_keywords"]:
-                hit["_keywords"].append(kw)
-            if domain not in hit["_domains"]:
-                hit["_domains"].append(domain)
-        drop = len(rows) - kept
-        print(f"  [발주계획][{domain}] '{kw}': {kept}건" + (f" (오탐 {drop}건 제외)" if drop else ""))
-    return uniq
+    return _fetch_targets(targets, "발주계획", PLAN_URL, "bizNm", "orderPlanUntyNo", {
+        "orderBgnYm": f"{end.year - 1}01",
+        "orderEndYm": f"{end.year + 1}12",
+    }, end, since)
 
 
 # ── 정규화 / 적재 ─────────────────────────────────────
@@ -243,7 +443,8 @@ def _normalize(record: dict, source: str) -> dict:
             record.get(f"specDocFileUrl{i}") for i in range(1, 6)
             if (record.get(f"specDocFileUrl{i}") or "").strip()
         ]
-    return out
+    # 대시보드가 쓰는 필드만, 날짜·금액은 간결 인코딩으로 (record_schema)
+    return project(source, out)
 
 
 def _safe_key(raw: str) -> str:
@@ -254,73 +455,404 @@ def _safe_key(raw: str) -> str:
     return out
 
 
-def upsert(path: str, records: dict[str, dict], source: str) -> int:
-    """RTDB 경로에 통째로 덮어쓴다.
+def live_path(path: str) -> str:
+    """지금 읽고 고칠 노드. 포인터({path}_current)가 있으면 그 버전, 없으면 예전 단일 노드."""
+    from firebase_admin import db as rtdb
 
-    키워드가 바뀌면 더 이상 대상이 아닌 건이 남을 수 있어 set() 으로 교체한다.
-    365일 창을 매번 새로 훑으므로 부분 갱신보다 전체 교체가 상태를 단순하게 한다.
+    if not STAGED_SWAP:
+        return path
+    pointer = rtdb.reference(f"{path}_current").get() or {}
+    return f"/{pointer['path']}" if pointer.get("path") else path
+
+
+def _stage(path: str, payload: dict[str, dict], run_id: str) -> str:
+    """payload 를 새 버전 노드 {path}_v/{run_id} 에 나눠 쓰고 건수를 확인한다. 실패하면 버전을 지운다."""
+    from firebase_admin import db as rtdb
+    from rtdb_bulk import write_updates
+
+    version = f"{path.strip('/')}_v/{run_id}"
+    try:
+        write_updates({f"{version}/{key}": value for key, value in payload.items()})
+        written = rtdb.reference(version).get(shallow=True) or {}
+        if len(written) != len(payload):
+            raise RuntimeError(f"버전 노드 건수 불일치: {len(written)}/{len(payload)}")
+    except Exception:
+        rtdb.reference(version).delete()
+        raise
+    return version
+
+
+def _swap(path: str, version: str, count: int, now: datetime):
+    """포인터 {path}_current 를 version 으로 한 번에 바꾸고 오래된 버전을 지운다.
+
+    예전 단일 노드는 지우지 않는다 (MIRROR_LEGACY, check_firebase.py drop-legacy-prespec).
     """
     from firebase_admin import db as rtdb
 
+    pointer = path.strip("/") + "_current"
+    # 롤백은 포인터를 직전 버전으로 돌리고 새 버전을 지운다 (직전 버전은 아래 정리에서 남긴다)
+    previous = rtdb.reference(pointer).get()
+    manifest_writes.append({"path": pointer, "before": previous})
+    manifest_writes.append({"path": version, "before": None})
+    rtdb.reference("/").update({pointer: {
+        "path": version,
+        "version": version.rsplit("/", 1)[1],
+        "count": count,
+        "swappedAt": now.isoformat(),
+    }})
+
+    # 방금 바꾼 버전 + 그 전 KEEP_VERSIONS-1 개만 남긴다 (직전 버전을 읽던 쪽이 끝낼 수 있도록)
+    versions_root = f"{path.strip('/')}_v"
+    current = version.rsplit("/", 1)[1]
+    versions = sorted(rtdb.reference(versions_root).get(shallow=True) or {}, reverse=True)
+    keep = {current} | set([v for v in versions if v < current][:KEEP_VERSIONS - 1])
+    if (previous or {}).get("version"):
+        keep.add(previous["version"])    # 롤백이 돌아갈 버전
+    gc = {f"{versions_root}/{v}": None for v in versions if v not in keep}
+    if gc:
+        rtdb.reference("/").update(gc)
+        print(f"  [{path}] 이전 버전 {len(gc)}개 정리")
+
+
+def _replace_node(path: str, payload: dict[str, dict], extra: dict | None = None) -> int:
+    """path 노드를 payload 로 교체한다 (저장된 값과 비교해 바뀐 건만 설정 + 빠진 키 삭제).
+
+    extra(인덱스 갱신분 등)도 같은 write_updates 로 보낸다. 지운 건수를 돌려준다.
+    """
+    from rtdb_bulk import write_updates
+    from rtdb_cache import cached_get
+
+    existing = cached_get(path) or {}
+    root = path.strip("/")
+    # 수집 시각 말고 바뀐 게 없는 건은 쓰지 않는다 (merge_upsert 와 같다)
+    updates = {f"{root}/{key}": value for key, value in payload.items()
+               if not _unchanged(value, existing.get(key))}
+    stale = [key for key in existing if key not in payload]
+    updates.update({f"{root}/{key}": None for key in stale})
+    updates.update(extra or {})
+    _record_before(updates, {path: existing, **_index_snapshots()})
+    write_updates(updates)
+    return len(stale)
+
+
+def _index_snapshots() -> dict:
+    """전체 교체 때 함께 고치는 색인 노드의 지금 값 (deadline_updates·reconcile_updates 가 이미 읽은 캐시)."""
+    from bid_links import LINKS_PATH
+    from rtdb_cache import cached_get
+
+    return {DEADLINE_PATH: cached_get(DEADLINE_PATH), LINKS_PATH: cached_get(LINKS_PATH)}
+
+
+def _record_before(updates: dict, snapshots: dict):
+    """updates 를 쓰기 전 값을 manifest_writes 에 남긴다 (check_firebase.py rollback)."""
+    from rtdb_bulk import before_values
+
+    manifest_writes.extend(before_values(updates, snapshots))
+
+
+def upsert(path: str, records: dict[str, dict], source: str, run_id: str | None = None) -> int:
+    """RTDB 경로를 이번 수집 결과로 교체한다.
+
+    키워드가 바뀌면 더 이상 대상이 아닌 건이 남을 수 있어 전체를 교체한다.
+    365일 창을 매번 새로 훑으므로 부분 갱신보다 전체 교체가 상태를 단순하게 한다.
+
+    단계 교체(PRESPEC_STAGED_SWAP, 기본): 새 버전 노드 {path}_v/{run_id} 에 나눠 쓰고 건수를
+    확인한 뒤 작은 포인터 {path}_current 를 한 번에 바꾼다. 읽는 쪽은 포인터를 읽고 그
+    버전을 읽으므로 쓰는 도중이나 실패한 쓰기를 보지 않는다.
+    끄면 예전처럼 살아 있는 노드에 기존 키 목록(shallow)과 비교해 건별 설정 + 빠진 키
+    삭제를 rtdb_bulk.write_updates 로 나눠 보낸다. MIRROR_LEGACY 면 단계 교체 뒤 예전 단일
+    노드도 같은 방식으로 맞춘다.
+    마감 인덱스(사전규격)와 공고번호 색인(/bid_links)도 함께 맞춘다.
+    """
+    from bid_links import reconcile_updates
+    from rtdb_bulk import write_updates
+
     if not records:
         print(f"  [{source}] 적재할 데이터가 없습니다.")
         return 0
 
     payload = {_safe_key(k): _normalize(v, source) for k, v in records.items()}
-    rtdb.reference(path).set(payload)
-    print(f"  [{source}] RTDB 적재 완료: {len(payload)}건 → {path}")
+    index_updates = {}
+    if source == "pre_spec":
+        index_updates.update(deadline_updates(payload, replace=True))
+    index_updates.update(reconcile_updates(source, {key: rec.get("bidNtceNos") for key, rec in payload.items()}))
+
+    if STAGED_SWAP and run_id:
+        now = _now_kst()
+        version = _stage(path, payload, run_id)
+        _swap(path, version, len(payload), now)
+        if MIRROR_LEGACY:
+            # 포인터를 아직 읽지 않는 쪽을 위해 예전 단일 노드도 같은 내용으로 맞춘다
+            _replace_node(path, payload, index_updates)
+        elif index_updates:
+            _record_before(index_updates, _index_snapshots())
+            write_updates(index_updates)
+        mirrored = f", {path} 동기화" if MIRROR_LEGACY else ""
+        print(f"  [{source}] RTDB 적재 완료: {len(payload)}건 → /{version} (포인터 {path}_current 전환{mirrored})")
+        return len(payload)
+
+    stale = _replace_node(path, payload, index_updates)
+    extra = f", 대상에서 빠진 {stale}건 삭제" if stale else ""
+    print(f"  [{source}] RTDB 적재 완료: {len(payload)}건 → {path}{extra}")
     return len(payload)
 
 
-# ── 의견마감 임박 추출 ────────────────────────────────
-def imminent_opinions(specs: dict[str, dict], days: int = 3) -> list[dict]:
+def _record_day(record: dict) -> str:
+    """보존 기간 판단 날짜 'YYYYMMDD'. 등록일 → 공고일 → 수집 시각 순. 없으면 ''."""
+    for field in ("rgstDt", "nticeDt", "collectedAt"):
+        digits = re.sub(r"\D", "", str(record.get(field) or ""))[:8]
+        if len(digits) == 8:
+            return digits
+    return ""
+
+
+def _unchanged(record: dict, stored: dict | None) -> bool:
+    """collectedAt 을 빼면 저장된 값과 같은가."""
+    if not stored:
+        return False
+    return ({k: v for k, v in record.items() if k != "collectedAt"}
+            == {k: v for k, v in stored.items() if k != "collectedAt"})
+
+
+def merge_upsert(path: str, records: dict[str, dict], source: str, now: datetime,
+                 mirror: str | None = None) -> tuple[int, dict]:
+    """증분 수집분을 저장된 집합에 합치고 365일 지난 건을 지운다.
+
+    저장된 집합은 rtdb_cache 로 읽는다 (의견마감 임박 추출도 전체 집합이 필요하다).
+    쓰는 것은 이번에 받아 바뀐 건과 만료된 건의 삭제뿐이다. (저장 건수, 합친 집합)을 돌려준다.
+    공고번호 색인은 바뀐 건의 예전 bidNtceNos 와 비교해 빠진 공고번호에서 뺀다.
+    mirror 경로(예전 단일 노드)가 있으면 같은 쓰기·삭제를 거기에도 한다.
+    """
+    from bid_links import LINKS_PATH, build_index, link_updates
+    from rtdb_bulk import write_updates
+    from rtdb_cache import cached_get
+
+    before = cached_get(path) or {}
+    stored = dict(before)     # 캐시 객체는 고치지 않는다
+    payload = {_safe_key(k): _normalize(v, source) for k, v in records.items()}
+    # 겹침 구간에서 다시 받은 건 중 수집 시각 말고 바뀐 게 없는 건은 쓰지 않는다
+    # (데몬 모드는 몇 분마다 같은 구간을 다시 받는다)
+    payload = {key: rec for key, rec in payload.items() if not _unchanged(rec, before.get(key))}
+    stored.update(payload)
+
+    cutoff = (now - timedelta(days=LOOKBACK_DAYS)).strftime("%Y%m%d")
+    expired = [key for key, rec in stored.items() if "" < _record_day(rec or {}) < cutoff]
+    for key in expired:
+        stored.pop(key)
+
+    root = path.strip("/")
+    updates = {f"{root}/{key}": value for key, value in payload.items()}
+    updates.update({f"{root}/{key}": None for key in expired})
+    if mirror:
+        mirror_root = mirror.strip("/")
+        updates.update({f"{mirror_root}/{key}": value for key, value in payload.items()})
+        updates.update({f"{mirror_root}/{key}": None for key in expired})
+    if source == "pre_spec":
+        # 인덱스가 아직 없으면(처음 배포) 저장된 집합 전체로 만든다
+        updates.update(deadline_updates(payload, removed=expired, bootstrap=stored))
+    changed = {key: rec.get("bidNtceNos") for key, rec in payload.items()}
+    changed.update({key: [] for key in expired})
+    updates.update(link_updates(source, changed, {key: (before.get(key) or {}).get("bidNtceNos") for key in changed}))
+    if updates:
+        # 예전 단일 노드는 살아 있는 노드와 같은 내용으로 맞춰 두므로 같은 스냅샷으로 본다
+        old = {key: before[key] for key in changed if key in before}
+        snapshots = {path: before, LINKS_PATH: build_index(old if source == "pre_spec" else None,
+                                                            old if source == "order_plan" else None, None, None)}
+        if mirror:
+            snapshots[mirror] = before
+        if source == "pre_spec":
+            snapshots[DEADLINE_PATH] = cached_get(DEADLINE_PATH)
+        _record_before(updates, snapshots)
+        write_updates(updates)
+    extra = f", 365일 지난 {len(expired)}건 삭제" if expired else ""
+    print(f"  [{source}] RTDB 증분 적재 완료: 신규/갱신 {len(payload)}건 → {path} (총 {len(stored)}건){extra}")
+    return len(stored), stored
+
+
+# ── 증분 수집 상태 (워터마크) ─────────────────────────
+def _load_sync(source: str) -> dict:
+    from firebase_admin import db as rtdb
+
+    state = rtdb.reference(f"{SYNC_PATH}/{source}").get() or {}
+    return {"last_full": state.get("last_full"), "keywords": state.get("keywords") or {}}
+
+
+def _parse_watermark(raw) -> datetime | None:
+    try:
+        return datetime.strptime(str(raw), WATERMARK_FMT).replace(tzinfo=_now_kst().tzinfo)
+    except (TypeError, ValueError):
+        return None
+
+
+def _full_sweep_due(last_full: str | None, now: datetime) -> bool:
+    try:
+        last = datetime.fromisoformat(last_full)
+    except (TypeError, ValueError):
+        return True
+    if last.tzinfo is None and now.tzinfo is not None:
+        last = last.replace(tzinfo=now.tzinfo)
+    return now - last >= timedelta(days=FULL_SWEEP_DAYS)
+
+
+def sync_source(source: str, path: str, fetch, targets: list[tuple[str, str]], label: str,
+                now: datetime, force_full: bool = False,
+                incremental_only: bool = False) -> tuple[int, list[str], dict]:
+    """출처 하나를 증분(또는 전체) 수집해 적재하고 워터마크를 올린다.
+
+    incremental_only 면 전체 수집 주기가 지났어도 증분만 한다 (전체 수집은 일일 실행 몫).
+
+    Returns:
+        (저장 건수, 이번에 쓴 키, 저장된 집합)
+    """
+    from rtdb_bulk import write_updates
+
+    state = _load_sync(source)
+    full = not incremental_only and (force_full or _full_sweep_due(state["last_full"], now))
+    since = None if full else {kw: _parse_watermark(state["keywords"].get(_safe_key(kw))) for kw, _ in targets}
+    print(f"  [{label}] {'전체' if full else '증분'} 수집"
+          + ("" if full else f" (워터마크 - {OVERLAP_HOURS}시간부터)"))
+
+    records, collected = fetch(targets, now, since)
+    print(f"  [{label}] 고유 {len(records)}건")
+
+    failed = [kw for kw, _ in targets if kw not in collected]
+    fetch_failures.extend(f"{label} '{kw}'" for kw in failed)
+    if full and failed:
+        # 일부 키워드가 실패한 결과로 교체하면 그 키워드의 건이 모두 사라진다. 받은 건만 합친다
+        print(f"  [{label}] 전체 수집 중 {len(failed)}개 키워드 실패({', '.join(failed)}): "
+              "교체하지 않고 받은 건만 합칩니다")
+        full = False
+
+    if full:
+        count = upsert(path, records, source, run_id=now.strftime("%Y%m%d%H%M%S"))
+        stored = {_safe_key(k): v for k, v in records.items()}
+    else:
+        live = live_path(path)
+        mirror = path if MIRROR_LEGACY and live != path else None
+        count, stored = merge_upsert(live, records, source, now, mirror=mirror)
+
+    # 적재까지 끝난 키워드만 워터마크를 올린다. 전체 수집은 모든 키워드가 성공했을 때만 완료로 친다
+    mark = now.strftime(WATERMARK_FMT)
+    marks = {f"{SYNC_PATH.strip('/')}/{source}/keywords/{_safe_key(kw)}": mark for kw in collected}
+    if full and len(collected) == len(targets) and records:
+        marks[f"{SYNC_PATH.strip('/')}/{source}/last_full"] = now.isoformat()
+    if marks:
+        write_updates(marks)
+    return count, [_safe_key(k) for k in records], stored
+
+
+# ── 의견마감 인덱스 ───────────────────────────────────
+def _deadline_entry(record: dict) -> tuple[str, dict] | None:
+    """(마감일 'YYYYMMDD', 알림 요약). 의견마감일이 없으면 None."""
+    raw = str(decode_date(record.get("opninRgstClseDt")) or "").strip()
+    day = re.sub(r"\D", "", raw)[:8]
+    if len(day) != 8:
+        return None
+    try:
+        eok = round(int(record.get("asignBdgtAmt") or 0) / 100_000_000, 1)
+    except (TypeError, ValueError):
+        eok = 0.0
+    # 키를 ASCII로 둔다. 워크플로의 jq가 한글 키에는 .["품명"] 형식을 요구해
+    # 표현식이 장황해지고 따옴표 중첩으로 깨지기 쉽다.
+    return day, {
+        "title": record.get("prdctClsfcNoNm", ""),
+        "institution": record.get("orderInsttNm", ""),
+        "amountEok": eok,
+        "deadline": raw,
+        "docUrl": (record.get("specDocFileUrl1") or (record.get("specDocUrls") or [""])[0] or ""),
+    }
+
+
+def deadline_updates(records: dict[str, dict], removed=(), replace: bool = False,
+                     bootstrap: dict[str, dict] | None = None) -> dict:
+    """/pre_spec_deadlines 를 records(키 → 정규화된 레코드)에 맞추는 다중 경로 갱신분.
+
+    마감일이 바뀐 건은 예전 날짜에서 빼고, removed 키는 지운다. replace 면 records 에 없는
+    인덱스 항목을 모두 지운다 (전체 수집). 오늘 이전 날짜 노드는 통째로 지운다.
+    인덱스가 비어 있고 bootstrap 이 있으면 bootstrap 전체로 새로 만든다.
+    """
+    from rtdb_cache import cached_get
+
+    index = cached_get(DEADLINE_PATH) or {}
+    if not index and bootstrap:
+        records = bootstrap
+    today = _now_kst().strftime("%Y%m%d")
+    root = DEADLINE_PATH.strip("/")
+    day_of = {key: day for day, entries in index.items() if day >= today for key in (entries or {})}
+
+    updates = {f"{root}/{day}": None for day in index if day < today}
+    if replace:
+        removed = [key for key in day_of if key not in records]
+    for key in removed:
+        if key in day_of:
+            updates[f"{root}/{day_of[key]}/{key}"] = None
+    for key, record in records.items():
+        hit = _deadline_entry(record)
+        day = hit[0] if hit and hit[0] >= today else None
+        if key in day_of and day_of[key] != day:
+            updates[f"{root}/{day_of[key]}/{key}"] = None
+        if day:
+            updates[f"{root}/{day}/{key}"] = hit[1]
+            deadline_keys.append(f"{day}/{key}")
+    return updates
+
+
+def imminent_opinions(days: int = 3) -> list[dict]:
     """의견등록 마감이 days일 이내로 남은 건. 메일 알림용.
 
-    의견수렴 기간이 중앙값 5일로 짧아 상시 3~4건 수준이다.
+    의견수렴 기간이 중앙값 5일로 짧아 상시 3~4건 수준이다. 전체 사전규격을 훑지 않고
+    마감 인덱스에서 오늘 ~ days+1일 뒤 날짜 노드만 범위로 읽는다.
     """
+    from firebase_admin import db as rtdb
+
     now = _now_kst().replace(tzinfo=None)
+    days_range = rtdb.reference(DEADLINE_PATH).order_by_key() \
+        .start_at(now.strftime("%Y%m%d")) \
+        .end_at((now + timedelta(days=days + 1)).strftime("%Y%m%d")).get() or {}
+
     out = []
-    for s in specs.values():
-        raw = (s.get("opninRgstClseDt") or "").strip()
-        if not raw:
-            continue
-        try:
-            close = datetime.strptime(raw[:19], "%Y-%m-%d %H:%M:%S")
-        except ValueError:
-            continue
-        remain = (close - now).days
-        if 0 <= remain <= days:
+    for entries in days_range.values():
+        for entry in (entries or {}).values():
             try:
-                eok = round(int(s.get("asignBdgtAmt") or 0) / 100_000_000, 1)
-            except (TypeError, ValueError):
-                eok = 0.0
-            # 키를 ASCII로 둔다. 워크플로의 jq가 한글 키에는 .["품명"] 형식을 요구해
-            # 표현식이 장황해지고 따옴표 중첩으로 깨지기 쉽다.
-            out.append({
-                "title": s.get("prdctClsfcNoNm", ""),
-                "institution": s.get("orderInsttNm", ""),
-                "amountEok": eok,
-                "deadline": raw,
-                "dday": remain,
-                "docUrl": (s.get("specDocFileUrl1") or ""),
-            })
-    return sorted(out, key=lambda x: x["dday"])
+                close = datetime.strptime(entry["deadline"][:19], "%Y-%m-%d %H:%M:%S")
+            except (KeyError, TypeError, ValueError):
+                continue
+            remain = (close - now).days
+            if 0 <= remain <= days:
+                out.append({**entry, "dday": remain})
+    return sorted(out, key=lambda x: (x["dday"], x["deadline"]))
 
 
 # ── 메인 ──────────────────────────────────────────────
-def collect_prespec_data(keywords: list[str]) -> dict:
+def collect_prespec_data(keywords: list[str], full_sweep: bool | None = None,
+                         incremental_only: bool = False) -> dict:
     """사전규격 + 발주계획을 수집해 RTDB에 적재한다.
 
+    full_sweep 이 None 이면 PRESPEC_FULL_SWEEP 환경변수를 따른다. 거짓이어도 마지막 전체
+    수집 뒤 PRESPEC_FULL_SWEEP_DAYS 가 지났으면 전체 수집한다. incremental_only 면 (데몬 폴링)
+    그래도 전체 수집하지 않고 다음 일일 실행에 맡긴다.
+
     Returns:
         dict: {
-            "pre_spec_count": int,      # 적재된 사전규격 건수
-            "order_plan_count": int,    # 적재된 발주계획 건수
+            "pre_spec_count": int,      # 저장된 사전규격 건수
+            "order_plan_count": int,    # 저장된 발주계획 건수
             "imminent": list[dict],     # 의견마감 D-3 이내 (메일용)
+            "keys": dict[str, list],    # 경로별 이번에 쓴 키 (실행 매니페스트용)
+            "row_budget_hits": list,    # 행 예산(PRESPEC_ROW_BUDGET)을 넘어 잘린 키워드
+            "writes": list[dict],       # [{path, before}] 쓰기 전 값 (실행 롤백용)
+            "errors": list[str],        # 실패한 키워드·적재 (있으면 체크포인트에 완료로 남기지 않는다)
         }
     """
-    result = {"pre_spec_count": 0, "order_plan_count": 0, "imminent": []}
-
-    if not BID_API_KEY:
+    result = {"pre_spec_count": 0, "order_plan_count": 0, "imminent": [], "keys": {},
+              "row_budget_hits": [], "writes": [], "errors": []}
+    row_budget_hits.clear()
+    fetch_failures.clear()
+    manifest_writes.clear()
+    deadline_keys.clear()
+    if full_sweep is None:
+        full_sweep = os.getenv("PRESPEC_FULL_SWEEP", "").lower() in ("1", "true", "yes")
+
+    if not get_api_key(required=False):
         print("[사전규격] BID_API_KEY 없음. 수집을 건너뜁니다.")
         return result
     if not keywords:
@@ -330,6 +862,9 @@ def collect_prespec_data(keywords: list[str]) -> dict:
     print(f"\n{'='*50}")
     print("🎯 [사전규격/발주계획] RTDB 수집 시작")
     print(f"{'='*50}")
+    pruned = window_cache.prune()
+    if pruned:
+        print(f"  [사전규격] 만료된 구간 캐시 {pruned}개 정리")
 
     # RTDB 기본 앱은 main.py 가 초기화한다. 단독 실행 시를 대비해 한 번 더 확인.
     try:
@@ -341,30 +876,47 @@ def collect_prespec_data(keywords: list[str]) -> dict:
             initialize_firebase()
         except Exception as exc:
             print(f"[사전규격] RTDB 초기화 실패: {exc}. 수집을 건너뜁니다.")
+            result["errors"].append(f"RTDB 초기화 실패: {exc}")
             return result
 
     # 콜센터 도메인은 대시보드 설정 탭(RTDB)에서 관리하는 키워드,
     # AX 도메인은 AX/BPR/ISP 고정. 한 건이 양쪽에 걸릴 수 있어 _domains 는 배열이다.
     targets = ([(kw, DOMAIN_CALLCENTER) for kw in keywords]
                + [(kw, DOMAIN_AX) for kw in AX_KEYWORDS])
-
-    specs = fetch_pre_specs(targets)
-    print(f"  [사전규격] 고유 {len(specs)}건")
-    plans = fetch_order_plans(targets)
-    print(f"  [발주계획] 고유 {len(plans)}건")
+    now = _now_kst().replace(second=0, microsecond=0)
 
     try:
-        result["pre_spec_count"] = upsert(SPEC_PATH, specs, "pre_spec")
-        result["order_plan_count"] = upsert(PLAN_PATH, plans, "order_plan")
+        result["pre_spec_count"], spec_keys, _ = sync_source(
+            "pre_spec", SPEC_PATH, fetch_pre_specs, targets, "사전규격", now, full_sweep,
+            incremental_only)
+        result["keys"][SPEC_PATH.strip("/")] = spec_keys
     except Exception as exc:
         print(f"[사전규격] RTDB 적재 실패: {exc}")
+        fetch_failures.append(f"사전규격 적재: {exc}")
+    try:
+        result["order_plan_count"], plan_keys, _ = sync_source(
+            "order_plan", PLAN_PATH, fetch_order_plans, targets, "발주계획", now, full_sweep,
+            incremental_only)
+        result["keys"][PLAN_PATH.strip("/")] = plan_keys
+    except Exception as exc:
+        print(f"[발주계획] RTDB 적재 실패: {exc}")
+        fetch_failures.append(f"발주계획 적재: {exc}")
 
-    result["imminent"] = imminent_opinions(specs, days=3)
-    print(f"  [사전규격] 의견마감 D-3 이내: {len(result['imminent'])}건")
+    if deadline_keys:
+        result["keys"][DEADLINE_PATH.strip("/")] = list(deadline_keys)
+    try:
+        result["imminent"] = imminent_opinions(days=3)
+        print(f"  [사전규격] 의견마감 D-3 이내: {len(result['imminent'])}건")
+    except Exception as exc:
+        print(f"[사전규격] 의견마감 인덱스 조회 실패: {exc}")
+    result["row_budget_hits"] = list(row_budget_hits)
+    result["errors"].extend(fetch_failures)
+    result["writes"] = list(manifest_writes)
 
     return result
 
 
 if __name__ == "__main__":
+    import sys
     from config import SEARCH_KEYWORDS
-    print(collect_prespec_data(list(SEARCH_KEYWORDS)))
+    print(collect_prespec_data(list(SEARCH_KEYWORDS), full_sweep=True if "--full" in sys.argv else None))
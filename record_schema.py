@@ -0,0 +1,183 @@
+"""
+출처별 저장 필드 투영 + 간결 인코딩 (/pre_specs, /order_plans, /ax_bids).
+
+API 응답은 한 건에 수십 개 필드가 오지만 대시보드·알림이 쓰는 것은 일부다. 예전에는 받은
+필드를 전부 저장하고 파생 필드(bidNtceNos, specDocUrls 등)를 더 얹어, 저장량·업로드·대시보드
+다운로드가 모두 쓰지 않는 필드 값만큼 컸다. 적재 직전에 출처별 스키마로
+
+  - 남길 필드만 고르고 (RECORD_EXTRA_FIELDS_{출처} 로 더할 수 있다)
+  - 날짜는 14자리 정수 YYYYMMDDHHMMSS ("2025-07-15 10:00:00" → 20250715100000)
+  - 금액은 정수 ("150000000" → 150000000)
+  - 빈 문자열·None 은 뺀다
+
+날짜 정수는 자릿수가 같아 RTDB order_by_child 정렬이 그대로 시간순이다. 읽는 쪽은
+decode_record() 로 예전 문자열 형태를 되돌려 받는다 (대시보드는 README 4-4 의 규칙대로).
+RECORD_PROJECTION=0 이면 예전처럼 받은 필드를 그대로 저장한다.
+
+기존 노드 변환: python check_firebase.py compact-records [--dry-run]
+"""
+
+import os
+import re
+from dataclasses import dataclass
+from datetime import datetime
+
+RECORD_PROJECTION = os.getenv("RECORD_PROJECTION", "1").lower() not in ("0", "false", "no")
+
+DATE_DIGITS = 14
+
+
+def encode_date(value):
+    """날짜 문자열을 14자리 정수로. 날짜로 읽을 수 없으면 그대로 둔다. 이미 정수면 그대로."""
+    if isinstance(value, int) or value is None:
+        return value
+    digits = re.sub(r"\D", "", str(value))[:DATE_DIGITS]
+    if len(digits) < 8:
+        return value
+    return int(digits.ljust(DATE_DIGITS, "0"))
+
+
+def decode_date(value) -> str:
+    """encode_date 의 반대. 20250715100000 → '2025-07-15 10:00:00'. 문자열은 그대로."""
+    if not isinstance(value, int):
+        return value
+    d = str(value).rjust(DATE_DIGITS, "0")
+    return f"{d[0:4]}-{d[4:6]}-{d[6:8]} {d[8:10]}:{d[10:12]}:{d[12:14]}"
+
+
+def parse_date(value) -> datetime | None:
+    """저장된 날짜(인코딩 여부 무관)를 datetime 으로. 없거나 깨졌으면 None."""
+    if value is None:
+        return None
+    raw = decode_date(value)
+    if not isinstance(raw, str):
+        return None
+    try:
+        return datetime.fromisoformat(raw.replace(" ", "T"))
+    except ValueError:
+        return None
+
+
+_PLAIN_NUMBER = re.compile(r"-?[0-9]+(\.[0-9]+)?")
+
+
+def encode_number(value):
+    """'150000000' → 150000000, '1.5' → 1.5. 평범한 십진수가 아니면 그대로 둔다.
+
+    float() 는 'nan'·'inf' 도 받아 주는데, RTDB JSON 은 NaN/Infinity 를 거부해 청크 쓰기
+    전체가 실패하므로 숫자와 소수점만 있는 문자열만 바꾼다.
+    """
+    if not isinstance(value, str):
+        return value
+    text = value.replace(",", "").strip()
+    match = _PLAIN_NUMBER.fullmatch(text)
+    if not match:
+        return value
+    return float(text) if match.group(1) else int(text)
+
+
+@dataclass(frozen=True, slots=True)
+class RecordSchema:
+    fields: tuple[str, ...]
+    dates: tuple[str, ...] = ()
+    numbers: tuple[str, ...] = ()
+
+    def project(self, record: dict) -> dict:
+        """남길 필드만, 날짜·금액은 간결 인코딩으로. 빈 값은 뺀다."""
+        out = {}
+        for field in self.fields:
+            value = record.get(field)
+            if value is None or value == "" or value == []:
+                continue
+            if field in self.dates:
+                value = encode_date(value)
+            elif field in self.numbers:
+                value = encode_number(value)
+            out[field] = value
+        return out
+
+    def decode(self, record: dict) -> dict:
+        """project 의 날짜 인코딩을 되돌린다 (금액은 정수 그대로)."""
+        out = dict(record)
+        for field in self.dates:
+            if field in out:
+                out[field] = decode_date(out[field])
+        return out
+
+
+def _with_extra(source: str, schema: RecordSchema) -> RecordSchema:
+    extra = [f.strip() for f in os.getenv(f"RECORD_EXTRA_FIELDS_{source.upper()}", "").split(",") if f.strip()]
+    if not extra:
+        return schema
+    return RecordSchema(schema.fields + tuple(f for f in extra if f not in schema.fields),
+                        schema.dates, schema.numbers)
+
+
+# 수집기가 얹는 파생 필드
+_DERIVED = ("_source", "_domains", "_keywords", "bidNtceNos", "collectedAt")
+
+SCHEMAS = {
+    name: _with_extra(name, schema) for name, schema in {
+        "pre_spec": RecordSchema(
+            fields=("bfSpecRgstNo", "refNo", "prdctClsfcNoNm", "orderInsttNm", "rlDminsttNm",
+                    "asignBdgtAmt", "rcptDt", "opninRgstClseDt", "dlvrTmlmtDt", "bsnsDivNm",
+                    "ofclNm", "ofclTelNo", "rgstDt", "chgDt", "specDocUrls") + _DERIVED,
+            dates=("rcptDt", "opninRgstClseDt", "dlvrTmlmtDt", "rgstDt", "chgDt", "collectedAt"),
+            numbers=("asignBdgtAmt",),
+        ),
+        "order_plan": RecordSchema(
+            fields=("orderPlanUntyNo", "bizNm", "orderInsttNm", "totlmngInsttNm", "jrsdctnDivNm",
+                    "orderYear", "orderMnth", "sumOrderAmt", "cntrctMthdNm", "prcrmntMethd",
+                    "bsnsDivNm", "ofclNm", "telNo", "nticeDt") + _DERIVED,
+            dates=("nticeDt", "collectedAt"),
+            numbers=("sumOrderAmt",),
+        ),
+        "ax": RecordSchema(
+            fields=("bidNtceNo", "bidNtceOrd", "untyNtceNo", "bidNtceNm", "ntceKindNm",
+                    "ntceInsttNm", "dminsttNm", "bidNtceDt", "bidBeginDt", "bidClseDt", "opengDt",
+                    "presmptPrce", "asignBdgtAmt", "bidMethdNm", "cntrctCnclsMthdNm", "srvceDivNm",
+                    "ntceInsttOfclNm", "ntceInsttOfclTelNo", "bidNtceDtlUrl", "bidNtceUrl",
+                    "collectedAt"),
+            dates=("bidNtceDt", "bidBeginDt", "bidClseDt", "opengDt", "collectedAt"),
+            numbers=("presmptPrce", "asignBdgtAmt"),
+        ),
+    }.items()
+}
+
+
+def project(source: str, record: dict) -> dict:
+    """source 스키마로 투영. RECORD_PROJECTION=0 이거나 스키마가 없으면 그대로."""
+    schema = SCHEMAS.get(source)
+    if not RECORD_PROJECTION or schema is None:
+        return record
+    return schema.project(record)
+
+
+def decode_record(source: str, record: dict) -> dict:
+    """저장된 레코드를 예전 형태(날짜 문자열)로. 인코딩 전 레코드는 그대로 돌아온다."""
+    schema = SCHEMAS.get(source)
+    if schema is None or not record:
+        return record
+    return schema.decode(record)
+
+
+# ── 기존 노드 변환 ────────────────────────────────────
+# 출처 → 저장 경로
+SOURCE_PATHS = {"pre_spec": "/pre_specs", "order_plan": "/order_plans", "ax": "/ax_bids"}
+
+
+def plan_compact(source: str, node: dict | None, path: str | None = None) -> "BulkPlan":
+    """저장된 source 노드(path, 기본 SOURCE_PATHS)를 스키마대로 다시 쓰는 계획. 이미 간결한 레코드는 건너뛴다."""
+    from rtdb_bulk import BulkPlan
+
+    path = path or SOURCE_PATHS[source]
+    plan = BulkPlan(f"{path} 필드 투영/인코딩")
+    schema = SCHEMAS[source]
+    root = path.strip("/")
+    for key, record in (node or {}).items():
+        if not isinstance(record, dict):
+            continue
+        compact = schema.project(record)
+        if compact != record:
+            plan.set(f"{root}/{key}", compact, before=record)
+    return plan
@@ -0,0 +1,303 @@
+"""
+RTDB 일괄 변경 엔진.
+
+check_firebase.py 의 정리/마이그레이션 도구는 건마다 get()/update()/delete() 를
+왕복했다. 수천 건이면 수천 번의 HTTP 요청이다. 여기서는
+
+  1. 필요한 트리를 한 번 읽고
+  2. 바꿀 내용을 메모리에서 BulkPlan 으로 계획한 뒤
+  3. 루트 기준 다중 경로 update() 로 묶어 적용한다 (값이 None 이면 삭제)
+
+적용 전에 print_diff() 로 무엇이 바뀌는지 확인할 수 있고, dry_run 이면 적용하지 않는다.
+
+주의: 한 번의 다중 경로 update() 안에서 한 경로가 다른 경로의 조상이면 RTDB 가
+거부한다. 계획을 세울 때 같은 노드를 통째로 지우면서 그 하위를 따로 고치지 않는다.
+청크는 병렬로 나가므로 청크 사이에도 순서를 기대하지 않는다.
+
+큰 쓰기(write_updates):
+  경로 수(DEFAULT_CHUNK_SIZE)와 직렬화 크기(RTDB_CHUNK_BYTES) 둘 다 넘지 않게 청크로
+  나누고, RTDB_WRITE_WORKERS 개 스레드로 동시에 보낸다. dict 의 리스트로 넘긴 묶음은 한
+  청크에 함께 넣는다. 동시에 나가 있는 요청은 스레드 수를 넘지 않는다. 실패한 청크만
+  WRITE_RETRY 회까지 다시 보내고, 그래도 실패한 청크가 있으면 나머지를 다 보낸 뒤
+  RuntimeError 를 올린다.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+DEFAULT_CHUNK_SIZE = 500      # update() 1회당 경로 수
+# update() 1회당 직렬화 크기 상한. RTDB REST 쓰기 한도(256MB)보다 한참 작게 잡아 요청 하나가
+# 오래 걸리거나 타임아웃 나지 않게 한다.
+RTDB_CHUNK_BYTES = int(os.getenv("RTDB_CHUNK_BYTES", str(4 * 1024 * 1024)))
+RTDB_WRITE_WORKERS = int(os.getenv("RTDB_WRITE_WORKERS", "4"))
+WRITE_RETRY = 3
+
+_MISSING = object()
+
+
+def _norm(path: str) -> str:
+    return "/".join(p for p in str(path).split("/") if p)
+
+
+def _preview(value, width: int = 60) -> str:
+    text = repr(value)
+    return text if len(text) <= width else text[: width - 3] + "..."
+
+
+class BulkPlan:
+    """경로 → 새 값(None 이면 삭제) 계획. before 는 diff 출력용 기존 값."""
+
+    def __init__(self, description: str = ""):
+        self.description = description
+        self.updates: dict[str, object] = {}
+        self.before: dict[str, object] = {}
+
+    def set(self, path: str, value, before=_MISSING):
+        key = _norm(path)
+        self.updates[key] = value
+        if before is not _MISSING:
+            self.before[key] = before
+
+    def delete(self, path: str, before=_MISSING):
+        self.set(path, None, before)
+
+    def merge(self, other: "BulkPlan"):
+        self.updates.update(other.updates)
+        self.before.update(other.before)
+
+    def __len__(self):
+        return len(self.updates)
+
+    def __bool__(self):
+        return bool(self.updates)
+
+    def counts(self) -> dict[str, int]:
+        deletes = sum(1 for v in self.updates.values() if v is None)
+        return {"set": len(self.updates) - deletes, "delete": deletes}
+
+    def diff_lines(self, limit: int | None = 20) -> list[str]:
+        """'+ 경로 = 값' / '- 경로' / '~ 경로: 기존 → 새 값' 형식."""
+        lines = []
+        for path, value in self.updates.items():
+            if limit is not None and len(lines) >= limit:
+                lines.append(f"  ... 외 {len(self.updates) - limit}건")
+                break
+            old = self.before.get(path, _MISSING)
+            if value is None:
+                lines.append(f"  - {path}" + ("" if old is _MISSING else f"  ({_preview(old)})"))
+            elif old is _MISSING or old is None:
+                lines.append(f"  + {path} = {_preview(value)}")
+            else:
+                lines.append(f"  ~ {path}: {_preview(old)} → {_preview(value)}")
+        return lines
+
+    def print_diff(self, limit: int | None = 20):
+        c = self.counts()
+        title = f" {self.description}" if self.description else ""
+        print(f"\n📝 변경 계획{title}: 설정 {c['set']}건, 삭제 {c['delete']}건")
+        for line in self.diff_lines(limit):
+            print(line)
+
+
+def _size(path: str, value) -> int:
+    return len(path) + len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+
+
+def _split_oversized(path: str, value, max_bytes: int):
+    """값 하나가 max_bytes 를 넘으면 하위 경로로 나눈다. 나눈 경로는 병합 쓰기가 되므로
+    그 노드 아래 기존 키는 지워지지 않는다 (교체가 필요하면 호출 쪽이 삭제 경로를 함께 넣는다)."""
+    if not isinstance(value, (dict, list)) or not value or _size(path, value) <= max_bytes:
+        yield path, value
+        return
+    children = value.items() if isinstance(value, dict) else enumerate(value)
+    for key, child in children:
+        yield from _split_oversized(f"{path}/{key}", child, max_bytes)
+
+
+def chunk_updates(updates: dict | list[dict], *, max_paths: int = DEFAULT_CHUNK_SIZE,
+                  max_bytes: int = RTDB_CHUNK_BYTES):
+    """다중 경로 update 를 경로 수 / 직렬화 크기 상한 안의 청크들로 나눈다.
+
+    updates 가 dict 의 리스트면 dict 하나(묶음)는 청크 경계에서 자르지 않고 한 청크에 넣는다.
+    묶음 하나가 상한보다 클 때만 그 묶음을 나눈다.
+    """
+    groups = updates if isinstance(updates, list) else [{path: value} for path, value in updates.items()]
+    chunk, size = {}, 0
+    for group in groups:
+        items = [(sub_path, sub_value, _size(sub_path, sub_value))
+                 for path, value in group.items()
+                 for sub_path, sub_value in _split_oversized(_norm(path), value, max_bytes)]
+        if chunk and (len(chunk) + len(items) > max_paths or size + sum(s for _, _, s in items) > max_bytes):
+            yield chunk
+            chunk, size = {}, 0
+        for sub_path, sub_value, item_size in items:
+            if chunk and (len(chunk) >= max_paths or size + item_size > max_bytes):
+                yield chunk
+                chunk, size = {}, 0
+            chunk[sub_path] = sub_value
+            size += item_size
+    if chunk:
+        yield chunk
+
+
+def _send_chunk(root, chunk: dict, retries: int):
+    last = None
+    for attempt in range(retries):
+        try:
+            root.update(chunk)
+            return
+        except Exception as exc:
+            last = exc
+            if attempt < retries - 1:
+                time.sleep(2 * (attempt + 1))
+    raise last
+
+
+def write_updates(updates: dict | list[dict], *, workers: int = RTDB_WRITE_WORKERS, max_paths: int = DEFAULT_CHUNK_SIZE,
+                  max_bytes: int = RTDB_CHUNK_BYTES, retries: int = WRITE_RETRY) -> int:
+    """루트 기준 다중 경로 update 를 청크로 나눠 병렬로 보낸다. 보낸 경로 수를 돌려준다.
+
+    함께 반영돼야 하는 경로는 dict 의 리스트로 묶어 넘기면 같은 청크(update 한 번)로 나간다.
+    청크 사이에는 순서도 원자성도 없다.
+
+    동시에 나가 있는 요청은 workers 개를 넘지 않는다. 청크마다 retries 회까지 다시 보내고,
+    끝내 실패한 청크가 있으면 나머지를 다 보낸 뒤 RuntimeError 를 올린다.
+    """
+    if not updates:
+        return 0
+
+    from firebase_admin import db
+
+    root = db.reference("/")
+    chunks = list(chunk_updates(updates, max_paths=max_paths, max_bytes=max_bytes))
+    total = sum(len(chunk) for chunk in chunks)
+    done = 0
+    failed = []
+    workers = max(1, workers)
+
+    def finish(future, chunk):
+        nonlocal done
+        try:
+            future.result()
+        except Exception as exc:
+            failed.append((chunk, exc))
+            print(f"  ⚠️ 청크 {len(chunk)}개 경로 적용 실패: {exc}")
+            return
+        done += len(chunk)
+        print(f"  🔄 {done}/{total} 경로 적용")
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        in_flight = {}
+        for chunk in chunks:
+            if len(in_flight) >= workers:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    finish(future, in_flight.pop(future))
+            in_flight[pool.submit(_send_chunk, root, chunk, retries)] = chunk
+        for future in list(in_flight):
+            finish(future, in_flight.pop(future))
+
+    if failed:
+        paths = sum(len(chunk) for chunk, _ in failed)
+        raise RuntimeError(f"RTDB 쓰기 실패: 청크 {len(failed)}개({paths}개 경로). 마지막 오류: {failed[-1][1]}")
+    return done
+
+
+def apply_plan(plan: BulkPlan, *, dry_run: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """계획을 chunk_size 경로씩 다중 경로 update() 로 적용한다 (write_updates). 적용한 경로 수를 돌려준다."""
+    if not plan:
+        print("ℹ️ 적용할 변경이 없습니다.")
+        return 0
+    if dry_run:
+        print(f"🧪 dry-run: {len(plan)}개 경로는 적용하지 않았습니다.")
+        return 0
+
+    return write_updates(plan.updates, max_paths=chunk_size)
+
+
+def iter_bids(bids_tree: dict | None):
+    """/bids/{연도}/{월}/{bid_id} 트리를 (연도, 월, bid_id, 데이터) 로 펼친다."""
+    for year, months in (bids_tree or {}).items():
+        if not isinstance(months, dict):
+            continue
+        for month, bids in months.items():
+            if not isinstance(bids, dict):
+                continue
+            for bid_id, bid in bids.items():
+                yield year, month, bid_id, bid
+
+
+# ── 실행 매니페스트 / 롤백 ───────────────────────────
+def lookup(tree, path: str):
+    """노드 값 tree 안에서 상대 경로 path 의 값. 없으면 None."""
+    node = tree
+    for part in _norm(path).split("/") if _norm(path) else ():
+        if not isinstance(node, dict):
+            return None
+        node = node.get(part)
+    return node
+
+
+def before_values(updates: dict, snapshots: dict) -> list[dict]:
+    """updates 를 쓰기 전 값을 [{"path", "before"}] 로 (RunManifest.record_write 용).
+
+    snapshots = {루트 경로: 쓰기 전 그 노드의 값}. 경로가 속한 가장 깊은 루트에서 찾고,
+    어느 루트에도 속하지 않으면 None(새로 만든 경로)으로 본다. 값이 바뀌지 않는 경로는 뺀다.
+    """
+    roots = sorted((_norm(root) for root in snapshots), key=len, reverse=True)
+    trees = {_norm(root): tree for root, tree in snapshots.items()}
+    writes = []
+    for path, value in updates.items():
+        key = _norm(path)
+        before = None
+        for root in roots:
+            if key == root or key.startswith(root + "/"):
+                before = lookup(trees[root], key[len(root):])
+                break
+        if before != value:
+            writes.append({"path": key, "before": before})
+    return writes
+
+
+class RunManifest:
+    """한 번의 수집 실행이 RTDB 에 쓴 정확한 경로와 쓰기 전 값.
+
+    data = {
+        "writes": [{"path": "bids/2025/05/R25..", "before": None | {...}}, ...],
+        "keys":   {"ax_bids": [...], "ax_bids_removed": [...], "pre_specs": [...], ...},
+    }
+    before 가 None 이면 이번 실행이 새로 만든 경로다. keys 는 리포트용 목록이고 롤백은
+    writes 만 본다 (/ax_bids·사전규격도 수집기가 before_values 로 writes 에 남긴다). 경로를 dict 키로 두지 않는 것은
+    체크포인트를 RTDB 에 저장할 때 키에 '/' 를 쓸 수 없어서다.
+    """
+
+    def __init__(self, data: dict | None = None):
+        self.data = data if data is not None else {}
+        self.data.setdefault("writes", [])
+        self.data.setdefault("keys", {})
+        self._seen = {w["path"] for w in self.data["writes"]}
+
+    def record_write(self, path: str, before=None):
+        """같은 경로를 여러 번 써도 실행 전 값(처음 기록)만 남긴다."""
+        key = _norm(path)
+        if key in self._seen:
+            return
+        self._seen.add(key)
+        self.data["writes"].append({"path": key, "before": before})
+
+    def record_keys(self, name: str, keys):
+        bucket = self.data["keys"].setdefault(name, [])
+        bucket.extend(k for k in keys if k not in bucket)
+
+    def to_dict(self) -> dict:
+        return self.data
+
+
+def rollback_plan(manifest: dict) -> BulkPlan:
+    """매니페스트대로 되돌리는 계획: 기록된 경로는 이전 값으로, 새로 만든 경로는 삭제."""
+    plan = BulkPlan("실행 롤백")
+    for write in manifest.get("writes") or []:
+        plan.set(write["path"], write.get("before"))
+    return plan
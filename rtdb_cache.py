@@ -0,0 +1,99 @@
+"""
+RTDB 스냅샷 캐시 (ETag 조건부 읽기).
+
+실행마다 거의 바뀌지 않는 노드를 통째로 다시 받는 곳이 있다.
+  /search_keywords            get_search_keywords()  매 실행
+  /ax_bids                    get_latest_bid_datetime()  매 실행 (전체)
+  /bids/{연도}/{월}            upload_to_firebase()  월 단위 중복 확인
+
+받은 값을 ETag 와 함께 메모리와 로컬 디렉터리(RTDB_CACHE_DIR)에 둔다. 다음 읽기는
+get_if_changed(etag) 로 조건부 요청을 보내, 바뀌지 않았으면 본문 없이 캐시 값을 쓰고
+바뀌었을 때만 새로 받는다.
+
+  cached_get("/search_keywords")
+
+돌려준 값은 캐시가 들고 있는 객체이므로 고치지 않는다 (고칠 거면 복사해서 쓴다).
+디렉터리 캐시는 보조 수단이라 읽기/쓰기에 실패해도 무시하고 RTDB 에서 받는다.
+Actions 는 실행마다 작업 디렉터리가 새로 만들어지므로 워크플로우가 actions/cache 로
+RTDB_CACHE_DIR 를 이어 준다.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+RTDB_CACHE_DIR = os.getenv("RTDB_CACHE_DIR", ".rtdb_cache")
+
+
+def _norm(path: str) -> str:
+    return "/" + "/".join(p for p in str(path).split("/") if p)
+
+
+class SnapshotCache:
+    def __init__(self, directory: str | None = RTDB_CACHE_DIR):
+        self.directory = directory
+        self._entries: dict[str, dict] = {}     # path → {"etag", "data"}
+        self._lock = threading.Lock()
+
+    # ── 디렉터리 ───────────────────────────────────
+    def _file(self, path: str) -> str:
+        name = hashlib.sha1(path.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{name}.json")
+
+    def _load(self, path: str) -> dict | None:
+        if not self.directory:
+            return None
+        try:
+            with open(self._file(path), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("path") == path and entry.get("etag") else None
+
+    def _store(self, path: str, entry: dict):
+        if not self.directory:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            target = self._file(path)
+            tmp = f"{target}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"path": path, **entry}, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp, target)
+        except OSError as e:
+            print(f"⚠️ RTDB 캐시 저장 실패 (무시하고 계속): {e}")
+
+    # ── 읽기 ───────────────────────────────────────
+    def get(self, path: str):
+        """path 의 값. 캐시가 있으면 조건부 요청으로 바뀐 경우에만 새로 받는다."""
+        from firebase_admin import db
+
+        path = _norm(path)
+        with self._lock:
+            entry = self._entries.get(path)
+        if entry is None:
+            entry = self._load(path)
+
+        ref = db.reference(path)
+        if entry is not None:
+            changed, data, etag = ref.get_if_changed(entry["etag"])
+            if not changed:
+                with self._lock:
+                    self._entries[path] = entry
+                return entry["data"]
+        else:
+            data, etag = ref.get(etag=True)
+
+        entry = {"etag": etag, "data": data}
+        with self._lock:
+            self._entries[path] = entry
+        self._store(path, entry)
+        return data
+
+
+snapshot_cache = SnapshotCache()
+
+
+def cached_get(path: str):
+    return snapshot_cache.get(path)
@@ -0,0 +1,296 @@
+"""
+수집 실행 이력 (시계열).
+
+/collection_results/latest 는 실행마다 덮어써서 추세를 볼 수 없다. 실행마다 요약과
+성능 지표를 한 건씩 쌓는다.
+
+저장소:
+  RTDB   /collection_history/{YYYYMMDD}/{HHMMSS}
+         HISTORY_RETENTION_DAYS(기본 90일)보다 오래된 날짜 노드는 기록할 때 같은
+         다중 경로 update 에서 지운다.
+  SQLite HISTORY_DB_PATH (기본 run_history.sqlite3). 로컬/상시 실행용 전체 로그.
+         Actions 는 실행마다 작업 디렉터리가 새로 만들어지므로 추세는 RTDB 쪽을 본다.
+
+지표:
+  duration_s      전체 실행 시간
+  stages          단계별 시간 (keywords / ax / prespec / user_inputs / report, 동시에 돌아 합이 전체보다 크다)
+  failed_stages   실패·시간 초과·건너뛴 단계와 그 상태
+  api             API 출처별 호출 수, 오류 수, 누적/최대 응답 시간
+  keyword_results 키워드별 수집 건수
+
+조회:
+  python run_history.py [--source rtdb|sqlite] [--days 30] [--window 7]
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+HISTORY_PATH = "/collection_history"
+HISTORY_RETENTION_DAYS = int(os.getenv("HISTORY_RETENTION_DAYS", "90"))
+HISTORY_DB_PATH = os.getenv("HISTORY_DB_PATH", "run_history.sqlite3")
+
+
+# ── API 호출 지표 ─────────────────────────────────────
+class ApiStats:
+    """출처별 API 호출 수 / 오류 수 / 응답 시간. 병렬 호출에서도 쓰도록 잠금을 둔다."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: dict[str, dict] = {}
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+
+    def record(self, source: str, seconds: float, ok: bool = True):
+        with self._lock:
+            s = self._stats.setdefault(source, {"calls": 0, "errors": 0, "total_s": 0.0, "max_s": 0.0})
+            s["calls"] += 1
+            s["errors"] += 0 if ok else 1
+            s["total_s"] += seconds
+            s["max_s"] = max(s["max_s"], seconds)
+
+    @contextmanager
+    def measure(self, source: str):
+        """with 블록 안의 API 호출 한 번(HTTP 요청 + 응답 해석·resultCode 확인)을 잰다. 예외가 나면 오류로 센다."""
+        start = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.record(source, time.perf_counter() - start, ok)
+
+    def snapshot(self) -> dict[str, dict]:
+        with self._lock:
+            return {
+                source: {**s, "total_s": round(s["total_s"], 3), "max_s": round(s["max_s"], 3)}
+                for source, s in self._stats.items()
+            }
+
+
+api_stats = ApiStats()
+
+
+# ── 이력 한 건 ───────────────────────────────────────
+def build_entry(summary: dict, *, run_at: datetime, duration_s: float, stages: dict,
+                mode: str, api: dict | None = None, failed_stages: dict | None = None) -> dict:
+    api = api if api is not None else api_stats.snapshot()
+    return {
+        "run_at": run_at.strftime("%Y-%m-%d %H:%M:%S"),
+        "mode": mode,
+        "duration_s": round(duration_s, 2),
+        "stages": stages,
+        "failed_stages": failed_stages or {},
+        "total_count": summary.get("total_count", 0),
+        "keyword_results": summary.get("keyword_results", {}),
+        "ax_upserted": (summary.get("ax_result") or {}).get("upserted_records", 0),
+        "pre_spec_count": (summary.get("prespec_result") or {}).get("pre_spec_count", 0),
+        "order_plan_count": (summary.get("prespec_result") or {}).get("order_plan_count", 0),
+        "prespec_truncated": (summary.get("prespec_result") or {}).get("row_budget_hits", 0),
+        "api_calls": sum(s["calls"] for s in api.values()),
+        "api_errors": sum(s["errors"] for s in api.values()),
+        "api_seconds": round(sum(s["total_s"] for s in api.values()), 3),
+        "api": api,
+    }
+
+
+def _history_key(run_at: str) -> tuple[str, str]:
+    """'2025-07-15 10:30:00' → ('20250715', '103000')"""
+    dt = datetime.strptime(run_at, "%Y-%m-%d %H:%M:%S")
+    return dt.strftime("%Y%m%d"), dt.strftime("%H%M%S")
+
+
+# ── 기록 ─────────────────────────────────────────────
+def record_rtdb(entry: dict, retention_days: int = HISTORY_RETENTION_DAYS) -> int:
+    """이력 한 건 추가 + 보존 기간이 지난 날짜 노드 삭제를 한 번의 update 로. 지운 날짜 수를 돌려준다."""
+    from firebase_admin import db
+
+    day, run = _history_key(entry["run_at"])
+    cutoff = (datetime.strptime(day, "%Y%m%d") - timedelta(days=retention_days)).strftime("%Y%m%d")
+
+    existing_days = db.reference(HISTORY_PATH).get(shallow=True) or {}
+    expired = [d for d in existing_days if d < cutoff]
+
+    root = HISTORY_PATH.strip("/")
+    updates = {f"{root}/{day}/{run}": entry}
+    updates.update({f"{root}/{d}": None for d in expired})
+    db.reference("/").update(updates)
+    return len(expired)
+
+
+def _connect(path: str = HISTORY_DB_PATH):
+    import sqlite3
+
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS runs (
+            run_at TEXT PRIMARY KEY,
+            mode TEXT,
+            duration_s REAL,
+            total_count INTEGER,
+            ax_upserted INTEGER,
+            pre_spec_count INTEGER,
+            order_plan_count INTEGER,
+            api_calls INTEGER,
+            api_errors INTEGER,
+            api_seconds REAL,
+            entry TEXT
+        )""")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS run_keywords (
+            run_at TEXT,
+            keyword TEXT,
+            count INTEGER,
+            PRIMARY KEY (run_at, keyword)
+        )""")
+    return conn
+
+
+def record_sqlite(entry: dict, path: str = HISTORY_DB_PATH):
+    conn = _connect(path)
+    try:
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (entry["run_at"], entry["mode"], entry["duration_s"], entry["total_count"],
+                 entry["ax_upserted"], entry["pre_spec_count"], entry["order_plan_count"],
+                 entry["api_calls"], entry["api_errors"], entry["api_seconds"],
+                 json.dumps(entry, ensure_ascii=False)),
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO run_keywords VALUES (?, ?, ?)",
+                [(entry["run_at"], kw, count) for kw, count in (entry.get("keyword_results") or {}).items()],
+            )
+    finally:
+        conn.close()
+
+
+def record_run(entry: dict, *, rtdb: bool = True, local: bool = True):
+    """두 저장소에 기록. 이력은 보조 수단이라 실패해도 수집 결과에 영향을 주지 않는다."""
+    if rtdb:
+        try:
+            expired = record_rtdb(entry)
+            extra = f", 보존 기간 지난 {expired}일치 삭제" if expired else ""
+            print(f"📈 실행 이력 기록: {HISTORY_PATH}/{'/'.join(_history_key(entry['run_at']))}{extra}")
+        except Exception as e:
+            print(f"⚠️ RTDB 실행 이력 기록 실패 (무시하고 계속): {e}")
+    if local:
+        try:
+            record_sqlite(entry)
+        except Exception as e:
+            print(f"⚠️ 로컬 실행 이력 기록 실패 (무시하고 계속): {e}")
+
+
+# ── 조회 ─────────────────────────────────────────────
+def load_history(source: str = "sqlite", days: int = 30) -> list[dict]:
+    """최근 days 일 이력을 시간순으로."""
+    since = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+
+    if source == "rtdb":
+        from firebase_admin import db
+
+        since_day = since[:10].replace("-", "")
+        tree = db.reference(HISTORY_PATH).order_by_key().start_at(since_day).get() or {}
+        entries = [entry for runs in tree.values() for entry in (runs or {}).values()]
+        return sorted(entries, key=lambda e: e["run_at"])
+
+    if not os.path.exists(HISTORY_DB_PATH):
+        return []
+    conn = _connect()
+    try:
+        rows = conn.execute("SELECT entry FROM runs WHERE run_at >= ? ORDER BY run_at", (since,)).fetchall()
+    finally:
+        conn.close()
+    return [json.loads(row[0]) for row in rows]
+
+
+def rolling_throughput(entries: list[dict], window: int = 7) -> list[dict]:
+    """실행별 처리량(수집 건수/분)과 직전 window 회 이동평균."""
+    out = []
+    rates = []
+    for e in entries:
+        minutes = max(e.get("duration_s") or 0, 1) / 60
+        records = (e.get("total_count") or 0) + (e.get("ax_upserted") or 0)
+        rates.append(records / minutes)
+        recent = rates[-window:]
+        out.append({
+            "run_at": e["run_at"],
+            "records_per_min": round(rates[-1], 2),
+            "rolling_records_per_min": round(sum(recent) / len(recent), 2),
+            "duration_s": e.get("duration_s"),
+        })
+    return out
+
+
+def keyword_yield(entries: list[dict]) -> dict[str, dict]:
+    """키워드별 실행 수, 누적·평균 건수, 0건 실행 수."""
+    out: dict[str, dict] = {}
+    for e in entries:
+        for kw, count in (e.get("keyword_results") or {}).items():
+            s = out.setdefault(kw, {"runs": 0, "total": 0, "zero_runs": 0})
+            s["runs"] += 1
+            s["total"] += count or 0
+            s["zero_runs"] += 0 if count else 1
+    for s in out.values():
+        s["avg"] = round(s["total"] / s["runs"], 2) if s["runs"] else 0
+    return out
+
+
+def latency_trend(entries: list[dict], source: str | None = None) -> list[dict]:
+    """실행별 평균/최대 API 응답 시간과 오류율. source 를 주면 그 출처만."""
+    out = []
+    for e in entries:
+        api = e.get("api") or {}
+        stats = [api[source]] if source else list(api.values())
+        stats = [s for s in stats if s]
+        calls = sum(s["calls"] for s in stats)
+        if not calls:
+            continue
+        out.append({
+            "run_at": e["run_at"],
+            "calls": calls,
+            "avg_ms": round(sum(s["total_s"] for s in stats) / calls * 1000, 1),
+            "max_ms": round(max(s["max_s"] for s in stats) * 1000, 1),
+            "error_rate": round(sum(s["errors"] for s in stats) / calls, 4),
+        })
+    return out
+
+
+def print_report(entries: list[dict], window: int = 7):
+    if not entries:
+        print("ℹ️ 실행 이력이 없습니다.")
+        return
+
+    print(f"\n📈 실행 {len(entries)}회 ({entries[0]['run_at']} ~ {entries[-1]['run_at']})")
+
+    print("\n⏱️ 처리량 (건/분, 이동평균)")
+    for row in rolling_throughput(entries, window):
+        print(f"  {row['run_at']}  {row['records_per_min']:>8}  avg {row['rolling_records_per_min']:>8}  ({row['duration_s']}s)")
+
+    print("\n🎯 키워드별 수집량")
+    for kw, s in sorted(keyword_yield(entries).items(), key=lambda kv: -kv[1]["total"]):
+        print(f"  • {kw}: 누적 {s['total']}건, 평균 {s['avg']}건, 0건 실행 {s['zero_runs']}/{s['runs']}")
+
+    print("\n🌐 API 응답 시간")
+    for row in latency_trend(entries):
+        print(f"  {row['run_at']}  {row['calls']:>5}회  평균 {row['avg_ms']}ms  최대 {row['max_ms']}ms  오류율 {row['error_rate']:.2%}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="수집 실행 이력 조회")
+    parser.add_argument("--source", choices=["sqlite", "rtdb"], default="sqlite")
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--window", type=int, default=7, help="처리량 이동평균 실행 수")
+    args = parser.parse_args()
+
+    if args.source == "rtdb":
+        from main import initialize_firebase
+        initialize_firebase()
+    print_report(load_history(args.source, args.days), args.window)
@@ -0,0 +1,165 @@
+"""
+일일 수집 작업의 단계 스케줄러.
+
+main 은 키워드 입찰공고 → AX → 사전규격/발주계획 → 결과 저장을 한 줄로 돌려, 서로 상관없는
+수집기(AX·사전규격은 입찰공고 결과를 쓰지 않는다)도 앞 단계가 끝나기를 기다렸고, 한 단계가
+멈추면 뒤 단계가 전부 같이 멈췄다. 단계를 선행 관계가 있는 작업으로 선언하면
+
+  - 선행 단계가 끝난 단계부터 스레드로 동시에 돈다 (STAGE_WORKERS 개까지)
+  - requires 는 성공해야 실행, after 는 끝나기만(성공 여부 무관) 기다린다
+  - 단계마다 시간 제한(timeout 초, STAGE_TIMEOUT_{이름} 으로 덮어쓴다)을 두고, 넘기면
+    '시간 초과' 로 기록한 뒤 그 단계를 기다리는 단계부터 진행한다
+  - 예외가 난 단계는 '실패' 로 기록될 뿐 다른 단계는 계속 돈다
+
+  stages = [
+      Stage("keywords", run_keywords),
+      Stage("ax", run_ax),
+      Stage("prespec", run_prespec),
+      Stage("report", write_report, requires=("keywords",), after=("ax", "prespec")),
+  ]
+  results = run_stages(stages)     # {이름: StageResult}
+
+단계 함수는 results(지금까지의 StageResult dict) 하나를 받아 선행 단계의 value 를 꺼내 쓴다.
+시간 초과된 스레드는 멈출 수 없어 결과만 버린다. 다만 RTDB 에 쓰는 도중 프로세스가 끝나
+잘리지 않도록 run_stages 는 돌아오기 전에 그 스레드가 끝나기를 기다린다.
+"""
+
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+STAGE_WORKERS = max(1, int(os.getenv("STAGE_WORKERS", "3")))
+
+
+def stage_timeout(name: str, default: float | None = None) -> float | None:
+    """STAGE_TIMEOUT_{NAME}(초) 이 있으면 그 값, 없으면 default. 0 이하는 제한 없음."""
+    raw = os.getenv(f"STAGE_TIMEOUT_{name.upper()}")
+    if raw is None or not raw.strip():
+        return default
+    value = float(raw)
+    return value if value > 0 else None
+
+
+@dataclass
+class Stage:
+    name: str
+    fn: Callable[[dict], Any]
+    requires: tuple[str, ...] = ()   # 성공해야 실행 (실패·시간 초과·건너뜀이면 이 단계도 건너뜀)
+    after: tuple[str, ...] = ()      # 끝나기만 기다림
+    timeout: float | None = None
+
+    @property
+    def deps(self) -> tuple[str, ...]:
+        return self.requires + self.after
+
+
+@dataclass
+class StageResult:
+    name: str
+    status: str = "pending"          # pending / running / ok / failed / timeout / skipped
+    value: Any = None
+    error: BaseException | None = None
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+    @property
+    def finished(self) -> bool:
+        return self.status not in ("pending", "running")
+
+
+def _run(stage: Stage, results: dict, done: queue.Queue):
+    started = time.perf_counter()
+    try:
+        value = stage.fn(results)
+    except BaseException as e:  # 단계 실패는 스케줄러가 기록하고 다른 단계는 계속한다
+        done.put((stage.name, "failed", None, e, time.perf_counter() - started))
+        return
+    done.put((stage.name, "ok", value, None, time.perf_counter() - started))
+
+
+def run_stages(stages: list[Stage], workers: int = STAGE_WORKERS) -> dict[str, StageResult]:
+    """선행 관계대로 단계를 돌리고 {이름: StageResult} 를 돌려준다. 모든 단계가 끝나야 돌아온다."""
+    by_name = {s.name: s for s in stages}
+    for stage in stages:
+        unknown = [d for d in stage.deps if d not in by_name]
+        if unknown:
+            raise ValueError(f"단계 '{stage.name}' 의 선행 단계가 없습니다: {', '.join(unknown)}")
+
+    results = {s.name: StageResult(s.name) for s in stages}
+    pending = [s.name for s in stages]
+    running: dict[str, tuple[float, float | None]] = {}   # 이름 → (시작 시각, 마감 시각)
+    threads: dict[str, threading.Thread] = {}
+    done: queue.Queue = queue.Queue()
+
+    while pending or running:
+        # 선행 단계가 모두 끝난 단계를 빈 자리만큼 띄운다. 건너뛴 단계가 생기면 다시 훑는다.
+        progressed = True
+        while progressed:
+            progressed = False
+            for name in list(pending):
+                stage = by_name[name]
+                if not all(results[d].finished for d in stage.deps):
+                    continue
+                failed = [d for d in stage.requires if not results[d].ok]
+                if failed:
+                    pending.remove(name)
+                    results[name].status = "skipped"
+                    results[name].error = RuntimeError(f"선행 단계 실패: {', '.join(failed)}")
+                    print(f"⏭️ 단계 '{name}' 건너뜀 (선행 단계 실패: {', '.join(failed)})")
+                    progressed = True
+                    continue
+                if len(running) >= workers:
+                    break
+                pending.remove(name)
+                now = time.perf_counter()
+                running[name] = (now, now + stage.timeout if stage.timeout else None)
+                results[name].status = "running"
+                print(f"▶️ 단계 '{name}' 시작")
+                threads[name] = threading.Thread(target=_run, args=(stage, results, done),
+                                                 name=f"stage-{name}", daemon=True)
+                threads[name].start()
+
+        if not running:
+            if pending:
+                raise ValueError(f"단계 선행 관계에 순환이 있습니다: {', '.join(pending)}")
+            break
+
+        deadlines = [d for _, d in running.values() if d is not None]
+        wait = max(0.0, min(deadlines) - time.perf_counter()) if deadlines else None
+        try:
+            name, status, value, error, seconds = done.get(timeout=wait)
+        except queue.Empty:
+            now = time.perf_counter()
+            for name, (started, deadline) in list(running.items()):
+                if deadline is not None and now >= deadline:
+                    del running[name]
+                    result = results[name]
+                    result.status = "timeout"
+                    result.seconds = round(now - started, 2)
+                    result.error = TimeoutError(f"{by_name[name].timeout:g}초 초과")
+                    print(f"⏱️ 단계 '{name}' 시간 초과 ({by_name[name].timeout:g}초), 결과를 버리고 뒤 단계를 진행합니다")
+            continue
+
+        if name not in running:   # 이미 시간 초과로 처리한 단계가 뒤늦게 끝남
+            continue
+        del running[name]
+        result = results[name]
+        result.status, result.value, result.error = status, value, error
+        result.seconds = round(seconds, 2)
+        if error is None:
+            print(f"✅ 단계 '{name}' 완료 ({result.seconds:.1f}초)")
+        else:
+            print(f"❌ 단계 '{name}' 실패 ({result.seconds:.1f}초): {error}")
+
+    # 시간 초과된 단계가 쓰는 도중에 프로세스가 끝나지 않게 한다 (결과는 이미 버렸다)
+    for name, thread in threads.items():
+        if results[name].status == "timeout" and thread.is_alive():
+            print(f"⏳ 시간 초과된 단계 '{name}' 가 끝나기를 기다립니다 (쓰는 도중 종료 방지)")
+            thread.join()
+    return results
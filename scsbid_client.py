@@ -1,9 +1,14 @@
-import requests
-from config import BID_API_KEY
+from config import get_api_key, SCSBID_RATE_PER_SEC
+from run_history import api_stats
+from utils import RateLimiter, http_session
+
+# 카테고리(kind)별 오퍼레이션 접미사: Servc(용역) / Thng(물품) / Cnstwk(공사) / Frgcpt(외자)
+# 여러 카테고리를 병렬로 보강해도 같은 서비스이므로 초당 상한은 하나를 공유한다.
+_limiter = RateLimiter(SCSBID_RATE_PER_SEC)
 
 # ✅ 낙찰금액 조회 (inqryDiv=4, bidNtceNo 기반)
-def get_scsbid_amount(bidNtceNo):
-    url = f"http://apis.data.go.kr/1230000/as/ScsbidInfoService/getScsbidListSttusServc?serviceKey={BID_API_KEY}"
+def get_scsbid_amount(bidNtceNo, kind="Servc"):
+    url = f"http://apis.data.go.kr/1230000/as/ScsbidInfoService/getScsbidListSttus{kind}?serviceKey={get_api_key()}"
     params = {
         "pageNo": 1,
         "numOfRows": 1,
@@ -14,8 +19,10 @@ def get_scsbid_amount(bidNtceNo):
         "inqryEndDt": "202512312359"
     }
     try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
+        _limiter.wait()
+        with api_stats.measure("scsbid"):
+            response = http_session().get(url, params=params)
+            response.raise_for_status()
         item = response.json().get("response", {}).get("body", {}).get("items", [{}])[0]
         return item.get("sucsfbidAmt", "")
     except Exception as e:
@@ -23,8 +30,8 @@ def get_scsbid_amount(bidNtceNo):
         return None
 
 # ✅ 개찰업체 정보 조회 (inqryDiv=3)
-def get_openg_corp_info(bidNtceNo):
-    url = f"http://apis.data.go.kr/1230000/as/ScsbidInfoService/getOpengResultListInfoServcPPSSrch?serviceKey={BID_API_KEY}"
+def get_openg_corp_info(bidNtceNo, kind="Servc"):
+    url = f"http://apis.data.go.kr/1230000/as/ScsbidInfoService/getOpengResultListInfo{kind}PPSSrch?serviceKey={get_api_key()}"
     params = {
         "pageNo": 1,
         "numOfRows": 1,
@@ -35,8 +42,10 @@ def get_openg_corp_info(bidNtceNo):
         "inqryEndDt": "202512312359"
     }
     try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
+        _limiter.wait()
+        with api_stats.measure("scsbid"):
+            response = http_session().get(url, params=params)
+            response.raise_for_status()
         item = response.json().get("response", {}).get("body", {}).get("items", [{}])[0]
         return item.get("opengCorpInfo", "")
     except Exception as e:
@@ -44,8 +53,8 @@ def get_openg_corp_info(bidNtceNo):
         return None
 
 # ✅ bidClsfcNo 조회 (유찰 사유 조회 전 단계)
-def get_bid_clsfc_no(bidNtceNo):
-    url = f"http://apis.data.go.kr/1230000/as/ScsbidInfoService/getOpengResultListInfoServcPPSSrch?serviceKey={BID_API_KEY}"
+def get_bid_clsfc_no(bidNtceNo, kind="Servc"):
+    url = f"http://apis.data.go.kr/1230000/as/ScsbidInfoService/getOpengResultListInfo{kind}PPSSrch?serviceKey={get_api_key()}"
     params = {
         "pageNo": 1,
         "numOfRows": 1,
@@ -56,8 +65,10 @@ def get_bid_clsfc_no(bidNtceNo):
         "inqryEndDt": "202512312359"
     }
     try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
+        _limiter.wait()
+        with api_stats.measure("scsbid"):
+            response = http_session().get(url, params=params)
+            response.raise_for_status()
         item = response.json().get("response", {}).get("body", {}).get("items", [{}])[0]
         return item.get("bidClsfcNo", "")
     except Exception as e:
@@ -66,7 +77,7 @@ def get_bid_clsfc_no(bidNtceNo):
 
 # ✅ 유찰사유 조회 (bidNtceNo + bidClsfcNo)
 def get_nobid_reason(bidNtceNo, bidClsfcNo):
-    url = f"http://apis.data.go.kr/1230000/as/ScsbidInfoService/getOpengResultListInfoFailing?serviceKey={BID_API_KEY}"
+    url = f"http://apis.data.go.kr/1230000/as/ScsbidInfoService/getOpengResultListInfoFailing?serviceKey={get_api_key()}"
     params = {
         "pageNo": 1,
         "numOfRows": 1,
@@ -77,8 +88,10 @@ def get_nobid_reason(bidNtceNo, bidClsfcNo):
         "inqryEndDt": "202512312359"
     }
     try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
+        _limiter.wait()
+        with api_stats.measure("scsbid"):
+            response = http_session().get(url, params=params)
+            response.raise_for_status()
         item = response.json().get("response", {}).get("body", {}).get("items", [{}])[0]
         return item.get("nobidRsn", "")
     except Exception as e:
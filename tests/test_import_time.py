@@ -0,0 +1,40 @@
+"""main 임포트가 무거운 라이브러리를 끌어오지 않는지 확인한다.
+
+firebase_admin(google-cloud 일체)과 pandas 는 실제로 쓰는 시점에만 불러온다.
+API 키도 임포트 때 읽지 않으므로 키 없이 임포트할 수 있어야 한다.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _run(code: str) -> subprocess.CompletedProcess:
+    env = {k: v for k, v in os.environ.items() if k != "BID_API_KEY"}
+    return subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env,
+                          capture_output=True, text=True, timeout=60)
+
+
+def test_import_main_is_light():
+    proc = _run(
+        "import sys, main\n"
+        "heavy = [m for m in ('firebase_admin', 'pandas') if m in sys.modules]\n"
+        "print(','.join(heavy))\n"
+    )
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout.strip() == "", f"임포트 때 불러온 모듈: {proc.stdout.strip()}"
+
+
+def test_missing_api_key_fails_run():
+    proc = _run(
+        "import main\n"
+        "try:\n"
+        "    main.main()\n"
+        "except RuntimeError as e:\n"
+        "    print(str(e).split(':')[0])\n"
+    )
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout.strip().endswith("G2B_AUTH_ERROR")
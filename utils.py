@@ -1,5 +1,6 @@
 import time
 import argparse
+import threading
 
 
 def parse_arguments(defaults):
@@ -82,4 +83,64 @@ def get_output_path(filename):
     os.makedirs(base_path, exist_ok=True)
     
     # 전체 파일 경로 반환
-    return os.path.join(base_path, filename)
\ No newline at end of file
+    return os.path.join(base_path, filename)
+
+
+class RateLimiter:
+    """
+    초당 호출 수 상한을 지키도록 호출 간격을 맞추는 클래스
+
+    여러 스레드가 같은 인스턴스를 공유해도 된다. wait() 가 다음 호출 시각을
+    예약하고, 그때까지 잠든다.
+
+    Args:
+        rate_per_sec (float): 초당 최대 호출 수 (0 이하면 제한 없음)
+    """
+
+    def __init__(self, rate_per_sec):
+        self.interval = 1.0 / rate_per_sec if rate_per_sec and rate_per_sec > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+_http_session = None
+_http_lock = threading.Lock()
+
+
+def http_session():
+    """
+    프로세스 공용 requests.Session 을 반환하는 함수
+
+    requests.get 은 호출마다 세션을 새로 만들어 TLS 연결을 매번 다시 맺는다. 같은 세션을
+    쓰면 apis.data.go.kr 연결을 재사용한다 (데몬 모드에서는 폴링 사이에도 연결이 살아 있다).
+    스레드끼리 공유해도 된다. 연결 풀 크기는 HTTP_POOL_SIZE (기본 16, 보강 스레드 수 이상).
+
+    Returns:
+        requests.Session: 공용 세션
+    """
+    global _http_session
+    if _http_session is None:
+        with _http_lock:
+            if _http_session is None:
+                import os
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                size = int(os.getenv("HTTP_POOL_SIZE", "16"))
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _http_session = session
+    return _http_session